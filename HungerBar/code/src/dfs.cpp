@@ -5,150 +5,431 @@
 #include <cstring> 
 #include <cstdio>  
 
+#include "pack_reader.h"
+#include "reduce.h"
+
 using namespace std;
 
 // Global variables
+const int MAX_K = 16;
+int K = 3;      // number of buckets (-k)
 int N;
 int* numbers;
 int* bucket_sum;
 int* belong_to; // record which bucket the i-th number belongs to
 int target;
+bool use_reduce = true; // -no-reduce: solve the instance as read (see reduce.h)
 
 // Comparison function for qsort (Descending order)
 int compare(const void* a, const void* b) {
     return (*(int*)b - *(int*)a);
 }
 
-// DFS function
-bool dfs(int index) {
-    // Base case: all numbers placed
-    if (index == N) {
-        return (bucket_sum[0] == target && bucket_sum[1] == target && bucket_sum[2] == target);
-    }
+// Transposition table of states proven infeasible.
+// A state is (index, bucket sums); the sums are stored sorted because the
+// buckets are interchangeable, and the smallest one is implied by the prefix sum,
+// so a slot holds the K - 1 largest sums.
+// The table is lossy (a full probe window overwrites), which only costs re-search.
+// It is allocated once (fewer slots for larger K, same memory as K = 3);
+// bumping memo_epoch empties it between instances.
+const int MEMO_BITS = 22;
+const int MEMO_PROBES = 8;
+int memo_bits = MEMO_BITS;
+int* memo_sums = NULL;                // (K - 1) sorted sums per slot, largest first
+int* memo_index;                      // index of the state
+unsigned int* memo_stamp;             // epoch of the entry; any other value marks an empty slot
+unsigned int memo_epoch = 0;
+int memo_key[MAX_K];                  // sorted sums of the state being looked up
 
-    // Try to place the current number (numbers[index]) into one of the 3 buckets
-    for (int i = 0; i < 3; i++) {
-        // Pruning 1: Capacity Check
-        if (bucket_sum[i] + numbers[index] > target) {
-            continue;
-        }
+// Explicit DFS stack: one frame per index
+int* order;   // order[K * index + k]: buckets in try order (least loaded first)
+int* pos;     // next position in order[] to try
+int* chosen;  // bucket currently holding numbers[index], -1 if none
 
-        // Action: Place number
-        bucket_sum[i] += numbers[index];
-        belong_to[index] = i + 1; // Store result 
+// Sorts the bucket sums into memo_key (descending) and returns the hash
+int make_memo_key() {
+    for (int b = 0; b < K; b++) {
+        int v = bucket_sum[b], j = b;
+        for (; j > 0 && memo_key[j - 1] < v; j--) memo_key[j] = memo_key[j - 1];
+        memo_key[j] = v;
+    }
+    unsigned long long h = 0;
+    for (int b = 0; b < K - 1; b++) {
+        h = (h ^ (unsigned int)memo_key[b]) * 0x9E3779B97F4A7C15ULL;
+    }
+    return (int)(h >> (64 - memo_bits));
+}
 
-        // Recursion
-        if (dfs(index + 1)) {
+bool memo_contains(int index) {
+    int h = make_memo_key();
+    int mask = (1 << memo_bits) - 1;
+    for (int p = 0; p < MEMO_PROBES; p++) {
+        int slot = (h + index + p) & mask;
+        if (memo_stamp[slot] != memo_epoch) return false;
+        if (memo_index[slot] == index
+                && memcmp(memo_sums + (size_t)slot * (K - 1), memo_key, (K - 1) * sizeof(int)) == 0) {
             return true;
         }
+    }
+    return false;
+}
 
-        // Backtrack
-        bucket_sum[i] -= numbers[index];
-        belong_to[index] = 0;
+void memo_insert(int index) {
+    int h = make_memo_key();
+    int mask = (1 << memo_bits) - 1;
+    int slot = (h + index) & mask;
+    for (int p = 0; p < MEMO_PROBES; p++) {
+        int s = (h + index + p) & mask;
+        if (memo_stamp[s] != memo_epoch) { slot = s; break; }
+    }
+    memo_stamp[slot] = memo_epoch;
+    memo_index[slot] = index;
+    memcpy(memo_sums + (size_t)slot * (K - 1), memo_key, (K - 1) * sizeof(int));
+}
 
-        // Pruning 2: Symmetry Breaking for Empty Buckets
-        if (bucket_sum[i] == 0) {
-            break;
-        }
+// Bounds on the remaining items numbers[index..N-1] (sorted descending).
+// Every bucket deficit must be 0 or reachable with the remaining values:
+// - a non-zero deficit smaller than the smallest remaining value is dead;
+// - bucket b needs between ceil(d / largest) and floor(d / smallest) items,
+//   and the remaining item count must fall inside the summed range
+//   (no upper end if the smallest value is 0, which fills nothing);
+// - residual cut: two items that each exceed half the largest deficit cannot
+//   share a bucket, so the j-th largest of them needs the j-th largest deficit.
+bool bounds_ok(int index) {
+    int max_r = numbers[index], min_r = numbers[N - 1];
+    long long lo = 0, hi = 0;
+    int deficit[MAX_K];
+    for (int b = 0; b < K; b++) {
+        int d = target - bucket_sum[b];
+        // Deficits sorted descending for the residual cut
+        int j = b;
+        for (; j > 0 && deficit[j - 1] < d; j--) deficit[j] = deficit[j - 1];
+        deficit[j] = d;
+        if (d == 0) continue;
+        if (max_r == 0 || d < min_r) return false;
+        lo += (d + max_r - 1) / max_r;
+        if (min_r > 0) hi += d / min_r;
     }
+    int rem = N - index;
+    if (lo > rem || (min_r > 0 && rem > hi)) return false;
 
-    return false;
+    for (int j = 0; index + j < N && 2LL * numbers[index + j] > deficit[0]; j++) {
+        if (j >= K || numbers[index + j] > deficit[j]) return false;
+    }
+    return true;
 }
 
-int main(int argc, char* argv[]) {
-    // Faster I/O
-    ios_base::sync_with_stdio(false);
-    cin.tie(NULL);
+// Push a frame for numbers[index]; returns false if the state is pruned
+bool enter(int index) {
+    if (memo_contains(index) || !bounds_ok(index)) return false;
 
-    char input_path[256] = "../../testcases/1.in";
-    char output_path[256] = "../../testcases/1.out";
+    // Complete-greedy ordering: try the least loaded bucket first,
+    // so the first leaf reached is the greedy (LPT) partition
+    int* o = order + K * index;
+    for (int i = 0; i < K; i++) o[i] = i;
+    for (int i = 1; i < K; i++) {
+        for (int j = i; j > 0 && bucket_sum[o[j]] < bucket_sum[o[j - 1]]; j--) {
+            int t = o[j]; o[j] = o[j - 1]; o[j - 1] = t;
+        }
+    }
+    pos[index] = 0;
+    chosen[index] = -1;
+    return true;
+}
 
-    for (int i = 1; i < argc; i++) {
-        if (strcmp(argv[i], "-test") == 0) {
-            if (i + 1 < argc) {
-                sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
-                sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
-                i++; 
-            } else {
-                cerr << "Error: -test option requires an argument." << endl;
-                return 1;
-            }
+// Next bucket to try for numbers[index], or -1 if the frame is exhausted
+int next_choice(int index) {
+    int* o = order + K * index;
+    while (pos[index] < K) {
+        int k = pos[index]++;
+        int b = o[k];
+        // Pruning 1: Capacity Check
+        if (bucket_sum[b] + numbers[index] > target) continue;
+        // Pruning 2: Symmetry Breaking for buckets with equal sums (incl. empty ones)
+        bool same = false;
+        for (int j = 0; j < k; j++) {
+            if (bucket_sum[o[j]] == bucket_sum[b]) { same = true; break; }
         }
+        if (same) continue;
+        return b;
     }
+    return -1;
+}
 
-    ifstream fin(input_path);
-    ofstream fout(output_path);
+// Iterative DFS. Duplicate values need no extra rule: placing two equal values
+// into buckets (x, y) or (y, x) reaches the same sorted state, so the second
+// order is cut by the transposition table.
+bool search() {
+    if (!enter(0)) return false;
+    int index = 0;
+    while (index >= 0) {
+        // Backtrack the previous choice of this frame
+        if (chosen[index] >= 0) {
+            bucket_sum[chosen[index]] -= numbers[index];
+            belong_to[index] = 0;
+            chosen[index] = -1;
+        }
 
-    if (!fin.is_open()) {
-        cerr << "Error: Cannot open input file: " << input_path << endl;
-        return 1;
-    }
-    if (!fout.is_open()) {
-        cerr << "Error: Cannot open output file: " << output_path << endl;
-        return 1;
+        int b = next_choice(index);
+        if (b < 0) {
+            // Every choice failed: this state is infeasible
+            memo_insert(index);
+            index--;
+            continue;
+        }
+
+        // Action: Place number
+        bucket_sum[b] += numbers[index];
+        chosen[index] = b;
+        belong_to[index] = b + 1; // Store result 
+
+        // All numbers placed: capacity checks force every bucket to equal target
+        if (index + 1 == N) return true;
+        if (enter(index + 1)) index++;
     }
+    return false;
+}
 
-    if (!(fin >> N)) return 0;
+// Solve one part of an instance (see reduce.h): values[] come back in the
+// order of numbers[], bucket[i] is the bucket (0..K-1) of values[i]
+bool solve_values(long long* values, int n, int* bucket) {
+    if (!fits_int(values, n, K)) {
+        cerr << "Error: values or target exceed the int range of the DFS." << endl;
+        exit(1);
+    }
+    N = n;
 
     // Manual memory allocation (No std::vector)
     numbers = new int[N];
     belong_to = new int[N];
-    bucket_sum = new int[3];
+    bucket_sum = new int[K];
     
     long long sum = 0;
     for (int i = 0; i < N; i++) {
-        fin >> numbers[i];
+        numbers[i] = (int)values[i];
         sum += numbers[i];
         belong_to[i] = 0;
     }
 
     // Basic checks
-    if (sum % 3 != 0 || N < 3) {
-        fout << "no" << endl;
+    if (sum % K != 0 || N < K) {
         delete[] numbers; delete[] belong_to; delete[] bucket_sum;
-        fin.close(); fout.close();
-        return 0;
+        return false;
     }
 
-    target = (int)(sum / 3);
-    bucket_sum[0] = bucket_sum[1] = bucket_sum[2] = 0;
+    target = (int)(sum / K);
+    for (int b = 0; b < K; b++) bucket_sum[b] = 0;
 
     // Optimization: Sort descending to prioritize large items
     qsort(numbers, N, sizeof(int), compare);
 
     // Optimization: If largest number > target, impossible
     if (numbers[0] > target) {
-        fout << "no" << endl;
         delete[] numbers; delete[] belong_to; delete[] bucket_sum;
-        fin.close(); fout.close();
-        return 0;
+        return false;
     }
 
-    if (dfs(0)) {
-        fout << "yes" << endl;
-        // Output the 3 parts
-        for (int b = 1; b <= 3; b++) {
-            bool first = true;
-            for (int i = 0; i < N; i++) {
-                if (belong_to[i] == b) {
-                    if (!first) fout << " ";
-                    fout << numbers[i];
-                    first = false;
-                }
-            }
-            fout << endl;
+    if (memo_sums == NULL) {
+        // Keep the table at the K = 3 size: halve the slots while a slot holds more sums
+        while ((K - 1) > (2 << (MEMO_BITS - memo_bits))) memo_bits--;
+        memo_sums = new int[(size_t)(K - 1) << memo_bits];
+        memo_index = new int[1 << memo_bits];
+        memo_stamp = new unsigned int[1 << memo_bits];
+        memset(memo_stamp, 0, sizeof(unsigned int) * (1 << memo_bits));
+    }
+    memo_epoch++;
+    order = new int[K * N];
+    pos = new int[N];
+    chosen = new int[N];
+
+    bool ok = search();
+    delete[] order; delete[] pos; delete[] chosen;
+
+    if (ok) {
+        for (int i = 0; i < N; i++) {
+            values[i] = numbers[i];
+            bucket[i] = belong_to[i] - 1;
         }
-    } else {
-        fout << "no" << endl;
     }
 
     // Cleanup
     delete[] numbers;
     delete[] belong_to;
     delete[] bucket_sum;
-    
+
+    return ok;
+}
+
+// Solve one instance read from fin (a text stream or a PackCursor) and write
+// its record to fout. Returns false if no instance could be read (end of input).
+template <class Input>
+bool solve_instance(Input& fin, ostream& fout) {
+    int n;
+    if (!(fin >> n)) return false;
+
+    long long* values = new long long[n];
+    int* bucket = new int[n];
+    for (int i = 0; i < n; i++) fin >> values[i];
+
+    bool found = use_reduce ? solve_reduced(values, n, K, solve_values, bucket, true)
+                            : part_ok(values, n, K) && solve_values(values, n, bucket);
+    write_result(fout, found, values, n, bucket, K);
+
+    delete[] values;
+    delete[] bucket;
+    return true;
+}
+
+int main(int argc, char* argv[]) {
+    // Faster I/O
+    ios_base::sync_with_stdio(false);
+    cin.tie(NULL);
+
+    char input_path[256] = "../../testcases/1.in";
+    char output_path[256] = "../../testcases/1.out";
+    bool stream = false;
+    bool custom_in = false, custom_out = false;
+    const char* pack_path = NULL;
+    long long pack_index = -1;
+
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "-test") == 0) {
+            if (i + 1 < argc) {
+                // -test 1 -> read ../../testcases/1.in, unless -in/-out override a path
+                if (!custom_in) sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
+                if (!custom_out) sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
+                i++; 
+            } else {
+                cerr << "Error: -test option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-in") == 0) {
+            // Override the input path (in -stream mode: a file of concatenated instances)
+            if (i + 1 < argc) {
+                snprintf(input_path, sizeof(input_path), "%s", argv[i+1]);
+                custom_in = true;
+                i++;
+            } else {
+                cerr << "Error: -in option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-out") == 0) {
+            // Override the output path, e.g., so concurrent runs do not share a .out file
+            if (i + 1 < argc) {
+                snprintf(output_path, sizeof(output_path), "%s", argv[i+1]);
+                custom_out = true;
+                i++;
+            } else {
+                cerr << "Error: -out option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-pack") == 0) {
+            // Read the instances from a packed binary file (see pack_reader.h)
+            if (i + 1 < argc) {
+                pack_path = argv[i+1];
+                i++;
+            } else {
+                cerr << "Error: -pack option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-index") == 0) {
+            // Only solve instance <k> (0-based) of the -pack file
+            if (i + 1 < argc && atoll(argv[i+1]) >= 0) {
+                pack_index = atoll(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -index option requires a non-negative integer." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-stream") == 0) {
+            stream = true;
+        } else if (strcmp(argv[i], "-no-reduce") == 0) {
+            use_reduce = false;
+        } else if (strcmp(argv[i], "-k") == 0) {
+            // Number of buckets (default: 3)
+            if (i + 1 < argc && atoi(argv[i+1]) >= 2 && atoi(argv[i+1]) <= MAX_K) {
+                K = atoi(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -k option requires an integer in [2, " << MAX_K << "]." << endl;
+                return 1;
+            }
+        }
+    }
+
+    if (pack_path != NULL) {
+        // Pack mode: solve every instance of the pack (or only -index) and write
+        // one record per instance to stdout (or the -out file), as in stream mode
+        PackCursor pack;
+        if (!pack.open(pack_path)) {
+            cerr << "Error: Cannot open pack file: " << pack_path << endl;
+            return 1;
+        }
+        if (pack_index >= 0 && !pack.select((unsigned long long)pack_index)) {
+            cerr << "Error: -index " << pack_index << " out of range." << endl;
+            pack.close();
+            return 1;
+        }
+        ofstream pout;
+        if (custom_out) {
+            pout.open(output_path);
+            if (!pout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                pack.close();
+                return 1;
+            }
+        }
+        ostream& out = custom_out ? (ostream&)pout : cout;
+        while (solve_instance(pack, out)) {
+            out.flush();
+        }
+        pack.close();
+        return 0;
+    }
+
+    if (stream) {
+        // Stream mode: read a sequence of instances ("N a1 ... aN" each) from stdin
+        // (or the -in file) and write one record per instance to stdout (or the -out file).
+        // Every record is flushed immediately so a caller can pipe instances one by one.
+        ifstream sin;
+        ofstream sout;
+        if (custom_in) {
+            sin.open(input_path);
+            if (!sin.is_open()) {
+                cerr << "Error: Cannot open input file: " << input_path << endl;
+                return 1;
+            }
+        }
+        if (custom_out) {
+            sout.open(output_path);
+            if (!sout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                return 1;
+            }
+        }
+        istream& in = custom_in ? (istream&)sin : cin;
+        ostream& out = custom_out ? (ostream&)sout : cout;
+        while (solve_instance(in, out)) {
+            out.flush();
+        }
+        return 0;
+    }
+
+    ifstream fin(input_path);
+    ofstream fout(output_path);
+
+    if (!fin.is_open()) {
+        cerr << "Error: Cannot open input file: " << input_path << endl;
+        return 1;
+    }
+    if (!fout.is_open()) {
+        cerr << "Error: Cannot open output file: " << output_path << endl;
+        return 1;
+    }
+
+    solve_instance(fin, fout);
+
     fin.close();
     fout.close();
-
     return 0;
-}
\ No newline at end of file
+}
@@ -4,177 +4,660 @@
 #include <fstream>
 #include <cstring> 
 #include <cstdio>  
+#include <new>
+
+#include "pack_reader.h"
+#include "reduce.h"
 
 using namespace std;
 
-int main(int argc, char* argv[]) {
-    char input_path[256] = "../../testcases/1.in";
-    char output_path[256] = "../../testcases/1.out";
+// Reachability is stored as packed bit rows: bit j of row i is set
+// iff bucket 1 can hold sum i and bucket 2 can hold sum j at the same time
+// (bucket 3 takes the rest). A layer covers sums [0, ti] x [0, tj].
+typedef unsigned long long word;
 
-    for (int i = 1; i < argc; i++) {
-        if (strcmp(argv[i], "-test") == 0) {
-            if (i + 1 < argc) {
-                sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
-                sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
-                i++; 
-            } else {
-                cerr << "Error: -test option requires an argument." << endl;
-                return 1;
+struct Layer {
+    int rows;           // ti + 1
+    int W;              // words per row
+    word last_mask;     // valid bits of the last word in a row
+    word* bits;
+};
+
+const int MAX_K = 16;
+int K = 3;              // number of buckets (-k)
+
+// -mode: how K = 3 is solved. Dense: bit rows over the whole (target + 1)^2
+// grid for every item. Sparse: only the reachable sorted sum tuples (the
+// engine of K != 3). Auto: sparse while the frontier is small, handing over to
+// the bit rows once it holds more than DENSE_SWITCH of the grid (a hash-set
+// state costs about as much as a few thousand bit-row bits per item), unless
+// the bit rows would not fit into the -mem budget.
+enum { MODE_AUTO, MODE_DENSE, MODE_SPARSE };
+int dp_mode = MODE_AUTO;
+bool use_reduce = true; // -no-reduce: solve the instance as read (see reduce.h)
+const double DENSE_SWITCH = 1.0 / 16384;
+const size_t SPARSE_MAX_STATES = (size_t)1 << 24;  // auto: states kept over all layers
+size_t mem_budget = (size_t)2048 << 20;             // -mem: bytes for the bit rows / tuple sets
+int* numbers;
+int* belong_to;         // record which bucket (1..K) the k-th number belongs to
+
+Layer new_layer(int ti, int tj) {
+    Layer L;
+    L.rows = ti + 1;
+    L.W = tj / 64 + 1;
+    L.last_mask = ((tj + 1) % 64 == 0) ? ~0ULL : ((1ULL << ((tj + 1) % 64)) - 1);
+    size_t total = (size_t)L.rows * L.W;
+    L.bits = new word[total];
+    memset(L.bits, 0, total * sizeof(word));
+    L.bits[0] = 1ULL; // Initialization: (0, 0) is reachable with no items
+    return L;
+}
+
+// Bytes of the two full bit-row layers the top-level split keeps alive
+double dense_bytes(int ti, int tj) {
+    return 2.0 * ((double)ti + 1) * (tj / 64 + 1) * sizeof(word);
+}
+
+void out_of_budget(const char* what) {
+    cerr << "Error: " << what << " exceed the memory budget of " << (mem_budget >> 20)
+         << " MB (-mem)." << endl;
+    exit(1);
+}
+
+// Allocation failures below the budget (less free memory than -mem) end the
+// run with an error instead of an uncaught std::bad_alloc
+void out_of_memory() {
+    cerr << "Error: out of memory (lower -mem to fail early)." << endl;
+    exit(1);
+}
+
+inline bool get_bit(const Layer& L, int i, int j) {
+    return (L.bits[(size_t)i * L.W + (j >> 6)] >> (j & 63)) & 1ULL;
+}
+
+// row |= row << val, in place. Words are visited high to low so every
+// source word is read before it is overwritten.
+void shift_or(word* row, int W, word last_mask, int val) {
+    int ws = val >> 6, bs = val & 63;
+    for (int w = W - 1; w >= ws; w--) {
+        word v = row[w - ws] << bs;
+        if (bs != 0 && w - ws - 1 >= 0) v |= row[w - ws - 1] >> (64 - bs);
+        row[w] |= v;
+    }
+    row[W - 1] &= last_mask;
+}
+
+// Apply one item to a layer in place:
+// new[i][j] = old[i][j] | old[i - val][j] | old[i][j - val].
+// Rows are visited high to low, so row i - val is still the old row.
+// Rows above hi_row are unreachable and skipped.
+void add_item(Layer& L, int val, int hi_row) {
+    int W = L.W;
+    for (int i = hi_row; i >= 0; i--) {
+        word* row = L.bits + (size_t)i * W;
+        shift_or(row, W, L.last_mask, val);       // Option 2: Put into Bucket 2
+        if (i >= val) {                           // Option 1: Put into Bucket 1
+            const word* src = L.bits + (size_t)(i - val) * W;
+            for (int w = 0; w < W; w++) row[w] |= src[w];
+        }
+        // Option 3: Put into Bucket 3 keeps the old bit
+    }
+}
+
+// Reachable (bucket 1, bucket 2) sums over numbers[lo..hi), bounded by (ti, tj)
+Layer build_layer(int lo, int hi, int ti, int tj) {
+    Layer L = new_layer(ti, tj);
+    long long prefix = 0;
+    for (int k = lo; k < hi; k++) {
+        prefix += numbers[k];
+        add_item(L, numbers[k], prefix < ti ? (int)prefix : ti);
+    }
+    return L;
+}
+
+// Find (a, b) with F[a][b] and B[ti - a][tj - b], i.e. a split of the
+// bucket targets between the two halves of the items.
+bool find_split(const Layer& F, const Layer& B, int ti, int tj, int& a, int& b) {
+    for (int i = 0; i <= ti; i++) {
+        const word* row = F.bits + (size_t)i * F.W;
+        for (int w = 0; w < F.W; w++) {
+            word bitsw = row[w];
+            while (bitsw) {
+                int j = w * 64 + __builtin_ctzll(bitsw);
+                bitsw &= bitsw - 1;
+                if (j > tj) break;
+                if (get_bit(B, ti - i, tj - j)) {
+                    a = i; b = j;
+                    return true;
+                }
             }
         }
     }
+    return false;
+}
 
-    ifstream fin(input_path);
-    ofstream fout(output_path);
+// Hirschberg-style reconstruction: numbers[lo..hi) must fill bucket 1 with
+// exactly ti and bucket 2 with exactly tj. Split the items in half, find how
+// the targets divide between the halves, free both layers and recurse.
+// Only two layers are alive at a time, and they shrink at every level,
+// so no N x target x target path table is needed.
+bool solve(int lo, int hi, int ti, int tj) {
+    if (hi - lo == 1) {
+        int val = numbers[lo];
+        if (ti == val && tj == 0) belong_to[lo] = 1;
+        else if (tj == val && ti == 0) belong_to[lo] = 2;
+        else if (ti == 0 && tj == 0) belong_to[lo] = 3;
+        else return false;
+        return true;
+    }
 
-    if (!fin.is_open()) {
-        cerr << "Error: Cannot open input file: " << input_path << endl;
-        return 1;
+    int mid = (lo + hi) / 2;
+    Layer F = build_layer(lo, mid, ti, tj);
+    Layer B = build_layer(mid, hi, ti, tj);
+    int a = 0, b = 0;
+    bool ok = find_split(F, B, ti, tj, a, b);
+    delete[] F.bits;
+    delete[] B.bits;
+    if (!ok) return false;
+
+    return solve(lo, mid, a, b) && solve(mid, hi, ti - a, tj - b);
+}
+
+// K-way partition (-k other than 3). The dense (target + 1)^(K - 1) table does
+// not scale with K, so a layer is instead the set of reachable bucket-sum tuples
+// after the first i items, in canonical form: sums sorted descending, the
+// smallest left out (it is the prefix sum minus the others). Canonical tuples
+// merge the K! relabelings of a state, and only reachable states are stored.
+struct TupleSet {
+    int width;              // ints per tuple (K - 1)
+    size_t cap;             // slots, a power of two
+    size_t count;
+    int* keys;              // cap * width
+    unsigned char* used;
+};
+
+size_t set_bytes = 0;   // bytes of all live tuple sets, bounded by -mem
+
+TupleSet new_set(int width, size_t cap) {
+    TupleSet S;
+    S.width = width;
+    S.cap = cap;
+    S.count = 0;
+    set_bytes += cap * (width * sizeof(int) + 1);
+    if (set_bytes > mem_budget) {
+        out_of_budget("the sparse DP layers");
     }
-    if (!fout.is_open()) {
-        cerr << "Error: Cannot open output file: " << output_path << endl;
-        return 1;
+    S.keys = new int[cap * width];
+    S.used = new unsigned char[cap];
+    memset(S.used, 0, cap);
+    return S;
+}
+
+void free_set(TupleSet& S) {
+    set_bytes -= S.cap * (S.width * sizeof(int) + 1);
+    delete[] S.keys;
+    delete[] S.used;
+}
+
+size_t tuple_hash(const int* t, int width) {
+    unsigned long long h = 0;
+    for (int i = 0; i < width; i++) h = (h ^ (unsigned int)t[i]) * 0x9E3779B97F4A7C15ULL;
+    return (size_t)(h ^ (h >> 29));
+}
+
+bool set_contains(const TupleSet& S, const int* t) {
+    size_t mask = S.cap - 1;
+    for (size_t slot = tuple_hash(t, S.width) & mask; S.used[slot]; slot = (slot + 1) & mask) {
+        if (memcmp(S.keys + slot * S.width, t, S.width * sizeof(int)) == 0) return true;
     }
+    return false;
+}
 
-    int N;
-    if (!(fin >> N)) return 0;
+void set_insert(TupleSet& S, const int* t);
 
-    int* numbers = new int[N + 1]; 
-    int sum = 0;
-    
-    for (int i = 1; i <= N; i++) {
-        fin >> numbers[i];
-        sum += numbers[i];
+void set_grow(TupleSet& S) {
+    TupleSet bigger = new_set(S.width, S.cap * 2);
+    for (size_t slot = 0; slot < S.cap; slot++) {
+        if (S.used[slot]) set_insert(bigger, S.keys + slot * S.width);
     }
+    free_set(S);
+    S = bigger;
+}
 
-    if (sum % 3 != 0) {
-        fout << "no" << endl;
-        fin.close(); fout.close();
-        delete[] numbers;
-        return 0;
+void set_insert(TupleSet& S, const int* t) {
+    if (2 * (S.count + 1) > S.cap) set_grow(S);
+    size_t mask = S.cap - 1;
+    size_t slot = tuple_hash(t, S.width) & mask;
+    for (; S.used[slot]; slot = (slot + 1) & mask) {
+        if (memcmp(S.keys + slot * S.width, t, S.width * sizeof(int)) == 0) return;
     }
+    S.used[slot] = 1;
+    memcpy(S.keys + slot * S.width, t, S.width * sizeof(int));
+    S.count++;
+}
 
-    int target = sum / 3;
+// Canonical tuple of K labeled sums: sorted descending, smallest dropped
+void canonical(const int* sums, int* t) {
+    int sorted[MAX_K];
+    for (int b = 0; b < K; b++) {
+        int v = sums[b], j = b;
+        for (; j > 0 && sorted[j - 1] < v; j--) sorted[j] = sorted[j - 1];
+        sorted[j] = v;
+    }
+    memcpy(t, sorted, (K - 1) * sizeof(int));
+}
 
-    // Dynamic allocation of 3D array
-    char*** path = new char**[N + 1];
-    bool** dp = new bool*[target + 1]; // Current DP state
+// Expands a canonical tuple back to K sums (prefix = sum of all K)
+void expand(const int* t, long long prefix, int* sums) {
+    long long rest = prefix;
+    for (int b = 0; b < K - 1; b++) {
+        sums[b] = t[b];
+        rest -= t[b];
+    }
+    sums[K - 1] = (int)rest;
+}
 
-    for (int i = 0; i <= target; i++) {
-        dp[i] = new bool[target + 1];
-        for (int j = 0; j <= target; j++) {
-            dp[i][j] = false;
+// Labels numbers[0..i) with their buckets by walking back through the stored
+// layers; sums[] holds the labeled bucket sums after those items
+void backtrack(TupleSet* layers, int i, int* sums) {
+    int t[MAX_K];
+    for (int k = i - 1; k >= 0; k--) {
+        int val = numbers[k];
+        for (int b = 0; b < K; b++) {
+            if (sums[b] < val) continue;
+            sums[b] -= val;
+            canonical(sums, t);
+            if (set_contains(layers[k], t)) {
+                belong_to[k] = b + 1;
+                break;
+            }
+            sums[b] += val;
         }
     }
+}
 
-    for (int k = 0; k <= N; k++) {
-        path[k] = new char*[target + 1];
-        for (int i = 0; i <= target; i++) {
-            path[k][i] = new char[target + 1];
-            // Initialize with 0
-            for(int j = 0; j <= target; j++) path[k][i][j] = 0;
+// Bit-row layer over numbers[at..hi) that starts from the sparse frontier
+// after numbers[0..at) instead of from (0, 0). Any of a state's three labeled
+// sums may end up in bucket 3, so every ordered pair of them is seeded.
+Layer build_seeded(const TupleSet& frontier, long long prefix, int at, int hi, int ti, int tj) {
+    Layer L = new_layer(ti, tj);
+    L.bits[0] = 0;
+    int sums[MAX_K];
+    for (size_t slot = 0; slot < frontier.cap; slot++) {
+        if (!frontier.used[slot]) continue;
+        expand(frontier.keys + slot * frontier.width, prefix, sums);
+        for (int a = 0; a < 3; a++) {
+            for (int b = 0; b < 3; b++) {
+                if (a == b || sums[a] > ti || sums[b] > tj) continue;
+                L.bits[(size_t)sums[a] * L.W + (sums[b] >> 6)] |= 1ULL << (sums[b] & 63);
+            }
         }
     }
+    long long reach = prefix;   // no bucket sum exceeds the items so far
+    for (int k = at; k < hi; k++) {
+        reach += numbers[k];
+        add_item(L, numbers[k], reach < ti ? (int)reach : ti);
+    }
+    return L;
+}
 
-    // Initialization
-    dp[0][0] = true; 
+// Hirschberg split as in solve(), for K = 3 after -mode auto switched to the
+// bit rows: numbers[0..at) are covered by the stored sparse layers, and
+// numbers[0..hi) must fill bucket 1 with exactly ti and bucket 2 with tj.
+bool solve_seeded(TupleSet* layers, int at, long long prefix, int hi, int ti, int tj) {
+    if (hi == at) {
+        int sums[MAX_K] = {ti, tj, (int)(prefix - ti - tj)};
+        int t[MAX_K];
+        canonical(sums, t);
+        if (sums[2] < 0 || !set_contains(layers[at], t)) return false;
+        backtrack(layers, at, sums);
+        return true;
+    }
 
-    // DP Transitions
-    for (int k = 1; k <= N; k++) {
-        int val = numbers[k];      
-        bool** next_dp = new bool*[target + 1];
-        for(int i=0; i<=target; i++) {
-            next_dp[i] = new bool[target+1];
-            for(int j=0; j<=target; j++) next_dp[i][j] = false;
-        }
+    int mid = (at + hi) / 2;
+    Layer F = build_seeded(layers[at], prefix, at, mid, ti, tj);
+    Layer B = build_layer(mid, hi, ti, tj);
+    int a = 0, b = 0;
+    bool ok = find_split(F, B, ti, tj, a, b);
+    delete[] F.bits;
+    delete[] B.bits;
+    if (!ok) return false;
 
-        for (int i = 0; i <= target; i++) {
-            for (int j = 0; j <= target; j++) {
-                if (dp[i][j]) { // If previous state was reachable
-                    
-                    // Option 1: Put into Bucket 1
-                    if (i + val <= target) {
-                        next_dp[i + val][j] = true;
-                        path[k][i + val][j] = 1; 
-                    }
+    return solve_seeded(layers, at, prefix, mid, a, b) && solve(mid, hi, ti - a, tj - b);
+}
 
-                    // Option 2: Put into Bucket 2
-                    if (j + val <= target) {
-                        next_dp[i][j + val] = true;
-                        path[k][i][j + val] = 2;
-                    }
+// Layered reachability over numbers[] (sorted descending), then a backward
+// walk through the stored layers to label every item with its bucket.
+// With may_switch (K = 3), the frontier is handed to the bit rows once it is
+// too dense for a hash set to beat them.
+bool solve_sparse(int N, int target, bool may_switch) {
+    int width = K - 1;
+    TupleSet* layers = new TupleSet[N + 1];
+    int sums[MAX_K], t[MAX_K];
+    layers[0] = new_set(width, 16);
+    for (int b = 0; b < K; b++) sums[b] = 0;
+    canonical(sums, t);
+    set_insert(layers[0], t);
 
-                    // Option 3: Put into Bucket 3
-                    next_dp[i][j] = true; 
-                    path[k][i][j] = 3;
+    double dense_states = DENSE_SWITCH * ((double)target + 1) * ((double)target + 1);
+    size_t stored = 1;
+    long long prefix = 0;
+    int built = 1;
+    int switch_at = -1;
+    bool ok = true;
+    for (int i = 0; i < N && ok; i++) {
+        int val = numbers[i];
+        bool last = i + 1 == N;
+        int min_rest = numbers[N - 1];   // smallest remaining value (sorted descending)
+        TupleSet& cur = layers[i];
+        TupleSet next = new_set(width, cur.cap);
+        for (size_t slot = 0; slot < cur.cap; slot++) {
+            if (!cur.used[slot]) continue;
+            expand(cur.keys + slot * width, prefix, sums);
+            for (int b = 0; b < K; b++) {
+                // Equal sums give the same canonical state: try one of them
+                bool seen = false;
+                for (int c = 0; c < b; c++) {
+                    if (sums[c] == sums[b]) { seen = true; break; }
                 }
+                if (seen || sums[b] + val > target) continue;
+                sums[b] += val;
+                // A non-zero deficit can never be filled after the last item, or
+                // when it is below the smallest remaining value (a 0 fills nothing,
+                // so it never proves a deficit dead)
+                bool dead = false;
+                for (int c = 0; c < K; c++) {
+                    int d = target - sums[c];
+                    if (d != 0 && (last || d < min_rest)) { dead = true; break; }
+                }
+                if (!dead) {
+                    canonical(sums, t);
+                    set_insert(next, t);
+                }
+                sums[b] -= val;
             }
         }
-        
-        // Update dp table for next iteration
-        for(int i=0; i<=target; i++) {
-            for(int j=0; j<=target; j++) {
-                dp[i][j] = next_dp[i][j];
-            }
-            delete[] next_dp[i];
-        }
-        delete[] next_dp;
-    }
-
-    // Check result
-    if (dp[target][target]) {
-        fout << "yes" << endl;
-        
-        // Reconstruct solution
-        int* out1 = new int[N]; int c1 = 0;
-        int* out2 = new int[N]; int c2 = 0;
-        int* out3 = new int[N]; int c3 = 0;
-
-        int curr_i = target;
-        int curr_j = target;
-
-        for (int k = N; k >= 1; k--) {
-            int choice = path[k][curr_i][curr_j];
-            int val = numbers[k];
-            
-            if (choice == 1) {
-                out1[c1++] = val;
-                curr_i -= val;
-            } else if (choice == 2) {
-                out2[c2++] = val;
-                curr_j -= val;
-            } else {
-                out3[c3++] = val;
-                // curr_i and curr_j do not change
-            }
+        prefix += val;
+        layers[i + 1] = next;
+        built++;
+        stored += next.count;
+        if (next.count == 0) {
+            ok = false;
+        } else if (may_switch && i + 1 < N
+                   && (next.count > dense_states || stored > SPARSE_MAX_STATES)
+                   // The stored layers stay alive next to the bit rows; if both
+                   // do not fit, stay on the frontier
+                   && set_bytes + dense_bytes(target, target) <= mem_budget) {
+            switch_at = i + 1;
+            break;
         }
+    }
+
+    if (ok && switch_at >= 0) {
+        // The bit rows bound their live rows by the prefix sum, so they take the
+        // rest smallest first
+        for (int lo = switch_at, hi = N - 1; lo < hi; lo++, hi--) {
+            int tmp = numbers[lo]; numbers[lo] = numbers[hi]; numbers[hi] = tmp;
+        }
+        ok = solve_seeded(layers, switch_at, prefix, N, target, target);
+    } else if (ok) {
+        for (int b = 0; b < K; b++) sums[b] = target;
+        canonical(sums, t);
+        ok = set_contains(layers[N], t);
+        if (ok) backtrack(layers, N, sums);
+    }
+
+    for (int i = 0; i < built; i++) free_set(layers[i]);
+    delete[] layers;
+    return ok;
+}
+
+int compare_desc(const void* a, const void* b) {
+    return (*(int*)b - *(int*)a);
+}
+
+// Solve one part of an instance (see reduce.h): values[] come back in the
+// order of numbers[], bucket[i] is the bucket (0..K-1) of values[i]
+bool solve_values(long long* values, int n, int* bucket) {
+    if (!fits_int(values, n, K)) {
+        cerr << "Error: values or target exceed the int range of the DP." << endl;
+        exit(1);
+    }
+    int N = n;
+    numbers = new int[N];
+    belong_to = new int[N];
+    long long sum = 0;
+    int max_val = 0;
 
-        // Output Bucket 1
-        for(int i=0; i<c1; i++) fout << (i==0?"":" ") << out1[i]; fout << endl;
-        // Output Bucket 2
-        for(int i=0; i<c2; i++) fout << (i==0?"":" ") << out2[i]; fout << endl;
-        // Output Bucket 3
-        for(int i=0; i<c3; i++) fout << (i==0?"":" ") << out3[i]; fout << endl;
+    for (int i = 0; i < N; i++) {
+        numbers[i] = (int)values[i];
+        sum += numbers[i];
+        belong_to[i] = 0;
+        if (numbers[i] > max_val) max_val = numbers[i];
+    }
 
-        delete[] out1; delete[] out2; delete[] out3;
+    // Basic checks: a number larger than the target can never be placed
+    if (sum % K != 0 || N < K || max_val > sum / K) {
+        delete[] numbers; delete[] belong_to;
+        return false;
+    }
 
+    int target = (int)(sum / K);
+
+    bool found;
+    if (K == 3 && dp_mode == MODE_DENSE) {
+        if (dense_bytes(target, target) > mem_budget) {
+            out_of_budget("the (target + 1)^2 bit rows");
+        }
+        // The top-level split also answers the decision problem
+        found = solve(0, N, target, target);
     } else {
-        fout << "no" << endl;
+        // Largest first keeps the tuple layers small
+        qsort(numbers, N, sizeof(int), compare_desc);
+        found = solve_sparse(N, target, K == 3 && dp_mode == MODE_AUTO);
+    }
+
+    if (found) {
+        for (int i = 0; i < N; i++) {
+            values[i] = numbers[i];
+            bucket[i] = belong_to[i] - 1;
+        }
     }
 
     // Cleanup memory
-    for (int i = 0; i <= target; i++) delete[] dp[i];
-    delete[] dp;
-    
-    for (int k = 0; k <= N; k++) {
-        for (int i = 0; i <= target; i++) delete[] path[k][i];
-        delete[] path[k];
-    }
-    delete[] path;
     delete[] numbers;
+    delete[] belong_to;
+
+    return found;
+}
+
+// Solve one instance read from fin (a text stream or a PackCursor) and write
+// its record to fout. Returns false if no instance could be read (end of input).
+template <class Input>
+bool solve_instance(Input& fin, ostream& fout) {
+    int N;
+    if (!(fin >> N)) return false;
+
+    long long* values = new long long[N];
+    int* bucket = new int[N];
+    for (int i = 0; i < N; i++) fin >> values[i];
+
+    bool found = use_reduce ? solve_reduced(values, N, K, solve_values, bucket, true)
+                            : part_ok(values, N, K) && solve_values(values, N, bucket);
+    write_result(fout, found, values, N, bucket, K);
+
+    delete[] values;
+    delete[] bucket;
+    return true;
+}
+
+int main(int argc, char* argv[]) {
+    char input_path[256] = "../../testcases/1.in";
+    char output_path[256] = "../../testcases/1.out";
+    bool stream = false;
+    bool custom_in = false, custom_out = false;
+    const char* pack_path = NULL;
+    long long pack_index = -1;
+    set_new_handler(out_of_memory);
+
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "-test") == 0) {
+            if (i + 1 < argc) {
+                // -test 1 -> read ../../testcases/1.in, unless -in/-out override a path
+                if (!custom_in) sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
+                if (!custom_out) sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
+                i++; 
+            } else {
+                cerr << "Error: -test option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-in") == 0) {
+            // Override the input path (in -stream mode: a file of concatenated instances)
+            if (i + 1 < argc) {
+                snprintf(input_path, sizeof(input_path), "%s", argv[i+1]);
+                custom_in = true;
+                i++;
+            } else {
+                cerr << "Error: -in option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-out") == 0) {
+            // Override the output path, e.g., so concurrent runs do not share a .out file
+            if (i + 1 < argc) {
+                snprintf(output_path, sizeof(output_path), "%s", argv[i+1]);
+                custom_out = true;
+                i++;
+            } else {
+                cerr << "Error: -out option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-pack") == 0) {
+            // Read the instances from a packed binary file (see pack_reader.h)
+            if (i + 1 < argc) {
+                pack_path = argv[i+1];
+                i++;
+            } else {
+                cerr << "Error: -pack option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-index") == 0) {
+            // Only solve instance <k> (0-based) of the -pack file
+            if (i + 1 < argc && atoll(argv[i+1]) >= 0) {
+                pack_index = atoll(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -index option requires a non-negative integer." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-stream") == 0) {
+            stream = true;
+        } else if (strcmp(argv[i], "-no-reduce") == 0) {
+            use_reduce = false;
+        } else if (strcmp(argv[i], "-mode") == 0) {
+            // K = 3 engine: auto (default), dense or sparse
+            if (i + 1 < argc && strcmp(argv[i+1], "auto") == 0) dp_mode = MODE_AUTO;
+            else if (i + 1 < argc && strcmp(argv[i+1], "dense") == 0) dp_mode = MODE_DENSE;
+            else if (i + 1 < argc && strcmp(argv[i+1], "sparse") == 0) dp_mode = MODE_SPARSE;
+            else {
+                cerr << "Error: -mode option requires auto, dense or sparse." << endl;
+                return 1;
+            }
+            i++;
+        } else if (strcmp(argv[i], "-mem") == 0) {
+            // Memory budget in MB for the DP layers (default: 2048)
+            if (i + 1 < argc && atoi(argv[i+1]) > 0) {
+                mem_budget = (size_t)atoi(argv[i+1]) << 20;
+                i++;
+            } else {
+                cerr << "Error: -mem option requires a positive integer." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-k") == 0) {
+            // Number of buckets (default: 3; others always use tuple sets)
+            if (i + 1 < argc && atoi(argv[i+1]) >= 2 && atoi(argv[i+1]) <= MAX_K) {
+                K = atoi(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -k option requires an integer in [2, " << MAX_K << "]." << endl;
+                return 1;
+            }
+        }
+    }
+
+    if (pack_path != NULL) {
+        // Pack mode: solve every instance of the pack (or only -index) and write
+        // one record per instance to stdout (or the -out file), as in stream mode
+        PackCursor pack;
+        if (!pack.open(pack_path)) {
+            cerr << "Error: Cannot open pack file: " << pack_path << endl;
+            return 1;
+        }
+        if (pack_index >= 0 && !pack.select((unsigned long long)pack_index)) {
+            cerr << "Error: -index " << pack_index << " out of range." << endl;
+            pack.close();
+            return 1;
+        }
+        ofstream pout;
+        if (custom_out) {
+            pout.open(output_path);
+            if (!pout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                pack.close();
+                return 1;
+            }
+        }
+        ostream& out = custom_out ? (ostream&)pout : cout;
+        while (solve_instance(pack, out)) {
+            out.flush();
+        }
+        pack.close();
+        return 0;
+    }
+
+    if (stream) {
+        // Stream mode: read a sequence of instances ("N a1 ... aN" each) from stdin
+        // (or the -in file) and write one record per instance to stdout (or the -out file).
+        // Every record is flushed immediately so a caller can pipe instances one by one.
+        ifstream sin;
+        ofstream sout;
+        if (custom_in) {
+            sin.open(input_path);
+            if (!sin.is_open()) {
+                cerr << "Error: Cannot open input file: " << input_path << endl;
+                return 1;
+            }
+        }
+        if (custom_out) {
+            sout.open(output_path);
+            if (!sout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                return 1;
+            }
+        }
+        istream& in = custom_in ? (istream&)sin : cin;
+        ostream& out = custom_out ? (ostream&)sout : cout;
+        while (solve_instance(in, out)) {
+            out.flush();
+        }
+        return 0;
+    }
+
+    ifstream fin(input_path);
+    ofstream fout(output_path);
+
+    if (!fin.is_open()) {
+        cerr << "Error: Cannot open input file: " << input_path << endl;
+        return 1;
+    }
+    if (!fout.is_open()) {
+        cerr << "Error: Cannot open output file: " << output_path << endl;
+        return 1;
+    }
+
+    solve_instance(fin, fout);
 
     fin.close();
     fout.close();
 
     return 0;
-}
\ No newline at end of file
+}
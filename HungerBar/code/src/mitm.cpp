@@ -0,0 +1,611 @@
+// Meet-in-the-middle solution (exact, 64-bit values)
+#include <iostream>
+#include <cstdlib>
+#include <fstream>
+#include <cstring>
+#include <cstdio>
+#include <algorithm>
+#include <queue>
+#include <vector>
+
+#include "pack_reader.h"
+#include "reduce.h"
+
+using namespace std;
+
+// One assignment of a half: bucket 1 sum, bucket 2 sum and the base-3 code
+// of the assignment (digit k = bucket of the k-th item of the half).
+struct Entry {
+    long long s1, s2;
+    unsigned long long code;
+};
+
+bool entry_less(const Entry& a, const Entry& b) {
+    return a.s1 < b.s1 || (a.s1 == b.s1 && a.s2 < b.s2);
+}
+
+bool entry_same(const Entry& a, const Entry& b) {
+    return a.s1 == b.s1 && a.s2 == b.s2;
+}
+
+// Head of a spilled run in the k-way merge heap (smallest entry on top)
+struct RunHead {
+    Entry e;
+    int run;
+    bool operator<(const RunHead& o) const { return entry_less(o.e, e); }
+};
+
+// Entries are collected in runs of run_entries (24 bytes each, plus up to
+// 32 bytes of hash index). If a half produces more than one run, every sorted
+// run is spilled to a temporary file and the runs are read back with a k-way
+// merge, so memory stays bounded by the -mem budget.
+const size_t ENTRY_BUDGET = sizeof(Entry) + 4 * sizeof(unsigned long long);
+size_t run_entries = ((size_t)1024 << 20) / ENTRY_BUDGET;
+const size_t READ_BUFFER = 4096;
+// The base-3 code of a half must fit into 64 bits: 3^40 < 2^64 < 3^41. Far
+// below this the 3^(N/2) enumeration is already out of reach (see README).
+const int MAX_HALF = 40;
+const int MAX_N = 2 * MAX_HALF;
+
+struct RunFile {
+    FILE* f;
+    Entry* buf;
+    size_t len, at;
+};
+
+struct SortedRuns {
+    Entry* buf;
+    size_t count;
+    RunFile* runs;
+    int num_runs, cap_runs;
+    size_t mem_at;   // read cursor when the half fit into a single in-memory run
+    priority_queue<RunHead> heads;
+
+    void init() {
+        buf = new Entry[run_entries];
+        count = 0;
+        cap_runs = 16;
+        runs = new RunFile[cap_runs];
+        num_runs = 0;
+        mem_at = 0;
+    }
+
+    // Sort the current run and drop entries with the same (s1, s2)
+    void sort_unique() {
+        sort(buf, buf + count, entry_less);
+        size_t w = 0;
+        for (size_t r = 0; r < count; r++) {
+            if (w == 0 || !entry_same(buf[w - 1], buf[r])) buf[w++] = buf[r];
+        }
+        count = w;
+    }
+
+    bool spill() {
+        sort_unique();
+        FILE* f = tmpfile();
+        if (f == NULL || fwrite(buf, sizeof(Entry), count, f) != count) {
+            cerr << "Error: Cannot spill sorted run to a temporary file." << endl;
+            return false;
+        }
+        rewind(f);
+        if (num_runs == cap_runs) {
+            RunFile* bigger = new RunFile[cap_runs * 2];
+            memcpy(bigger, runs, sizeof(RunFile) * num_runs);
+            delete[] runs;
+            runs = bigger;
+            cap_runs *= 2;
+        }
+        runs[num_runs].f = f;
+        runs[num_runs].buf = NULL;
+        runs[num_runs].len = runs[num_runs].at = 0;
+        num_runs++;
+        count = 0;
+        return true;
+    }
+
+    bool add(long long s1, long long s2, unsigned long long code) {
+        buf[count].s1 = s1;
+        buf[count].s2 = s2;
+        buf[count].code = code;
+        count++;
+        if (count < run_entries) return true;
+        // Full: compact duplicates first, spill only if that frees too little
+        sort_unique();
+        if (count > run_entries / 2) return spill();
+        return true;
+    }
+
+    // Switch from writing to reading
+    bool finish() {
+        if (num_runs == 0) {
+            sort_unique();
+            return true;
+        }
+        if (count > 0 && !spill()) return false;
+        delete[] buf;
+        buf = NULL;
+        for (int r = 0; r < num_runs; r++) {
+            runs[r].buf = new Entry[READ_BUFFER];
+            push_head(r);
+        }
+        return true;
+    }
+
+    // Push the next entry of run r (if any) onto the merge heap
+    void push_head(int r) {
+        RunFile& run = runs[r];
+        if (run.at == run.len) {
+            run.len = fread(run.buf, sizeof(Entry), READ_BUFFER, run.f);
+            run.at = 0;
+            if (run.len == 0) return;
+        }
+        RunHead head;
+        head.e = run.buf[run.at++];
+        head.run = r;
+        heads.push(head);
+    }
+
+    // Next entry in ascending (s1, s2) order
+    bool next(Entry& e) {
+        if (num_runs == 0) {
+            if (mem_at == count) return false;
+            e = buf[mem_at++];
+            return true;
+        }
+        if (heads.empty()) return false;
+        RunHead head = heads.top();
+        heads.pop();
+        e = head.e;
+        push_head(head.run);
+        return true;
+    }
+
+    void release() {
+        delete[] buf;
+        for (int r = 0; r < num_runs; r++) {
+            fclose(runs[r].f);
+            delete[] runs[r].buf;
+        }
+        delete[] runs;
+    }
+};
+
+// Open-addressing hash index over an in-memory run, keyed by (s1, s2).
+// Used when the first half fits into memory: the second half is then probed
+// entry by entry and never stored, and the search stops at the first match.
+struct HashIndex {
+    const Entry* entries;
+    // Low 32 bits: entry index + 1 (0 = empty); high 32 bits: hash tag, so
+    // most failed probes never touch the entries themselves
+    unsigned long long* slot;
+    size_t mask;
+
+    static size_t hash(long long s1, long long s2) {
+        // splitmix64 finalizer over both sums
+        unsigned long long h = (unsigned long long)s1 * 0x9E3779B97F4A7C15ULL + (unsigned long long)s2;
+        h = (h ^ (h >> 30)) * 0xBF58476D1CE4E5B9ULL;
+        h = (h ^ (h >> 27)) * 0x94D049BB133111EBULL;
+        return (size_t)(h ^ (h >> 31));
+    }
+
+    void build(const Entry* e, size_t count) {
+        entries = e;
+        size_t size = 2;
+        while (size < count * 2) size <<= 1;
+        mask = size - 1;
+        slot = new unsigned long long[size];
+        memset(slot, 0, sizeof(unsigned long long) * size);
+        for (size_t i = 0; i < count; i++) {
+            size_t hv = hash(e[i].s1, e[i].s2);
+            size_t p = hv & mask;
+            while (slot[p] != 0) p = (p + 1) & mask;
+            slot[p] = ((unsigned long long)(hv >> 32) << 32) | (i + 1);
+        }
+    }
+
+    const Entry* find(long long s1, long long s2) const {
+        size_t hv = hash(s1, s2);
+        unsigned long long tag = (unsigned long long)(hv >> 32) << 32;
+        size_t p = hv & mask;
+        while (slot[p] != 0) {
+            if ((slot[p] & 0xFFFFFFFF00000000ULL) == tag) {
+                const Entry& e = entries[(slot[p] & 0xFFFFFFFFULL) - 1];
+                if (e.s1 == s1 && e.s2 == s2) return &e;
+            }
+            p = (p + 1) & mask;
+        }
+        return NULL;
+    }
+
+    void release() {
+        delete[] slot;
+    }
+};
+
+// Global variables
+int N;
+long long* numbers;
+int* belong_to; // record which bucket (1..3) the i-th number belongs to
+long long target;
+unsigned long long match_left, match_right; // codes of the matching half assignments
+bool use_reduce = true; // -no-reduce: solve the instance as read (see reduce.h)
+bool part_failed;       // a part could not be solved (set by solve_values, reset per instance)
+int failed_instances = 0;
+
+// Enumerate every assignment of numbers[lo..hi) that keeps all three buckets
+// within target (iterative DFS with capacity pruning) and emit it as
+// (bucket 1 sum, bucket 2 sum).
+// - First half: buckets are labeled in order of first use (item 0 goes to
+//   bucket 1, bucket 3 only after bucket 2), which removes the 3! bucket
+//   relabelings. Entries are added to out.
+// - Second half with an index: each assignment is looked up as
+//   (target - s1, target - s2); returns 1 on the first match.
+// - Second half without an index: the mirrored key is added to out for the
+//   sort-merge join.
+// Returns 0 when the enumeration is exhausted, -1 on error.
+int enumerate_half(int lo, int hi, bool first_half, SortedRuns* out, const HashIndex* index) {
+    int m = hi - lo;
+
+    int* choice = new int[m + 1];
+    int* used = new int[m + 1];   // buckets opened by items before k (first half)
+    long long s[3] = {0, 0, 0};
+    unsigned long long* pow3 = new unsigned long long[m + 1];
+    pow3[0] = 1;
+    for (int k = 1; k <= m; k++) pow3[k] = pow3[k - 1] * 3;
+    unsigned long long code = 0;
+
+    int status = 0;
+    int k = 0;
+    choice[0] = -1;
+    used[0] = 0;
+    while (k >= 0) {
+        if (k == m) {
+            if (index != NULL) {
+                const Entry* e = index->find(target - s[0], target - s[1]);
+                if (e != NULL) {
+                    match_left = e->code;
+                    match_right = code;
+                    status = 1;
+                    break;
+                }
+            } else {
+                bool emitted = first_half ? out->add(s[0], s[1], code)
+                                          : out->add(target - s[0], target - s[1], code);
+                if (!emitted) { status = -1; break; }
+            }
+            k--;
+            continue;
+        }
+        // Backtrack the previous choice of this item
+        if (choice[k] >= 0) {
+            s[choice[k]] -= numbers[lo + k];
+            code -= (unsigned long long)choice[k] * pow3[k];
+        }
+        int b = choice[k] + 1;
+        int last = first_half ? min(2, used[k]) : 2;
+        while (b <= last && numbers[lo + k] > target - s[b]) b++;
+        if (b > last) {
+            choice[k] = -1;
+            k--;
+            continue;
+        }
+        choice[k] = b;
+        s[b] += numbers[lo + k];
+        code += (unsigned long long)b * pow3[k];
+        used[k + 1] = max(used[k], b + 1);
+        k++;
+        if (k < m) choice[k] = -1;
+    }
+
+    delete[] choice;
+    delete[] used;
+    delete[] pow3;
+    return status;
+}
+
+void decode(int lo, int hi, unsigned long long code) {
+    for (int i = lo; i < hi; i++) {
+        belong_to[i] = (int)(code % 3) + 1;
+        code /= 3;
+    }
+}
+
+// Join two sorted halves: a left entry (s1, s2) matches a right entry stored
+// as (target - s1', target - s2'), i.e. s1 + s1' = s2 + s2' = target
+bool merge_join(SortedRuns& left, SortedRuns& right) {
+    Entry el, er;
+    bool has_l = left.next(el), has_r = right.next(er);
+    while (has_l && has_r) {
+        if (entry_less(el, er)) has_l = left.next(el);
+        else if (entry_less(er, el)) has_r = right.next(er);
+        else {
+            match_left = el.code;
+            match_right = er.code;
+            return true;
+        }
+    }
+    return false;
+}
+
+// Solve one part of an instance (see reduce.h): values[] come back in the
+// order of numbers[], bucket[i] is the bucket (0..2) of values[i]
+bool solve_values(long long* values, int n, int* bucket) {
+    if (n > MAX_N) {
+        cerr << "Error: mitm supports at most " << MAX_N << " values per instance (got " << n << ")." << endl;
+        part_failed = true;
+        return false;
+    }
+    N = n;
+    numbers = new long long[N];
+    belong_to = new int[N];
+
+    // The total may exceed 64 bits; the target and the bucket sums (at most
+    // the target) must not
+    __int128 sum = 0;
+    long long max_val = 0;
+    for (int i = 0; i < N; i++) {
+        numbers[i] = values[i];
+        sum += numbers[i];
+        belong_to[i] = 0;
+        if (numbers[i] > max_val) max_val = numbers[i];
+    }
+
+    // Basic checks
+    if (sum % 3 != 0 || N < 3 || max_val > sum / 3) {
+        delete[] numbers; delete[] belong_to;
+        return false;
+    }
+    if (sum / 3 > LLONG_MAX) {
+        cerr << "Error: the target exceeds the 64-bit range of mitm." << endl;
+        delete[] numbers; delete[] belong_to;
+        part_failed = true;
+        return false;
+    }
+    target = (long long)(sum / 3);
+
+    // Sort descending, then deal the items alternately into the two halves
+    // so both halves get a similar mix of large and small values. The stored
+    // first half gets the smaller share (floor(N/2) items).
+    sort(numbers, numbers + N);
+    reverse(numbers, numbers + N);
+    long long* dealt = new long long[N];
+    int h = N / 2, a = 0, b = h;
+    for (int i = 0; i < N; i++) {
+        if (i % 2 == 1) dealt[a++] = numbers[i];
+        else dealt[b++] = numbers[i];
+    }
+    memcpy(numbers, dealt, sizeof(long long) * N);
+    delete[] dealt;
+
+    SortedRuns left;
+    left.init();
+    bool ok = enumerate_half(0, h, true, &left, NULL) == 0 && left.finish();
+    bool found = false;
+
+    if (ok && left.num_runs == 0) {
+        // First half fits in memory: probe it with every second-half assignment
+        HashIndex index;
+        index.build(left.buf, left.count);
+        int status = enumerate_half(h, N, false, NULL, &index);
+        index.release();
+        ok = status >= 0;
+        found = status == 1;
+    } else if (ok) {
+        // First half spilled: sort the second half too and merge both
+        SortedRuns right;
+        right.init();
+        ok = enumerate_half(h, N, false, &right, NULL) == 0 && right.finish();
+        if (ok) found = merge_join(left, right);
+        right.release();
+    }
+    left.release();
+
+    if (found) {
+        decode(0, h, match_left);
+        decode(h, N, match_right);
+    }
+
+    if (!ok) {
+        cerr << "Error: Meet-in-the-middle enumeration failed." << endl;
+        part_failed = true;
+    } else if (found) {
+        for (int i = 0; i < N; i++) {
+            values[i] = numbers[i];
+            bucket[i] = belong_to[i] - 1;
+        }
+    }
+
+    delete[] numbers;
+    delete[] belong_to;
+    return ok && found;
+}
+
+// Solve one instance read from fin (a text stream or a PackCursor) and write
+// its record to fout. Returns false if no instance could be read (end of input).
+// An instance with a part that could not be solved gets the record "error"
+// (and counts in failed_instances), so stream and pack runs go on.
+template <class Input>
+bool solve_instance(Input& fin, ostream& fout) {
+    int n;
+    if (!(fin >> n)) return false;
+
+    long long* values = new long long[n];
+    int* bucket = new int[n];
+    for (int i = 0; i < n; i++) fin >> values[i];
+
+    part_failed = false;
+    bool found = use_reduce ? solve_reduced(values, n, 3, solve_values, bucket, true)
+                            : part_ok(values, n, 3) && solve_values(values, n, bucket);
+    if (!found && part_failed) {
+        fout << "error" << endl;
+        failed_instances++;
+    } else {
+        write_result(fout, found, values, n, bucket, 3);
+    }
+
+    delete[] values;
+    delete[] bucket;
+    return true;
+}
+
+int main(int argc, char* argv[]) {
+    // Faster I/O
+    ios_base::sync_with_stdio(false);
+    cin.tie(NULL);
+
+    char input_path[256] = "../../testcases/1.in";
+    char output_path[256] = "../../testcases/1.out";
+    bool stream = false;
+    bool custom_in = false, custom_out = false;
+    const char* pack_path = NULL;
+    long long pack_index = -1;
+
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "-test") == 0) {
+            if (i + 1 < argc) {
+                // -test 1 -> read ../../testcases/1.in, unless -in/-out override a path
+                if (!custom_in) sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
+                if (!custom_out) sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
+                i++; 
+            } else {
+                cerr << "Error: -test option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-in") == 0) {
+            // Override the input path (in -stream mode: a file of concatenated instances)
+            if (i + 1 < argc) {
+                snprintf(input_path, sizeof(input_path), "%s", argv[i+1]);
+                custom_in = true;
+                i++;
+            } else {
+                cerr << "Error: -in option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-out") == 0) {
+            // Override the output path, e.g., so concurrent runs do not share a .out file
+            if (i + 1 < argc) {
+                snprintf(output_path, sizeof(output_path), "%s", argv[i+1]);
+                custom_out = true;
+                i++;
+            } else {
+                cerr << "Error: -out option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-pack") == 0) {
+            // Read the instances from a packed binary file (see pack_reader.h)
+            if (i + 1 < argc) {
+                pack_path = argv[i+1];
+                i++;
+            } else {
+                cerr << "Error: -pack option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-index") == 0) {
+            // Only solve instance <k> (0-based) of the -pack file
+            if (i + 1 < argc && atoll(argv[i+1]) >= 0) {
+                pack_index = atoll(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -index option requires a non-negative integer." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-stream") == 0) {
+            stream = true;
+        } else if (strcmp(argv[i], "-no-reduce") == 0) {
+            use_reduce = false;
+        } else if (strcmp(argv[i], "-k") == 0) {
+            // Only 3 buckets: the halves enumerate (bucket 1, bucket 2) sum pairs
+            if (i + 1 < argc && atoi(argv[i+1]) == 3) {
+                i++;
+            } else {
+                cerr << "Error: mitm only supports -k 3." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-mem") == 0) {
+            // Memory budget in MB for one in-memory run (default: 1024)
+            if (i + 1 < argc && atoi(argv[i+1]) > 0) {
+                run_entries = ((size_t)atoi(argv[i+1]) << 20) / ENTRY_BUDGET;
+                i++;
+            } else {
+                cerr << "Error: -mem option requires a positive integer." << endl;
+                return 1;
+            }
+        }
+    }
+
+    if (pack_path != NULL) {
+        // Pack mode: solve every instance of the pack (or only -index) and write
+        // one record per instance to stdout (or the -out file), as in stream mode
+        PackCursor pack;
+        if (!pack.open(pack_path)) {
+            cerr << "Error: Cannot open pack file: " << pack_path << endl;
+            return 1;
+        }
+        if (pack_index >= 0 && !pack.select((unsigned long long)pack_index)) {
+            cerr << "Error: -index " << pack_index << " out of range." << endl;
+            pack.close();
+            return 1;
+        }
+        ofstream pout;
+        if (custom_out) {
+            pout.open(output_path);
+            if (!pout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                pack.close();
+                return 1;
+            }
+        }
+        ostream& out = custom_out ? (ostream&)pout : cout;
+        while (solve_instance(pack, out)) {
+            out.flush();
+        }
+        pack.close();
+        return failed_instances > 0 ? 1 : 0;
+    }
+
+    if (stream) {
+        // Stream mode: read a sequence of instances ("N a1 ... aN" each) from stdin
+        // (or the -in file) and write one record per instance to stdout (or the -out file).
+        // Every record is flushed immediately so a caller can pipe instances one by one.
+        ifstream sin;
+        ofstream sout;
+        if (custom_in) {
+            sin.open(input_path);
+            if (!sin.is_open()) {
+                cerr << "Error: Cannot open input file: " << input_path << endl;
+                return 1;
+            }
+        }
+        if (custom_out) {
+            sout.open(output_path);
+            if (!sout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                return 1;
+            }
+        }
+        istream& in = custom_in ? (istream&)sin : cin;
+        ostream& out = custom_out ? (ostream&)sout : cout;
+        while (solve_instance(in, out)) {
+            out.flush();
+        }
+        return failed_instances > 0 ? 1 : 0;
+    }
+
+    ifstream fin(input_path);
+    ofstream fout(output_path);
+
+    if (!fin.is_open()) {
+        cerr << "Error: Cannot open input file: " << input_path << endl;
+        return 1;
+    }
+    if (!fout.is_open()) {
+        cerr << "Error: Cannot open output file: " << output_path << endl;
+        return 1;
+    }
+
+    solve_instance(fin, fout);
+
+    fin.close();
+    fout.close();
+    return failed_instances > 0 ? 1 : 0;
+}
@@ -0,0 +1,143 @@
+// Reader for packed instance files (written by code/test/instance_pack.py)
+//
+// Layout (all integers little-endian):
+//   header  : "TPIB" | u32 version (1) | u64 count | u64 index_offset
+//   values  : the int64 values of every instance, back to back (8-byte aligned)
+//   names   : UTF-8 instance names, back to back
+//   index   : count x (u64 values_offset, u64 n, u64 name_offset, u64 name_len)
+//
+// The file is memory-mapped (read into memory on Windows) and read through a
+// cursor that behaves like an input stream: `cur >> N` yields the size of the
+// next instance, then `cur >> x` yields its values one by one. This lets the
+// solvers' solve_instance() read a pack exactly like a text stream.
+#ifndef PACK_READER_H
+#define PACK_READER_H
+
+#include <cstdio>
+#include <cstring>
+
+#ifndef _WIN32
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+struct PackCursor {
+    const unsigned char* base;
+    size_t size;
+    bool mapped;
+    unsigned long long count;
+    const unsigned long long* index;   // 4 words per instance
+    unsigned long long at, end;        // instances [at, end) are still to be read
+    long long pos;                     // -1: next read is N, otherwise the next value
+    bool ok;
+
+    bool open(const char* path) {
+        base = NULL;
+        size = 0;
+        mapped = false;
+#ifndef _WIN32
+        int fd = ::open(path, O_RDONLY);
+        if (fd < 0) return false;
+        struct stat st;
+        if (fstat(fd, &st) == 0 && st.st_size > 0) {
+            size = (size_t)st.st_size;
+            void* p = mmap(NULL, size, PROT_READ, MAP_PRIVATE, fd, 0);
+            if (p != MAP_FAILED) {
+                base = (const unsigned char*)p;
+                mapped = true;
+            }
+        }
+        ::close(fd);
+#else
+        FILE* f = fopen(path, "rb");
+        if (f == NULL) return false;
+        fseek(f, 0, SEEK_END);
+        size = (size_t)ftell(f);
+        fseek(f, 0, SEEK_SET);
+        unsigned char* buf = new unsigned char[size];
+        if (fread(buf, 1, size, f) == size) base = buf;
+        else delete[] buf;
+        fclose(f);
+#endif
+        if (base == NULL || size < 24 || memcmp(base, "TPIB", 4) != 0) {
+            close();
+            return false;
+        }
+        unsigned int version;
+        unsigned long long index_offset;
+        memcpy(&version, base + 4, 4);
+        memcpy(&count, base + 8, 8);
+        memcpy(&index_offset, base + 16, 8);
+        if (version != 1 || index_offset + count * 32 > size) {
+            close();
+            return false;
+        }
+        index = (const unsigned long long*)(base + index_offset);
+        at = 0;
+        end = count;
+        pos = -1;
+        ok = true;
+        return true;
+    }
+
+    // Restrict reading to the single instance k
+    bool select(unsigned long long k) {
+        if (k >= count) return false;
+        at = k;
+        end = k + 1;
+        pos = -1;
+        return true;
+    }
+
+    // Name of instance k (not NUL-terminated)
+    const char* name(unsigned long long k, size_t& len) const {
+        len = (size_t)index[4 * k + 3];
+        return (const char*)(base + index[4 * k + 2]);
+    }
+
+    bool next_value(long long& x) {
+        if (!ok || at >= end) {
+            ok = false;
+            return false;
+        }
+        const unsigned long long* entry = index + 4 * at;
+        if (pos < 0) {
+            x = (long long)entry[1];
+        } else {
+            x = ((const long long*)(base + entry[0]))[pos];
+        }
+        pos++;
+        if (pos == (long long)entry[1]) {
+            at++;
+            pos = -1;
+        }
+        return true;
+    }
+
+    PackCursor& operator>>(long long& x) {
+        next_value(x);
+        return *this;
+    }
+
+    PackCursor& operator>>(int& x) {
+        long long v;
+        if (next_value(v)) x = (int)v;
+        return *this;
+    }
+
+    operator bool() const { return ok; }
+
+    void close() {
+#ifndef _WIN32
+        if (mapped) munmap((void*)base, size);
+#else
+        delete[] (unsigned char*)base;
+#endif
+        base = NULL;
+        ok = false;
+    }
+};
+
+#endif
@@ -0,0 +1,161 @@
+// Scale reduction shared by the solvers (turned off with -no-reduce)
+//
+// An instance is solved as a tree of parts; bucket b of a part is bucket b of
+// both of its halves, so equal targets of the halves add up to equal sums:
+//   1. Every part's values are divided by their GCD.
+//   2. A part is split by a factor f into the values divisible by f and the
+//      rest if both could be partitioned on their own (see part_ok).
+//      Candidate factors are gcd(largest value, v) over the part, largest
+//      first. This recovers the groups of scaled inputs such as BaseGen.py's
+//      sa1_* (each base group times its own random factor), whose parts then
+//      fit the DP.
+// A split is exact if the rest sums to less than f: every bucket's share of
+// the multiples is divisible by f, so the rest's shares are congruent modulo
+// f, and as they are smaller than f they must be equal. Any other split is a
+// guess; if one of its halves has no solution, the next factor is tried and
+// finally the part is solved whole, so a "no" is never caused by a guess.
+#ifndef REDUCE_H
+#define REDUCE_H
+
+#include <algorithm>
+#include <climits>
+#include <cstring>
+#include <ostream>
+
+// Solves one part: values[0..n) may be reordered, bucket[i] gets the bucket
+// (0..K-1) of values[i]. Returns false if no partition was found.
+typedef bool (*PartSolver)(long long* values, int n, int* bucket);
+
+const int MAX_SPLIT_TRIES = 8;     // splits of a part solved before it is solved whole
+const int MIN_GUESSED_PART = 16;   // values per half of a split that is not exact
+
+inline long long gcd_ll(long long a, long long b) {
+    while (b != 0) {
+        long long t = a % b;
+        a = b;
+        b = t;
+    }
+    return a;
+}
+
+// Divides values[0..n) by their GCD in place and returns it
+inline long long divide_gcd(long long* values, int n) {
+    long long g = 0;
+    for (int i = 0; i < n && g != 1; i++) g = gcd_ll(values[i], g);
+    if (g > 1) {
+        for (int i = 0; i < n; i++) values[i] /= g;
+    }
+    return g > 0 ? g : 1;
+}
+
+
+
+// Basic checks: can values[0..n) be partitioned into K equal sums at all?
+// The sum is taken in units of the GCD, as every bucket sum is a multiple of it.
+// An all-zero part (GCD 0) is partitioned by any assignment. Sums are taken
+// in 128 bits, as the values may use the whole 64-bit range.
+inline bool part_ok(const long long* values, int n, int K) {
+    if (n < K) return false;
+    __int128 sum = 0;
+    long long max_val = 0, g = 0;
+    for (int i = 0; i < n; i++) {
+        sum += values[i];
+        if (values[i] > max_val) max_val = values[i];
+        if (g != 1) g = gcd_ll(values[i], g);
+    }
+    if (g == 0) return true;
+    return (sum / g) % K == 0 && max_val <= sum / K;
+}
+
+// True if every value and the target fit the int arithmetic of dfs/dp/sa
+inline bool fits_int(const long long* values, int n, int K) {
+    __int128 sum = 0;
+    for (int i = 0; i < n; i++) {
+        if (values[i] > INT_MAX) return false;
+        sum += values[i];
+    }
+    return sum / K <= INT_MAX;
+}
+
+// Candidate split factors of values[0..n): the distinct gcds of the largest
+// value with the others, largest first. Returns their count.
+inline int split_factors(const long long* values, int n, long long* cand) {
+    long long largest = 0;
+    for (int i = 0; i < n; i++) {
+        if (values[i] > largest) largest = values[i];
+    }
+    int num_cand = 0;
+    bool skipped = false;
+    for (int i = 0; i < n; i++) {
+        if (values[i] == largest && !skipped) {
+            skipped = true;
+            continue;
+        }
+        long long g = gcd_ll(largest, values[i]);
+        if (g > 1) cand[num_cand++] = g;
+    }
+    std::sort(cand, cand + num_cand);
+    num_cand = (int)(std::unique(cand, cand + num_cand) - cand);
+    std::reverse(cand, cand + num_cand);
+    return num_cand;
+}
+
+// Solves values[0..n) with `solve`, splitting it as described above (only
+// exactly if !guess). The values are restored (in a new order) before
+// returning; on success bucket[i] is the bucket of values[i].
+inline bool solve_reduced(long long* values, int n, int K, PartSolver solve, int* bucket, bool guess) {
+    if (!part_ok(values, n, K)) return false;
+    long long g = divide_gcd(values, n);
+    long long* cand = new long long[n];
+    int num_cand = split_factors(values, n, cand);
+
+    bool ok = false, exact = false;
+    int tries = 0;
+    for (int c = 0; c < num_cand && tries < MAX_SPLIT_TRIES && !ok && !exact; c++) {
+        long long f = cand[c];
+        // Multiples of f first, the rest after them
+        int mid = 0;
+        for (int i = 0; i < n; i++) {
+            if (values[i] % f == 0) std::swap(values[i], values[mid++]);
+        }
+        if (!part_ok(values, mid, K) || !part_ok(values + mid, n - mid, K)) continue;
+        __int128 rest = 0;
+        for (int i = mid; i < n; i++) rest += values[i];
+        exact = rest < f;
+        if (!exact && (!guess || mid < MIN_GUESSED_PART || n - mid < MIN_GUESSED_PART)) continue;
+        tries++;
+        ok = solve_reduced(values, mid, K, solve, bucket, guess)
+             && solve_reduced(values + mid, n - mid, K, solve, bucket + mid, guess);
+    }
+    // A failed exact split proves there is no solution
+    if (!ok && !exact) ok = solve(values, n, bucket);
+
+    if (g > 1) {
+        for (int i = 0; i < n; i++) values[i] *= g;
+    }
+    delete[] cand;
+    return ok;
+}
+
+// Writes one record: "no", or "yes" and the values of each of the K buckets
+inline void write_result(std::ostream& out, bool found, const long long* values, int n,
+                         const int* bucket, int K) {
+    if (!found) {
+        out << "no" << std::endl;
+        return;
+    }
+    out << "yes" << std::endl;
+    for (int b = 0; b < K; b++) {
+        bool first = true;
+        for (int i = 0; i < n; i++) {
+            if (bucket[i] == b) {
+                if (!first) out << " ";
+                out << values[i];
+                first = false;
+            }
+        }
+        out << std::endl;
+    }
+}
+
+#endif
@@ -5,20 +5,111 @@
 #include <fstream>
 #include <algorithm> 
 #include <cstring>
-#include <cstdio>  /
+#include <cstdio>
+#include <cctype>
+#include <climits>
+#include <atomic>
+#include <chrono>
+#include <mutex>
+#include <thread>
+
+#include "pack_reader.h"
+#include "reduce.h"
 
 using namespace std;
 
-// K=3 for the basic task; change to 4, 5... for the Bonus task
-const int K = 3; 
+// K=3 for the basic task; -k 4, 5... for the Bonus task
+const int MAX_K = 16;
+int K = 3;
 const int MAX_N = 10005;
+const double TIME_LIMIT = 0.9;  // Default wall-clock budget per instance (seconds)
+const int CALIBRATION_MOVES = 1000;  // Sampled moves for the automatic initial temperature
+const int CLOCK_EVERY = 4096;        // Moves between deadline checks inside one run
+
+// Annealing schedule (all settable from the command line, see main)
+struct Schedule {
+    double time_limit = TIME_LIMIT;  // Wall-clock budget per instance; 0 = none (needs a move budget)
+    long long move_budget = 0;       // Total moves per instance over all chains; 0 = none
+    double T0 = 0;                   // Initial temperature; 0 = calibrate from sampled move deltas
+    double accept0 = 0.8;            // Calibration: mean uphill acceptance at T0
+    double end_T = 1e-4;             // A run ends (or reheats) below this temperature
+    double alpha = 0.99;             // Cooling factor per move
+    long long run_moves = 0;         // If > 0: moves per run, alpha is derived from T0 and end_T
+    int reheats = 0;                 // Reheats per run before a full restart
+    double reheat_frac = 0.5;        // Reheat to this fraction of T0
+    bool stats = false;              // Print moves/restarts/time per instance to stderr
+};
+Schedule sched;
+
+// Karmarkar-Karp pre-solver (see presolve_kk)
+bool presolve = true;       // -no-kk: start chain 0 from the greedy partition instead
+long long ckk_nodes = 100000;   // -ckk: extra complete-KK search nodes
+long long kk_residual;      // Largest pre-solver residual over the parts of an instance
+bool use_reduce = true;     // -no-reduce: solve the instance as read (see reduce.h)
+
+// Initial state of one annealing run
+enum { INIT_RANDOM, INIT_GREEDY, INIT_PRESOLVED };
 
 int N;
 int numbers[MAX_N];
-int belong_to[MAX_N];       // Records which bucket (0 ~ K-1) each number currently belongs to
-long long bucket_sum[K];    // Current sum of each bucket
+int belong_to[MAX_N];       // Winning assignment: which bucket (0 ~ K-1) each number belongs to
 long long target;           // Target sum for each bucket (Total Sum / K)
-bool found = false;         // Flag to indicate if a solution has been found
+int num_threads = 1;        // Independent SA chains run in parallel
+
+atomic<bool> found(false);  // Set by the first chain that reaches a perfect partition
+atomic<long long> total_moves(0), total_restarts(0);
+double run_T0, run_alpha;   // Schedule resolved for the current part of an instance
+mutex result_lock;
+unsigned long long base_seed;
+chrono::steady_clock::time_point deadline;
+
+// xoshiro256** PRNG: fast, and each chain owns one, unlike the shared global rand()
+struct Rng {
+    unsigned long long s[4];
+
+    static unsigned long long splitmix64(unsigned long long& x) {
+        unsigned long long z = (x += 0x9E3779B97F4A7C15ULL);
+        z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+        z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+        return z ^ (z >> 31);
+    }
+
+    void seed(unsigned long long x) {
+        for (int i = 0; i < 4; i++) s[i] = splitmix64(x);
+    }
+
+    static unsigned long long rotl(unsigned long long x, int k) {
+        return (x << k) | (x >> (64 - k));
+    }
+
+    unsigned long long next() {
+        unsigned long long result = rotl(s[1] * 5, 7) * 9;
+        unsigned long long t = s[1] << 17;
+        s[2] ^= s[0]; s[3] ^= s[1]; s[1] ^= s[2]; s[0] ^= s[3];
+        s[2] ^= t;
+        s[3] = rotl(s[3], 45);
+        return result;
+    }
+
+    // Uniform integer in [0, n)
+    int below(int n) {
+        return (int)(((next() >> 32) * (unsigned long long)n) >> 32);
+    }
+
+    // Uniform double in [0, 1)
+    double real() {
+        return (next() >> 11) * (1.0 / 9007199254740992.0);
+    }
+};
+
+// State of one annealing chain; chains share only the read-only numbers[]
+struct Chain {
+    int* belong_to;
+    long long bucket_sum[MAX_K];
+    Rng rng;
+    long long moves;        // Moves made by this chain on the current instance
+    long long move_limit;   // Its share of the move budget (0 = none)
+};
 
 // Comparison function for descending sort
 bool compare_desc(int a, int b) {
@@ -26,22 +117,230 @@ bool compare_desc(int a, int b) {
 }
 
 // Calculate total difference (Energy/Cost) between all buckets and the target
-long long get_diff() {
+long long get_diff(const Chain& c) {
     long long diff = 0;
     for (int i = 0; i < K; i++) {
-        long long d = bucket_sum[i] - target;
+        long long d = c.bucket_sum[i] - target;
         diff += (d > 0 ? d : -d); // Accumulate absolute difference
     }
     return diff;
 }
 
-// Simulated Annealing core function
-void sa(bool use_greedy) {
+// True once this chain has used up its share of the move budget or the deadline passed
+bool out_of_budget(const Chain& c) {
+    if (c.move_limit > 0 && c.moves >= c.move_limit) return true;
+    return sched.time_limit > 0 && chrono::steady_clock::now() >= deadline;
+}
+
+// Initial temperature from the instance itself: the mean energy increase of
+// sampled uphill moves from a random assignment, scaled so that such a move is
+// accepted with probability accept0 (T0 = mean_delta / -ln(accept0))
+double calibrate_T0(unsigned long long seed) {
+    Rng rng;
+    rng.seed(seed);
+    long long bucket_sum[MAX_K] = {0};
+    int* belong = new int[N];
+    for (int i = 0; i < N; i++) {
+        belong[i] = rng.below(K);
+        bucket_sum[belong[i]] += numbers[i];
+    }
+    double uphill = 0;
+    int count = 0;
+    for (int m = 0; m < CALIBRATION_MOVES; m++) {
+        int idx = rng.below(N);
+        int old_b = belong[idx];
+        int new_b = rng.below(K);
+        if (old_b == new_b) continue;
+        long long old_e = llabs(bucket_sum[old_b] - target) + llabs(bucket_sum[new_b] - target);
+        long long new_e = llabs(bucket_sum[old_b] - numbers[idx] - target)
+                        + llabs(bucket_sum[new_b] + numbers[idx] - target);
+        if (new_e > old_e) {
+            uphill += (double)(new_e - old_e);
+            count++;
+        }
+    }
+    delete[] belong;
+    if (count == 0) return 1.0;
+    return (uphill / count) / -log(sched.accept0);
+}
+
+// Karmarkar-Karp pre-solver. A partial partition holds K slot sums sorted
+// descending; partial i < N is item i alone (in slot 0). KK repeatedly merges
+// the two partials with the largest spread (max - min slot), pairing the
+// largest slot of one with the smallest of the other. With a node budget the
+// search goes on as complete KK: the other slot pairings of every merge are
+// tried depth-first after the KK one. The merge at depth d is stored as
+// partial N + d, so the merge tree of the current path needs no allocation.
+long long* kk_sum;          // (2N - 1) x K slot sums
+int* kk_left;               // per merge: the two merged partials
+int* kk_right;
+int* kk_src_a;              // per merge: source slot in the left / right partial of each slot
+int* kk_src_b;
+int* kk_order;              // live partials by descending spread, in [start, N)
+int* kk_belong;             // best assignment found so far (bucket per item)
+long long kk_best;          // its residual (max - min bucket sum)
+long long kk_nodes, kk_node_limit;
+
+inline long long kk_spread(int p) {
+    return kk_sum[(size_t)p * K] - kk_sum[(size_t)p * K + K - 1];
+}
+
+// Labels every item with its bucket by walking the merge tree below `root`
+void kk_assign(int root) {
+    int* stack_p = new int[2 * N];
+    int* stack_map = new int[(size_t)2 * N * K];   // slot -> bucket of each stacked partial
+    int top = 1;
+    stack_p[0] = root;
+    for (int j = 0; j < K; j++) stack_map[j] = j;
+    while (top > 0) {
+        top--;
+        int p = stack_p[top];
+        int map[MAX_K];
+        memcpy(map, stack_map + (size_t)top * K, K * sizeof(int));
+        if (p < N) {
+            kk_belong[p] = map[0];
+            continue;
+        }
+        int d = p - N;
+        int* left_map = stack_map + (size_t)top * K;
+        int* right_map = stack_map + (size_t)(top + 1) * K;
+        for (int j = 0; j < K; j++) {
+            left_map[kk_src_a[d * K + j]] = map[j];
+            right_map[kk_src_b[d * K + j]] = map[j];
+        }
+        stack_p[top] = kk_left[d];
+        stack_p[top + 1] = kk_right[d];
+        top += 2;
+    }
+    delete[] stack_p;
+    delete[] stack_map;
+}
+
+// Merges the first two live partials with slot j of the left one paired with
+// slot perm[j] of the right one, stores the result as partial N + depth and
+// searches on. Returns true once a perfect partition is found.
+bool kk_search(int start, int depth);
+
+bool kk_merge(int start, int depth, const int* perm) {
+    int a = kk_order[start], b = kk_order[start + 1];
+    int m = N + depth;
+    long long* out = kk_sum + (size_t)m * K;
+    int* src_a = kk_src_a + depth * K;
+    int* src_b = kk_src_b + depth * K;
+    // Insertion sort of the paired slots, descending
+    for (int j = 0; j < K; j++) {
+        long long v = kk_sum[(size_t)a * K + j] + kk_sum[(size_t)b * K + perm[j]];
+        int pos = j;
+        for (; pos > 0 && out[pos - 1] < v; pos--) {
+            out[pos] = out[pos - 1];
+            src_a[pos] = src_a[pos - 1];
+            src_b[pos] = src_b[pos - 1];
+        }
+        out[pos] = v;
+        src_a[pos] = j;
+        src_b[pos] = perm[j];
+    }
+    kk_left[depth] = a;
+    kk_right[depth] = b;
+
+    // Replace the two partials by the merged one, keeping the spread order
+    long long sp = kk_spread(m);
+    int p = start + 2;
+    while (p < N && kk_spread(kk_order[p]) > sp) p++;
+    memmove(kk_order + start + 1, kk_order + start + 2, (p - start - 2) * sizeof(int));
+    kk_order[p - 1] = m;
+    bool done = kk_search(start + 1, depth + 1);
+    memmove(kk_order + start + 2, kk_order + start + 1, (p - start - 2) * sizeof(int));
+    kk_order[start] = a;
+    kk_order[start + 1] = b;
+    return done;
+}
+
+bool kk_search(int start, int depth) {
+    if (start == N - 1) {
+        // One partial left: its slots are the buckets
+        long long residual = kk_spread(kk_order[start]);
+        if (residual < kk_best) {
+            kk_best = residual;
+            kk_assign(kk_order[start]);
+        }
+        return residual == 0;
+    }
+    // Merging with a partial of spread s shrinks the largest spread by at most s
+    long long rest = 0;
+    for (int i = start + 1; i < N; i++) rest += kk_spread(kk_order[i]);
+    if (kk_spread(kk_order[start]) - rest >= kk_best) return false;
+    if (kk_nodes >= kk_node_limit) return false;
+    kk_nodes++;
+
+    // KK pairing first: largest slot with smallest
+    int perm[MAX_K];
+    for (int j = 0; j < K; j++) perm[j] = K - 1 - j;
+    if (kk_merge(start, depth, perm)) return true;
+
+    // Complete KK: every other pairing that gives different slot sums
+    const long long* sb = kk_sum + (size_t)kk_order[start + 1] * K;
+    for (int j = 0; j < K; j++) perm[j] = j;
+    do {
+        if (kk_nodes >= kk_node_limit) return false;
+        bool same_as_kk = true, duplicate = false;
+        for (int j = 0; j < K; j++) {
+            if (sb[perm[j]] != sb[K - 1 - j]) same_as_kk = false;
+            // Among equal right slots only the increasing order is tried
+            for (int l = j + 1; l < K; l++) {
+                if (sb[perm[j]] == sb[perm[l]] && perm[j] > perm[l]) duplicate = true;
+            }
+        }
+        if (same_as_kk || duplicate) continue;
+        if (kk_merge(start, depth, perm)) return true;
+    } while (next_permutation(perm, perm + K));
+    return false;
+}
+
+// Runs KK (plus `extra_nodes` of complete-KK search) on numbers[] (sorted
+// descending); leaves the best assignment in kk_belong and returns its residual
+long long presolve_kk(long long extra_nodes) {
+    kk_sum = new long long[(size_t)(2 * N - 1) * K];
+    kk_left = new int[N];
+    kk_right = new int[N];
+    kk_src_a = new int[N * K];
+    kk_src_b = new int[N * K];
+    kk_order = new int[N];
+    for (int i = 0; i < N; i++) {
+        kk_sum[(size_t)i * K] = numbers[i];
+        for (int j = 1; j < K; j++) kk_sum[(size_t)i * K + j] = 0;
+        kk_order[i] = i;
+    }
+    kk_best = LLONG_MAX;
+    kk_nodes = 0;
+    kk_node_limit = (N - 1) + extra_nodes;   // the first descent is plain KK
+    kk_search(0, 0);
+    delete[] kk_sum;
+    delete[] kk_left;
+    delete[] kk_right;
+    delete[] kk_src_a;
+    delete[] kk_src_b;
+    delete[] kk_order;
+    return kk_best;
+}
+
+// Simulated Annealing core function; returns true if this chain found a perfect partition
+bool sa(Chain& c, int init) {
+    int* belong = c.belong_to;
+    long long* bucket_sum = c.bucket_sum;
+    Rng& rng = c.rng;
+
     // Reset bucket states
     for (int i = 0; i < K; i++) bucket_sum[i] = 0;
 
     // Initialize distribution
-    if (use_greedy) {
+    if (init == INIT_PRESOLVED) {
+        // Start from the pre-solver's low-residual partition
+        for (int i = 0; i < N; i++) {
+            belong[i] = kk_belong[i];
+            bucket_sum[belong[i]] += numbers[i];
+        }
+    } else if (init == INIT_GREEDY) {
         // This generates an initial state with very low energy (close to the solution)
         for (int i = 0; i < N; i++) {
             int min_idx = 0;
@@ -51,59 +350,72 @@ void sa(bool use_greedy) {
                     min_idx = b;
                 }
             }
-            belong_to[i] = min_idx;
+            belong[i] = min_idx;
             bucket_sum[min_idx] += numbers[i];
         }
     } else {
         // Even if greedy gets stuck in local optima, random initialization provides diversity through restarts
         for (int i = 0; i < N; i++) {
-            belong_to[i] = rand() % K;
-            bucket_sum[belong_to[i]] += numbers[i];
+            belong[i] = rng.below(K);
+            bucket_sum[belong[i]] += numbers[i];
         }
     }
 
-    // Annealing parameters
-    double T = 5000.0;     // Initial temperature
-    double alpha = 0.99;   // Cooling rate (larger means slower cooling)
-    double end_T = 1e-4;   // End temperature
+    // Annealing parameters (resolved per instance from the schedule)
+    double T = run_T0;          // Initial temperature
+    double alpha = run_alpha;   // Cooling rate (larger means slower cooling)
+    double end_T = sched.end_T; // End temperature
+    int reheats_left = sched.reheats;
 
     // Calculate initial energy
-    long long cur_diff = get_diff();
+    long long cur_diff = get_diff(c);
 
     // Annealing main loop
-    while (T > end_T) {
+    while (true) {
         // If energy drops to 0, a perfect partition is found
         if (cur_diff == 0) {
-            found = true;
-            return;
+            return true;
         }
+        if (T <= end_T) {
+            // Frozen without a solution: reheat (keeping the state) or give up this run
+            if (reheats_left == 0) break;
+            reheats_left--;
+            T = run_T0 * sched.reheat_frac;
+        }
+        // Early cancellation: another chain already succeeded
+        if (found.load(memory_order_relaxed)) {
+            return false;
+        }
+        c.moves++;
+        if (c.move_limit > 0 && c.moves >= c.move_limit) return false;
+        if (c.moves % CLOCK_EVERY == 0 && out_of_budget(c)) return false;
 
         // Randomly select a neighbor operation: Move(0) or Swap(1)
-        int op = rand() % 2; 
+        int op = rng.below(2); 
 
         if (op == 0) { 
             // Randomly select a number and move it from the current bucket to another random bucket
-            int idx = rand() % N;
-            int old_b = belong_to[idx];
-            int new_b = rand() % K;
+            int idx = rng.below(N);
+            int old_b = belong[idx];
+            int new_b = rng.below(K);
             
             if (old_b == new_b) continue;
 
-            long long old_e = abs(bucket_sum[old_b] - target) + abs(bucket_sum[new_b] - target);
+            long long old_e = llabs(bucket_sum[old_b] - target) + llabs(bucket_sum[new_b] - target);
             
             // Attempt to modify state
             bucket_sum[old_b] -= numbers[idx];
             bucket_sum[new_b] += numbers[idx];
             
-            long long new_e = abs(bucket_sum[old_b] - target) + abs(bucket_sum[new_b] - target);
+            long long new_e = llabs(bucket_sum[old_b] - target) + llabs(bucket_sum[new_b] - target);
             
             // New total energy = Current total energy - Old partial energy + New partial energy
             long long next_diff = cur_diff - old_e + new_e;
 
             // Metropolis Criterion
-            if (next_diff < cur_diff || exp((cur_diff - next_diff) / T) > (double)rand() / RAND_MAX) {
+            if (next_diff < cur_diff || exp((cur_diff - next_diff) / T) > rng.real()) {
                 cur_diff = next_diff;
-                belong_to[idx] = new_b; // Confirm move
+                belong[idx] = new_b; // Confirm move
             } else {
                 // Reject move, backtrack state
                 bucket_sum[old_b] += numbers[idx];
@@ -111,28 +423,28 @@ void sa(bool use_greedy) {
             }
         } else {
             // Randomly select two numbers and swap their buckets
-            int i1 = rand() % N;
-            int i2 = rand() % N;
-            if (belong_to[i1] == belong_to[i2]) continue;
+            int i1 = rng.below(N);
+            int i2 = rng.below(N);
+            if (belong[i1] == belong[i2]) continue;
 
-            int b1 = belong_to[i1];
-            int b2 = belong_to[i2];
+            int b1 = belong[i1];
+            int b2 = belong[i2];
 
-            long long old_e = abs(bucket_sum[b1] - target) + abs(bucket_sum[b2] - target);
+            long long old_e = llabs(bucket_sum[b1] - target) + llabs(bucket_sum[b2] - target);
 
             // Attempt swap
             bucket_sum[b1] -= numbers[i1]; bucket_sum[b1] += numbers[i2];
             bucket_sum[b2] -= numbers[i2]; bucket_sum[b2] += numbers[i1];
 
-            long long new_e = abs(bucket_sum[b1] - target) + abs(bucket_sum[b2] - target);
+            long long new_e = llabs(bucket_sum[b1] - target) + llabs(bucket_sum[b2] - target);
             long long next_diff = cur_diff - old_e + new_e;
 
-            if (next_diff < cur_diff || exp((cur_diff - next_diff) / T) > (double)rand() / RAND_MAX) {
+            if (next_diff < cur_diff || exp((cur_diff - next_diff) / T) > rng.real()) {
                 cur_diff = next_diff;
                 // Confirm swap, update ownership array
-                int tmp = belong_to[i1];
-                belong_to[i1] = belong_to[i2];
-                belong_to[i2] = tmp;
+                int tmp = belong[i1];
+                belong[i1] = belong[i2];
+                belong[i2] = tmp;
             } else {
                 // Backtrack state
                 bucket_sum[b1] -= numbers[i2]; bucket_sum[b1] += numbers[i1];
@@ -142,29 +454,341 @@ void sa(bool use_greedy) {
         // Cool down
         T *= alpha;
     }
+    return cur_diff == 0;
+}
+
+// One worker thread: restart its own chain until a solution is found anywhere or time runs out
+void run_chain(int tid) {
+    Chain c;
+    c.belong_to = new int[N];
+    c.rng.seed(base_seed + (unsigned long long)tid * 0x9E3779B97F4A7C15ULL);
+
+    c.moves = 0;
+    c.move_limit = 0;
+    if (sched.move_budget > 0) {
+        // Split the instance budget evenly; the first chains take the remainder
+        c.move_limit = sched.move_budget / num_threads + (tid < sched.move_budget % num_threads ? 1 : 0);
+        if (c.move_limit == 0) c.move_limit = 1;
+    }
+
+    // The first run of every chain starts from the pre-solver's partition
+    // (without one, only chain 0 starts greedy); restarts are random
+    int init = presolve ? INIT_PRESOLVED : (tid == 0 ? INIT_GREEDY : INIT_RANDOM);
+    long long restarts = 0;
+    while (!found.load(memory_order_relaxed) && !out_of_budget(c)) {
+        restarts++;
+        if (sa(c, init)) {
+            bool expected = false;
+            if (found.compare_exchange_strong(expected, true)) {
+                lock_guard<mutex> guard(result_lock);
+                memcpy(belong_to, c.belong_to, N * sizeof(int));
+            }
+            break;
+        }
+        init = INIT_RANDOM;
+    }
+    total_moves += c.moves;
+    total_restarts += restarts;
+    delete[] c.belong_to;
+}
+
+// Solve one part of an instance (see reduce.h) within the instance's deadline:
+// values[] come back in the order of numbers[], bucket[i] is the bucket of values[i]
+bool solve_values(long long* values, int n, int* bucket) {
+    N = n;
+    found = false;
+
+    long long sum = 0;
+    for (int i = 0; i < N; i++) {
+        // Bucket sums are long long, only the values themselves are int
+        if (values[i] > INT_MAX) {
+            cerr << "Error: values exceed the int range of SA." << endl;
+            exit(1);
+        }
+        numbers[i] = (int)values[i];
+        sum += numbers[i];
+    }
+
+    // Pruning: If total sum is not divisible by K, no solution exists
+    if (sum % K != 0) return false;
+
+    target = sum / K;
+    // Pruning: If any number is larger than target, no solution exists
+    for(int i = 0; i < N; i++) {
+        if(numbers[i] > target) return false;
+    }
+
+    // Preprocessing: Sort array in descending order, crucial for greedy initialization
+    sort(numbers, numbers + N, compare_desc);
+
+    // Pre-solver: a perfect KK partition needs no annealing at all
+    if (presolve) {
+        kk_belong = new int[N];
+        long long residual = presolve_kk(ckk_nodes);
+        if (residual > kk_residual) kk_residual = residual;
+        if (residual == 0) {
+            memcpy(belong_to, kk_belong, N * sizeof(int));
+            found = true;
+        }
+    }
+
+    // Resolve the schedule for this part
+    run_T0 = sched.T0 > 0 ? sched.T0 : calibrate_T0(base_seed ^ 0xC2B2AE3D27D4EB4FULL);
+    run_alpha = sched.alpha;
+    if (sched.run_moves > 0 && run_T0 > sched.end_T) {
+        run_alpha = exp(log(sched.end_T / run_T0) / (double)sched.run_moves);
+    }
+
+    // Independent chains on all threads; the first perfect partition cancels the others
+    if (!found) {
+        thread* workers = new thread[num_threads];
+        for (int t = 0; t < num_threads; t++) workers[t] = thread(run_chain, t);
+        for (int t = 0; t < num_threads; t++) workers[t].join();
+        delete[] workers;
+    }
+    base_seed += (unsigned long long)num_threads * 0x9E3779B97F4A7C15ULL;
+    if (presolve) delete[] kk_belong;
+
+    if (found) {
+        for (int i = 0; i < N; i++) {
+            values[i] = numbers[i];
+            bucket[i] = belong_to[i];
+        }
+    }
+    return found;
+}
+
+// Solve one instance read from fin (a text stream or a PackCursor) and write
+// its record to fout. Returns false if no instance could be read (end of input).
+template <class Input>
+bool solve_instance(Input& fin, ostream& fout) {
+    int n;
+    if (!(fin >> n)) return false;
+
+    // The time budget is per instance (wall clock, since all threads burn CPU time),
+    // so stream mode gives every instance the same budget; the parts share it
+    chrono::steady_clock::time_point start = chrono::steady_clock::now();
+    deadline = start + chrono::duration_cast<chrono::steady_clock::duration>(
+        chrono::duration<double>(sched.time_limit));
+    total_moves = 0;
+    total_restarts = 0;
+    kk_residual = -1;
+    run_T0 = run_alpha = 0;
+
+    long long* values = new long long[n];
+    int* bucket = new int[n];
+    for (int i = 0; i < n; i++) fin >> values[i];
+
+    // If no solution is found within the time limit, the record is "no". Only
+    // exact splits are taken: a wrongly guessed part cannot be refuted by the
+    // annealing and would use up the budget the parts share.
+    bool solved = use_reduce ? solve_reduced(values, n, K, solve_values, bucket, false)
+                             : part_ok(values, n, K) && solve_values(values, n, bucket);
+
+    if (sched.stats) {
+        double elapsed = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+        cerr << "stats moves=" << total_moves.load() << " restarts=" << total_restarts.load()
+             << " time=" << elapsed << " T0=" << run_T0 << " alpha=" << run_alpha
+             << " found=" << (solved ? 1 : 0) << " kk=" << kk_residual << endl;
+    }
+    write_result(fout, solved, values, n, bucket, K);
+
+    delete[] values;
+    delete[] bucket;
+    return true;
 }
 
 int main(int argc, char* argv[]) {
-    // Seed random number generator with current time
-    srand(time(NULL));
+    // Seed the per-chain generators from the current time
+    base_seed = (unsigned long long)chrono::steady_clock::now().time_since_epoch().count() ^ (unsigned long long)time(NULL);
+    num_threads = (int)thread::hardware_concurrency();
+    if (num_threads < 1) num_threads = 1;
 
     // Default I/O paths
     char input_path[256] = "../../testcases/1.in";
     char output_path[256] = "../../testcases/1.out";
+    bool stream = false;
+    bool custom_in = false, custom_out = false;
+    const char* pack_path = NULL;
+    long long pack_index = -1;
 
-    // Parse command line argument -test
+    // Parse command line arguments
     for (int i = 1; i < argc; i++) {
         if (strcmp(argv[i], "-test") == 0) {
             if (i + 1 < argc) {
-                // Modify path based on argument, e.g., -test 1 -> read ../../testcases/1.in
-                sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
-                sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
-                i++; // Skip argument value
+                // -test 1 -> read ../../testcases/1.in, unless -in/-out override a path
+                if (!custom_in) sprintf(input_path, "../../testcases/%s.in", argv[i+1]);
+                if (!custom_out) sprintf(output_path, "../../testcases/%s.out", argv[i+1]);
+                i++; 
             } else {
                 cerr << "Error: -test option requires an argument." << endl;
                 return 1;
             }
+        } else if (strcmp(argv[i], "-in") == 0) {
+            // Override the input path (in -stream mode: a file of concatenated instances)
+            if (i + 1 < argc) {
+                snprintf(input_path, sizeof(input_path), "%s", argv[i+1]);
+                custom_in = true;
+                i++;
+            } else {
+                cerr << "Error: -in option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-out") == 0) {
+            // Override the output path, e.g., so concurrent runs do not share a .out file
+            if (i + 1 < argc) {
+                snprintf(output_path, sizeof(output_path), "%s", argv[i+1]);
+                custom_out = true;
+                i++;
+            } else {
+                cerr << "Error: -out option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-pack") == 0) {
+            // Read the instances from a packed binary file (see pack_reader.h)
+            if (i + 1 < argc) {
+                pack_path = argv[i+1];
+                i++;
+            } else {
+                cerr << "Error: -pack option requires an argument." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-index") == 0) {
+            // Only solve instance <k> (0-based) of the -pack file
+            if (i + 1 < argc && atoll(argv[i+1]) >= 0) {
+                pack_index = atoll(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -index option requires a non-negative integer." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-stream") == 0) {
+            stream = true;
+        } else if (strcmp(argv[i], "-time") == 0 || strcmp(argv[i], "-moves") == 0
+                   || strcmp(argv[i], "-T0") == 0 || strcmp(argv[i], "-Tend") == 0
+                   || strcmp(argv[i], "-alpha") == 0 || strcmp(argv[i], "-run-moves") == 0
+                   || strcmp(argv[i], "-accept0") == 0 || strcmp(argv[i], "-reheats") == 0
+                   || strcmp(argv[i], "-reheat-frac") == 0) {
+            // Annealing schedule (see Schedule); "-T0 auto" calibrates per instance
+            if (i + 1 >= argc) {
+                cerr << "Error: " << argv[i] << " option requires an argument." << endl;
+                return 1;
+            }
+            const char* opt = argv[i];
+            const char* val = argv[i+1];
+            double x = strcmp(val, "auto") == 0 ? 0 : atof(val);
+            bool ok = x >= 0;
+            if (strcmp(opt, "-time") == 0) sched.time_limit = x;
+            else if (strcmp(opt, "-moves") == 0) sched.move_budget = atoll(val);
+            else if (strcmp(opt, "-T0") == 0) sched.T0 = x;
+            else if (strcmp(opt, "-Tend") == 0) { sched.end_T = x; ok = ok && x > 0; }
+            else if (strcmp(opt, "-alpha") == 0) { sched.alpha = x; ok = ok && x > 0 && x < 1; }
+            else if (strcmp(opt, "-run-moves") == 0) sched.run_moves = atoll(val);
+            else if (strcmp(opt, "-accept0") == 0) { sched.accept0 = x; ok = ok && x > 0 && x < 1; }
+            else if (strcmp(opt, "-reheats") == 0) sched.reheats = atoi(val);
+            else sched.reheat_frac = x;
+            if (!ok) {
+                cerr << "Error: invalid value for " << opt << ": " << val << endl;
+                return 1;
+            }
+            i++;
+        } else if (strcmp(argv[i], "-no-kk") == 0) {
+            presolve = false;
+        } else if (strcmp(argv[i], "-no-reduce") == 0) {
+            use_reduce = false;
+        } else if (strcmp(argv[i], "-ckk") == 0) {
+            // Complete-KK node budget after the plain KK descent (default: 100000)
+            if (i + 1 < argc && atoll(argv[i+1]) >= 0 && isdigit((unsigned char)argv[i+1][0])) {
+                ckk_nodes = atoll(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -ckk option requires a non-negative integer." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-stats") == 0) {
+            sched.stats = true;
+        } else if (strcmp(argv[i], "-k") == 0) {
+            // Number of buckets (default: 3)
+            if (i + 1 < argc && atoi(argv[i+1]) >= 2 && atoi(argv[i+1]) <= MAX_K) {
+                K = atoi(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -k option requires an integer in [2, " << MAX_K << "]." << endl;
+                return 1;
+            }
+        } else if (strcmp(argv[i], "-threads") == 0) {
+            // Number of parallel chains (default: all hardware threads)
+            if (i + 1 < argc && atoi(argv[i+1]) > 0) {
+                num_threads = atoi(argv[i+1]);
+                i++;
+            } else {
+                cerr << "Error: -threads option requires a positive integer." << endl;
+                return 1;
+            }
+        }
+    }
+
+    if (sched.time_limit <= 0 && sched.move_budget <= 0) {
+        cerr << "Error: -time 0 needs a move budget (-moves)." << endl;
+        return 1;
+    }
+
+    if (pack_path != NULL) {
+        // Pack mode: solve every instance of the pack (or only -index) and write
+        // one record per instance to stdout (or the -out file), as in stream mode
+        PackCursor pack;
+        if (!pack.open(pack_path)) {
+            cerr << "Error: Cannot open pack file: " << pack_path << endl;
+            return 1;
+        }
+        if (pack_index >= 0 && !pack.select((unsigned long long)pack_index)) {
+            cerr << "Error: -index " << pack_index << " out of range." << endl;
+            pack.close();
+            return 1;
+        }
+        ofstream pout;
+        if (custom_out) {
+            pout.open(output_path);
+            if (!pout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                pack.close();
+                return 1;
+            }
+        }
+        ostream& out = custom_out ? (ostream&)pout : cout;
+        while (solve_instance(pack, out)) {
+            out.flush();
         }
+        pack.close();
+        return 0;
+    }
+
+    if (stream) {
+        // Stream mode: read a sequence of instances ("N a1 ... aN" each) from stdin
+        // (or the -in file) and write one record per instance to stdout (or the -out file).
+        // Every record is flushed immediately so a caller can pipe instances one by one.
+        ifstream sin;
+        ofstream sout;
+        if (custom_in) {
+            sin.open(input_path);
+            if (!sin.is_open()) {
+                cerr << "Error: Cannot open input file: " << input_path << endl;
+                return 1;
+            }
+        }
+        if (custom_out) {
+            sout.open(output_path);
+            if (!sout.is_open()) {
+                cerr << "Error: Cannot open output file: " << output_path << endl;
+                return 1;
+            }
+        }
+        istream& in = custom_in ? (istream&)sin : cin;
+        ostream& out = custom_out ? (ostream&)sout : cout;
+        while (solve_instance(in, out)) {
+            out.flush();
+        }
+        return 0;
     }
 
     ifstream fin(input_path);
@@ -179,63 +803,10 @@ int main(int argc, char* argv[]) {
         return 1;
     }
 
-    if (!(fin >> N)) return 0;
+    solve_instance(fin, fout);
 
-    long long sum = 0;
-    for (int i = 0; i < N; i++) {
-        fin >> numbers[i];
-        sum += numbers[i];
-    }
-
-    // Pruning: If total sum is not divisible by K, no solution exists
-    if (sum % K != 0) {
-        fout << "no" << endl;
-        fin.close(); fout.close();
-        return 0;
-    }
-
-    target = sum / K;
-    // Pruning: If any number is larger than target, no solution exists
-    for(int i = 0; i < N; i++) {
-        if(numbers[i] > target) {
-            fout << "no" << endl;
-            fin.close(); fout.close();
-            return 0;
-        }
-    }
-
-    // Preprocessing: Sort array in descending order, crucial for greedy initialization
-    sort(numbers, numbers + N, compare_desc);
-
-    int run_count = 0;
-    while ((double)clock() / CLOCKS_PER_SEC < 0.9) {
-        // Subsequent restarts use random initialization (use_greedy = false) for diversity
-        sa(run_count == 0);
-        
-        if (found) {
-            fout << "yes" << endl;
-            // Output contents of K buckets
-            for (int b = 0; b < K; b++) {
-                bool first = true;
-                for (int i = 0; i < N; i++) {
-                    if (belong_to[i] == b) {
-                        if (!first) fout << " ";
-                        fout << numbers[i];
-                        first = false;
-                    }
-                }
-                fout << endl;
-            }
-            fin.close(); fout.close();
-            return 0;
-        }
-        run_count++;
-    }
-
-    // If no solution found within time limit, output no
-    fout << "no" << endl;
-    
     fin.close();
     fout.close();
+
     return 0;
-}
\ No newline at end of file
+}
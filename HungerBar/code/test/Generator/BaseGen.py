@@ -1,7 +1,13 @@
+import argparse
+import csv
 import os
 import random
-import subprocess
-from copy import deepcopy
+import sys
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from instance_pack import PACK_EXT, PackWriter
+from threepartition import solve
 
 N_SMALL = 100  # base set elements quantity
 NUM_BASE_GROUPS = 20  # base set quantity
@@ -13,91 +19,133 @@ POWER_MIN = 1
 POWER_MAX = 6
 
 OUTPUT_DIR = "testcases"  # save directory
+MANIFEST_CSV = "sa1_manifest.csv"  # per input: selected base groups and powers (in OUTPUT_DIR)
+PROGRESS_EVERY = 1000  # print one progress line per this many large inputs
+
+
+# per-task seed: results do not depend on --jobs or on worker scheduling
+def instance_seed(seed, idx):
+    return seed * 1000003 + idx
 
 
 # generate small element
-def gen_small_data(n=N_SMALL):
-    return [random.randint(1, SMALL_MAX) for _ in range(n)]
+def gen_small_data(n=N_SMALL, rng=random):
+    return [rng.randint(1, SMALL_MAX) for _ in range(n)]
 
 
 def write_input(arr, filename):
-    arr_shuffled = deepcopy(arr)
-    random.shuffle(arr_shuffled)
     with open(filename, "w") as f:
-        f.write(f"{len(arr_shuffled)}\n")
-        f.write(" ".join(map(str, arr_shuffled)) + "\n")
-    print(f"[OK] {filename}: n={len(arr_shuffled)}, sum={sum(arr_shuffled)}")
+        f.write(f"{len(arr)}\n")
+        f.write(" ".join(map(str, arr)) + "\n")
 
 
-# run and check the base
-def run_dp_then_check_correct():
-    if not os.path.exists("./dp") or not os.path.exists("./check"):
-        raise FileNotFoundError("./dp or ./check not found")
+# check the base in-process (replaces the legacy ./dp + ./check pair)
+def is_solvable(arr):
+    return solve(arr, method="dp") is not None
 
-    subprocess.run(["./dp"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-    proc = subprocess.Popen(["./check"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    stdout, stderr = proc.communicate()
-    output = stdout.decode().strip()
-    return output == "Correct"
+# one base: retry until the DP finds it solvable (worker entry point)
+def generate_base(task):
+    seed, i = task
+    # bases use negative indices, disjoint from the large inputs' seeds
+    rng = random.Random(instance_seed(seed, -(i + 1)))
+    attempt = 0
+    while True:
+        attempt += 1
+        arr = gen_small_data(rng=rng)
+        if is_solvable(arr):
+            shuffled = list(arr)
+            rng.shuffle(shuffled)
+            return i, arr, shuffled, attempt
 
 
 # generate the base
-def generate_base_groups():
+def generate_base_groups(pool, seed, output_dir=OUTPUT_DIR):
     base_groups = []
     print("=== 生成基础基组（保证可解） ===")
-    for i in range(NUM_BASE_GROUPS):
-        attempt = 0
-        while True:
-            attempt += 1
-            arr = gen_small_data()
-            # use check
-            write_input(arr, "input.txt")
-            if run_dp_then_check_correct():
-                filename = os.path.join(OUTPUT_DIR, f"base_{i+1}.txt")
-                write_input(arr, filename)
-                base_groups.append(arr)
-                print(f"[Base {i+1}] 成功生成，尝试次数 {attempt}")
-                break
-            if attempt % 50 == 0:
-                print(f"[Base {i+1}] 已尝试 {attempt} 次，继续中...")
+    tasks = ((seed, i) for i in range(NUM_BASE_GROUPS))
+    for i, arr, shuffled, attempt in pool.imap(generate_base, tasks):
+        write_input(shuffled, os.path.join(output_dir, f"base_{i+1}.txt"))
+        base_groups.append(arr)
+        print(f"[Base {i+1}] 成功生成，尝试次数 {attempt}")
     return base_groups
 
 
+# one large input from the bases (worker entry point)
+def generate_large_input(task):
+    seed, idx, base_groups = task
+    rng = random.Random(instance_seed(seed, idx))
+    num_sel = rng.randint(MIN_SELECTED_GROUPS, NUM_BASE_GROUPS)
+    selected = rng.sample(range(NUM_BASE_GROUPS), num_sel)
+
+    large_arr = []
+    power_list = []
+    for g in selected:
+        power = rng.randint(POWER_MIN, POWER_MAX)
+        factor = rng.randint(1, 7**power)
+        large_arr.extend(x * factor for x in base_groups[g])
+        power_list.append(power)
+    rng.shuffle(large_arr)
+    return idx, large_arr, selected, power_list
+
+
 # combine the bases to build BIG input
-def generate_large_inputs(base_groups):
-    print(f"\n=== 生成 {NUM_LARGE_INPUTS} 个大输入 ===")
+def generate_large_inputs(pool, seed, base_groups, count=NUM_LARGE_INPUTS,
+                          output_dir=OUTPUT_DIR, fmt="text"):
+    print(f"\n=== 生成 {count} 个大输入 ===")
+    pack = None
+    if fmt == "pack":
+        pack_path = os.path.join(output_dir, f"sa1{PACK_EXT}")
+        pack = PackWriter(pack_path)
+
     large_inputs = []
-    for idx in range(NUM_LARGE_INPUTS):
-        num_sel = random.randint(MIN_SELECTED_GROUPS, NUM_BASE_GROUPS)
-        selected = random.sample(range(NUM_BASE_GROUPS), num_sel)
-
-        large_arr = []
-        power_list = []
-        for g in selected:
-            power = random.randint(POWER_MIN, POWER_MAX)
-            factor = random.randint(1, 7**power)
-            scaled = [x * factor for x in base_groups[g]]
-            large_arr.extend(scaled)
-            power_list.append(power)
-
-        filename = os.path.join(OUTPUT_DIR, f"sa1_{idx+1}.in")
-        write_input(large_arr, filename)
-
-        large_inputs.append((large_arr, selected, power_list))
+    f_manifest = open(os.path.join(output_dir, MANIFEST_CSV), "w", newline="")
+    manifest = csv.writer(f_manifest)
+    manifest.writerow(["test_id", "instance_id", "selected_groups", "power_list", "filename"])
+    tasks = ((seed, idx, base_groups) for idx in range(count))
+    # imap keeps the order, so files / pack entries are written as results stream in
+    for idx, large_arr, selected, power_list in pool.imap(generate_large_input, tasks, chunksize=64):
+        if pack is not None:
+            pack.add(f"sa1_{idx+1}", large_arr)
+            filename = f"{pack_path}#{idx}"
+        else:
+            filename = os.path.join(output_dir, f"sa1_{idx+1}.in")
+            write_input(large_arr, filename)
+        manifest.writerow([f"sa1_{idx+1}", idx, selected, power_list, filename])
+        large_inputs.append((selected, power_list))
+        if (idx + 1) % PROGRESS_EVERY == 0 or idx + 1 == count:
+            print(f"[OK] {idx+1}/{count}")
+
+    f_manifest.close()
+    if pack is not None:
+        pack.close()
+        print(f"[OK] 打包文件 {pack_path}")
     return large_inputs
 
 
 def main():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    # generate bases
-    base_groups = generate_base_groups()
-    # generate Input
-    _ = generate_large_inputs(base_groups)
+    parser = argparse.ArgumentParser(description="Generate solvable bases and scaled large inputs (sa1_i)")
+    parser.add_argument("--count", type=int, default=NUM_LARGE_INPUTS, help="Number of large inputs")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Base seed; every base / input uses a seed derived from (seed, index). Default: random")
+    parser.add_argument("--format", choices=["text", "pack"], default="text",
+                        help="One sa1_i.in per input, or a single packed sa1.pack (see instance_pack.py)")
+    parser.add_argument("--output_dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    seed = args.seed if args.seed is not None else random.randrange(1 << 31)
+    print(f"[INFO] seed={seed}, jobs={args.jobs}, format={args.format}")
+
+    with Pool(args.jobs) as pool:
+        # generate bases
+        base_groups = generate_base_groups(pool, seed, args.output_dir)
+        # generate Input
+        _ = generate_large_inputs(pool, seed, base_groups, args.count, args.output_dir, args.format)
 
     print("\n=== 所有测试集生成完毕 ===")
-    print(f"测试集文件保存在 {OUTPUT_DIR}/")
+    print(f"测试集文件保存在 {args.output_dir}/")
 
 
 if __name__ == "__main__":
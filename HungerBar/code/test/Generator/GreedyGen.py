@@ -1,7 +1,13 @@
+import argparse
 import csv
 import os
 import random
+import sys
 from datetime import datetime
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from instance_pack import PACK_EXT, PackWriter
 
 NUM_GUARANTEED_INPUTS = 1000  # Number of test cases to generate
 N_LARGE = 1000  # Array length
@@ -10,10 +16,11 @@ MIN_VALUE = 1
 MAX_VALUE = 10**6
 OUTPUT_DIR = "testcases"
 OUTPUT_CSV = "guaranteed_inputs.csv"
+PROGRESS_EVERY = 100  # print one progress line per this many instances
 
 
 # Data generation function (guaranteed solution)
-def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS):
+def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS, rng=random):
     """
     Generate an array that can be evenly partitioned into `num_buckets` buckets.
 
@@ -24,6 +31,8 @@ def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS):
     4. Shuffle the array to remove obvious order.
     5. Ensure total sum is divisible by `num_buckets`.
 
+    `rng` is the random source (a per-instance random.Random in parallel runs).
+
     Returns:
         arr (list[int]): Generated array
         target_sum (int): Target sum for each bucket
@@ -38,7 +47,7 @@ def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS):
     # Randomly generate target sum for each bucket
     min_target = MIN_VALUE * (n // num_buckets)
     max_target = MAX_VALUE * (n // num_buckets)
-    target_sum = random.randint(min_target, max_target)
+    target_sum = rng.randint(min_target, max_target)
 
     # Each bucket's target sum
     bucket_targets = [target_sum] * num_buckets
@@ -56,7 +65,7 @@ def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS):
         if lower > upper:
             lower, upper = MIN_VALUE, MAX_VALUE
 
-        num = random.randint(lower, upper)
+        num = rng.randint(lower, upper)
         bucket_sums[min_index] += num
         bucket_elements[min_index].append(num)
         arr.append(num)
@@ -70,7 +79,7 @@ def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS):
         arr.append(correction)
 
     # Shuffle the array to remove ordering
-    random.shuffle(arr)
+    rng.shuffle(arr)
 
     # Ensure total sum is divisible by num_buckets
     total_sum = sum(arr)
@@ -84,8 +93,29 @@ def gen_guaranteed_solution_data(n=N_LARGE, num_buckets=NUM_BUCKETS):
     return arr, target_sum
 
 
-def write_input(arr, idx):
-    filename = os.path.join(OUTPUT_DIR, f"sa_{idx+1}.in")
+def instance_seed(seed, idx):
+    """
+    Seed of instance `idx`: the output does not depend on --jobs or on the order
+    in which workers finish.
+    """
+    return seed * 1000003 + idx
+
+
+def generate_instance(task):
+    """
+    Worker entry point: (seed, idx, num_buckets) -> (idx, arr, target_sum, error).
+    """
+    seed, idx, num_buckets = task
+    try:
+        arr, target_sum = gen_guaranteed_solution_data(num_buckets=num_buckets,
+                                                       rng=random.Random(instance_seed(seed, idx)))
+        return idx, arr, target_sum, None
+    except Exception as e:
+        return idx, None, None, str(e)
+
+
+def write_input(arr, idx, output_dir=OUTPUT_DIR):
+    filename = os.path.join(output_dir, f"sa_{idx+1}.in")
     with open(filename, "w") as f:
         f.write(f"{len(arr)}\n")
         f.write(" ".join(map(str, arr)) + "\n")
@@ -93,10 +123,29 @@ def write_input(arr, idx):
 
 
 def main():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    parser = argparse.ArgumentParser(description="Generate guaranteed-solvable large instances (sa_i)")
+    parser.add_argument("--count", type=int, default=NUM_GUARANTEED_INPUTS, help="Number of instances")
+    parser.add_argument("--buckets", type=int, default=NUM_BUCKETS,
+                        help="Number of equal-sum buckets K (default: 3; solve with the solvers' -k)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Base seed; instance i uses a seed derived from (seed, i). Default: random")
+    parser.add_argument("--format", choices=["text", "pack"], default="text",
+                        help="One sa_i.in per instance, or a single packed sa.pack (see instance_pack.py)")
+    parser.add_argument("--output_dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    seed = args.seed if args.seed is not None else random.randrange(1 << 31)
+    print(f"[INFO] seed={seed}, jobs={args.jobs}, format={args.format}")
+
+    pack = None
+    if args.format == "pack":
+        pack_path = os.path.join(args.output_dir, f"sa{PACK_EXT}")
+        pack = PackWriter(pack_path)
 
     # Open CSV to record metadata for all test cases
-    with open(OUTPUT_CSV, "w", newline="") as f_csv:
+    with open(OUTPUT_CSV, "w", newline="") as f_csv, Pool(args.jobs) as pool:
         writer = csv.writer(f_csv)
         writer.writerow(
             [
@@ -111,26 +160,37 @@ def main():
             ]
         )
 
-        for i in range(NUM_GUARANTEED_INPUTS):
-            try:
-                arr, target_sum = gen_guaranteed_solution_data()
-                filename = write_input(arr, i)
-                # Write metadata to CSV
-                writer.writerow(
-                    [
-                        i,
-                        len(arr),
-                        target_sum,
-                        min(arr),
-                        max(arr),
-                        sum(arr) / len(arr),
-                        filename,
-                        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    ]
-                )
-                print(f"[OK] Generated instance {i+1}: file {filename}")
-            except Exception as e:
-                print(f"[ERROR] Failed to generate instance {i+1}: {e}")
+        # imap keeps the instance order, so the pack and the CSV are written as results stream in
+        tasks = ((seed, i, args.buckets) for i in range(args.count))
+        for i, arr, target_sum, error in pool.imap(generate_instance, tasks, chunksize=8):
+            if error is not None:
+                print(f"[ERROR] Failed to generate instance {i+1}: {error}")
+                continue
+            if pack is not None:
+                # Failed instances are skipped, so the entry index can lag behind i
+                index = pack.add(f"sa_{i+1}", arr)
+                filename = f"{pack_path}#{index}"
+            else:
+                filename = write_input(arr, i, args.output_dir)
+            # Write metadata to CSV
+            writer.writerow(
+                [
+                    i,
+                    len(arr),
+                    target_sum,
+                    min(arr),
+                    max(arr),
+                    sum(arr) / len(arr),
+                    filename,
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                ]
+            )
+            if (i + 1) % PROGRESS_EVERY == 0 or i + 1 == args.count:
+                print(f"[OK] Generated {i+1}/{args.count} instances")
+
+    if pack is not None:
+        pack.close()
+        print(f"[OK] Packed instances written to {pack_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+import argparse
+import csv
+import math
+import os
+import random
+import sys
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from instance_pack import PACK_EXT, PackWriter
+
+# Control parameter of the number-partitioning phase transition: kappa = log2(max value) / N.
+# For a 3-way partition the 3^N assignments must hit two independent sums of size ~M,
+# so the expected number of perfect partitions is ~3^N / M^2; it crosses 1 at
+# kappa = log2(3) / 2 (annealed estimate; finite N shifts it slightly).
+# Below it almost every instance is solvable and easy, far above it the sum
+# check usually decides; the hardest instances sit close to it.
+KAPPA_C = math.log2(3) / 2
+
+NUM_BUCKETS = 3
+OUTPUT_DIR = "testcases"
+OUTPUT_CSV = "hard_instances.csv"
+NODE_BUDGET = 200000      # bounded DFS: stop counting after this many nodes
+MIN_NODES = 10000         # keep a candidate only if the DFS needs at least this many
+MAX_CANDIDATES = 200      # candidates tried per instance before giving up
+PROGRESS_EVERY = 10
+
+
+# Difficulty estimates
+def kk_residual(values, num_buckets=NUM_BUCKETS):
+    """
+    Residual (max - min bucket sum) of the multi-way Karmarkar-Karp
+    differencing heuristic. 0 means the heuristic already finds a perfect
+    partition, so the instance is easy.
+    """
+    # Every tuple is kept sorted descending and normalized to a minimum of 0
+    tuples = sorted(([v] + [0] * (num_buckets - 1) for v in values), key=lambda t: t[0])
+    while len(tuples) > 1:
+        a = tuples.pop()
+        b = tuples.pop()
+        # Largest of one with smallest of the other
+        merged = sorted((x + y for x, y in zip(a, reversed(b))), reverse=True)
+        low = merged[-1]
+        merged = [x - low for x in merged]
+        # Re-insert by its spread (= first element), keeping the list sorted
+        lo, hi = 0, len(tuples)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tuples[mid][0] < merged[0]:
+                lo = mid + 1
+            else:
+                hi = mid
+        tuples.insert(lo, merged)
+    return tuples[0][0] if tuples else 0
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def dfs_nodes(values, budget=NODE_BUDGET):
+    """
+    Runs the search of dfs.cpp (values sorted descending, capacity pruning,
+    empty-bucket symmetry breaking) with a node budget.
+    Returns (nodes, result), result being "yes", "no" or "budget".
+    """
+    n = len(values)
+    total = sum(values)
+    if n < NUM_BUCKETS or total % NUM_BUCKETS != 0:
+        return 0, "no"
+    target = total // NUM_BUCKETS
+    numbers = sorted(values, reverse=True)
+    if numbers[0] > target:
+        return 0, "no"
+
+    bucket_sum = [0] * NUM_BUCKETS
+    nodes = 0
+
+    def dfs(index):
+        nonlocal nodes
+        nodes += 1
+        if nodes > budget:
+            raise _BudgetExceeded
+        if index == n:
+            return True
+        val = numbers[index]
+        for i in range(NUM_BUCKETS):
+            if bucket_sum[i] + val > target:
+                continue
+            bucket_sum[i] += val
+            if dfs(index + 1):
+                return True
+            bucket_sum[i] -= val
+            if bucket_sum[i] == 0:
+                break
+        return False
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, n + 100))
+    try:
+        result = "yes" if dfs(0) else "no"
+    except _BudgetExceeded:
+        nodes, result = budget, "budget"
+    finally:
+        sys.setrecursionlimit(limit)
+    return nodes, result
+
+
+# Candidate generation
+def gen_candidate(n, kappa, rng):
+    """
+    n uniform values in [1, 2^(kappa * n)], adjusted so the total is divisible
+    by 3 (otherwise every solver rejects it at the sum check).
+    """
+    maxv = max(2, int(round(2 ** (kappa * n))))
+    arr = [rng.randint(1, maxv) for _ in range(n)]
+    remainder = sum(arr) % NUM_BUCKETS
+    if remainder:
+        i = rng.randrange(n)
+        arr[i] = arr[i] - remainder if arr[i] > remainder else arr[i] + NUM_BUCKETS - remainder
+    return arr, maxv
+
+
+def instance_seed(seed, idx):
+    """
+    Seed of instance `idx`: the output does not depend on --jobs or on the order
+    in which workers finish.
+    """
+    return seed * 1000003 + idx
+
+
+def generate_instance(task):
+    """
+    Worker entry point. Draws candidates for (n, kappa) until one is hard
+    enough: KK does not solve it and the bounded DFS needs at least
+    `min_nodes` nodes. Returns (idx, arr, info, error).
+    """
+    seed, idx, n, kappa, budget, min_nodes, max_candidates = task
+    rng = random.Random(instance_seed(seed, idx))
+    for tried in range(1, max_candidates + 1):
+        arr, maxv = gen_candidate(n, kappa, rng)
+        residual = kk_residual(arr)
+        if residual == 0:
+            continue
+        nodes, result = dfs_nodes(arr, budget)
+        if nodes >= min_nodes:
+            info = {"maxv": maxv, "kk_residual": residual, "dfs_nodes": nodes,
+                    "dfs_result": result, "candidates": tried}
+            return idx, arr, info, None
+    return idx, None, None, f"no candidate with >= {min_nodes} DFS nodes in {max_candidates} tries"
+
+
+def write_input(arr, idx, output_dir=OUTPUT_DIR):
+    filename = os.path.join(output_dir, f"hard_{idx+1}.in")
+    with open(filename, "w") as f:
+        f.write(f"{len(arr)}\n")
+        f.write(" ".join(map(str, arr)) + "\n")
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate hard instances near the phase transition (hard_i), filtered by estimated difficulty"
+    )
+    parser.add_argument("--ns", type=int, nargs="+", required=True, help="Instance sizes, e.g. --ns 20 24 28")
+    parser.add_argument("--kappas", type=float, nargs="+", default=[KAPPA_C],
+                        help=f"Values of log2(max value)/N (default: {KAPPA_C:.3f}, the transition)")
+    parser.add_argument("--repeat", type=int, default=1, help="Instances per (n, kappa)")
+    parser.add_argument("--node-budget", type=int, default=NODE_BUDGET,
+                        help="Node limit of the difficulty-estimating DFS")
+    parser.add_argument("--min-nodes", type=int, default=MIN_NODES,
+                        help="Keep only candidates whose DFS needs at least this many nodes")
+    parser.add_argument("--max-candidates", type=int, default=MAX_CANDIDATES,
+                        help="Candidates tried per instance before giving up")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Base seed; instance i uses a seed derived from (seed, i). Default: random")
+    parser.add_argument("--format", choices=["text", "pack"], default="text",
+                        help="One hard_i.in per instance, or a single packed hard.pack (see instance_pack.py)")
+    parser.add_argument("--output_dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    seed = args.seed if args.seed is not None else random.randrange(1 << 31)
+    print(f"[INFO] seed={seed}, jobs={args.jobs}, format={args.format}")
+
+    params = [(n, kappa) for n in args.ns for kappa in args.kappas for _ in range(args.repeat)]
+    tasks = ((seed, i, n, kappa, args.node_budget, args.min_nodes, args.max_candidates)
+             for i, (n, kappa) in enumerate(params))
+
+    pack = None
+    if args.format == "pack":
+        pack_path = os.path.join(args.output_dir, f"hard{PACK_EXT}")
+        pack = PackWriter(pack_path)
+
+    kept = 0
+    with open(OUTPUT_CSV, "w", newline="") as f_csv, Pool(args.jobs) as pool:
+        writer = csv.writer(f_csv)
+        writer.writerow(["instance_id", "array_length", "kappa", "max_value", "kk_residual",
+                         "dfs_nodes", "dfs_result", "candidates", "filename"])
+
+        # imap keeps the instance order, so the pack and the CSV are written as results stream in
+        for i, arr, info, error in pool.imap(generate_instance, tasks):
+            n, kappa = params[i]
+            if error is not None:
+                print(f"[ERROR] Instance {i+1} (n={n}, kappa={kappa:.3f}): {error}")
+                continue
+            if pack is not None:
+                # Failed instances are skipped, so the entry index can lag behind i
+                index = pack.add(f"hard_{i+1}", arr)
+                filename = f"{pack_path}#{index}"
+            else:
+                filename = write_input(arr, i, args.output_dir)
+            writer.writerow([i, n, f"{kappa:.4f}", info["maxv"], info["kk_residual"],
+                             info["dfs_nodes"], info["dfs_result"], info["candidates"], filename])
+            kept += 1
+            if (i + 1) % PROGRESS_EVERY == 0 or i + 1 == len(params):
+                print(f"[OK] Generated {i+1}/{len(params)} instances")
+
+    if pack is not None:
+        pack.close()
+        print(f"[OK] Packed instances written to {pack_path}")
+    print(f"[OK] {kept}/{len(params)} hard instances kept, metadata in {OUTPUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
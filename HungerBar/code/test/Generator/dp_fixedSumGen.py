@@ -2,6 +2,8 @@ import argparse
 import os
 import random
 
+from dp_fixednGen import gen_batch_fixed_sum, np, write_instance
+
 
 # generate the fixed sum, variable n testcases
 # the same generate logic as dp_fixednGen.py
@@ -57,18 +59,46 @@ def main():
         default="testcases",
         help="Directory to save testcases",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["vectorized", "loop"],
+        default="vectorized",
+        help="vectorized: NumPy batch per n (default); loop: one array at a time",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
+    if args.mode == "vectorized" and np is None:
+        print("[INFO] NumPy not available; falling back to --mode loop.")
+        args.mode = "loop"
+    random.seed(args.seed)
+    rng = np.random.default_rng(args.seed) if np is not None else None
 
     idx = 1
     for n in args.ns:
-        for trial in range(args.trials):
+        if args.mode == "loop":
+            for trial in range(args.trials):
+                filename = os.path.join(args.output_dir, f"dp2_{idx}.in")
+                try:
+                    gen_test_data_fixed_sum(n=n, total_sum=args.total_sum, file=filename)
+                except Exception as e:
+                    print(f"[ERROR] Failed for n={n}, trial={trial+1}: {e}")
+                idx += 1
+            continue
+
+        try:
+            batch = gen_batch_fixed_sum(rng, n, args.total_sum, args.trials)
+        except ValueError as e:
+            print(f"[ERROR] Failed for n={n}: {e}")
+            idx += args.trials
+            continue
+        for arr in batch.tolist():
             filename = os.path.join(args.output_dir, f"dp2_{idx}.in")
-            try:
-                gen_test_data_fixed_sum(n=n, total_sum=args.total_sum, file=filename)
-            except Exception as e:
-                print(f"[ERROR] Failed for n={n}, trial={trial+1}: {e}")
+            write_instance(arr, filename)
+            print(
+                f"[OK] Generated {filename}: n={n}, sum={args.total_sum}, range=({min(arr)}, {max(arr)})"
+            )
             idx += 1
 
 
@@ -2,6 +2,11 @@ import argparse
 import os
 import random
 
+try:
+    import numpy as np
+except ImportError:  # the loop generator below still works without NumPy
+    np = None
+
 
 # generate the fixed n, variable sum testcases
 def gen_test_data_fixed_sum(n, total_sum, min_val=1, max_val=None, file="input.txt"):
@@ -50,6 +55,53 @@ def gen_test_data_fixed_sum(n, total_sum, min_val=1, max_val=None, file="input.t
     return arr
 
 
+def gen_batch_fixed_sum(rng, n, total_sum, batch, min_val=1, max_val=None):
+    """
+    Vectorized gen_test_data_fixed_sum: returns a (batch, n) int64 array of
+    `batch` independent arrays with the same distribution.
+
+    The sequential draws (each value takes a uniform share of what is still
+    left) run column by column over the whole batch, and the leftover that the
+    loop version hands out one unit at a time to random elements is drawn at
+    once as a multinomial. Units that would push an element above max_val are
+    redrawn among the elements that still have room, exactly like the loop
+    skips full elements.
+    """
+    if max_val is None:
+        max_val = total_sum - n + 1
+    if n * min_val > total_sum or n * max_val < total_sum:
+        raise ValueError("Impossible to generate numbers with given sum and bounds.")
+
+    arr = np.full((batch, n), min_val, dtype=np.int64)
+    remaining = np.full(batch, total_sum - n * min_val, dtype=np.int64)
+    for i in range(n):
+        if not remaining.any():
+            break
+        add = np.minimum(remaining, max_val - min_val)
+        val = rng.integers(0, add + 1)
+        arr[:, i] += val
+        remaining -= val
+
+    arr += rng.multinomial(remaining, np.full(n, 1.0 / n))
+    for row in np.flatnonzero((arr > max_val).any(axis=1)):
+        # Only possible with an explicit max_val: move the overflow to non-full elements
+        while True:
+            excess = np.clip(arr[row] - max_val, 0, None).sum()
+            if excess == 0:
+                break
+            np.minimum(arr[row], max_val, out=arr[row])
+            room = np.flatnonzero(arr[row] < max_val)
+            arr[row, room] += rng.multinomial(excess, np.full(len(room), 1.0 / len(room)))
+
+    return rng.permuted(arr, axis=1)
+
+
+def write_instance(arr, file):
+    with open(file, "w") as f:
+        f.write(str(len(arr)) + "\n")
+        f.write(" ".join(map(str, arr)) + "\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate test cases with fixed n and total_sum"
@@ -67,18 +119,46 @@ def main():
         default="testcases",
         help="Directory to save test cases",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["vectorized", "loop"],
+        default="vectorized",
+        help="vectorized: NumPy batch per total_sum (default); loop: one array at a time",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
+    if args.mode == "vectorized" and np is None:
+        print("[INFO] NumPy not available; falling back to --mode loop.")
+        args.mode = "loop"
+    random.seed(args.seed)
+    rng = np.random.default_rng(args.seed) if np is not None else None
 
     idx = 1
     for total_sum in args.sums:
-        for trial in range(args.trials):
+        if args.mode == "loop":
+            for trial in range(args.trials):
+                filename = os.path.join(args.output_dir, f"dp1_{idx}.in")
+                try:
+                    gen_test_data_fixed_sum(n=args.n, total_sum=total_sum, file=filename)
+                except Exception as e:
+                    print(f"[ERROR] Data generation failed for total_sum={total_sum}: {e}")
+                idx += 1
+            continue
+
+        try:
+            batch = gen_batch_fixed_sum(rng, args.n, total_sum, args.trials)
+        except ValueError as e:
+            print(f"[ERROR] Data generation failed for total_sum={total_sum}: {e}")
+            idx += args.trials
+            continue
+        for arr in batch.tolist():
             filename = os.path.join(args.output_dir, f"dp1_{idx}.in")
-            try:
-                gen_test_data_fixed_sum(n=args.n, total_sum=total_sum, file=filename)
-            except Exception as e:
-                print(f"[ERROR] Data generation failed for total_sum={total_sum}: {e}")
+            write_instance(arr, filename)
+            print(
+                f"[OK] Test data generated: {filename}, n={args.n}, sum={total_sum}, range=({min(arr)}, {max(arr)})"
+            )
             idx += 1
 
 
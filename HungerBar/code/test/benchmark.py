@@ -1,36 +1,318 @@
 import argparse
 import csv
 import os
+import sqlite3
 import subprocess
 import time
 import fnmatch  
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from instance_pack import PackReader
+from instance_store import InstanceStore
+from result_cache import DEFAULT_CACHE_PATH, ResultCache
+from run_stats import USAGE_FIELDS, proc_usage, run_measured, summarize, usage_delta
+from solver_stream import get_stream_solver, read_instance
+from validator import (BAD_OUTPUT, CORRECT, CROSS_CHECK_MAX_CELLS, UNVERIFIED,
+                       set_cross_check_cells, validate_output)
 
 # Configuration
 TESTCASE_DIR = "../../testcases"
 INPUT_EXT = ".in"   
 OUTPUT_EXT = ".out"
+NUM_BUCKETS = 3                # default K of the K-way partition (--k)
+HEURISTIC_SOLVERS = {"sa"}   # Their "no" only means "not found in time"
+RACE_POLL_INTERVAL = 0.01
+
+# Per-solver CSV columns: (suffix, summary field, is a time in seconds)
+STAT_COLUMNS = [
+    ("Time", "wall", True),          # median over --repeat runs
+    ("Time_P95", "wall_p95", True),
+    ("Time_Std", "wall_std", True),
+    ("User", "user", True),
+    ("Sys", "sys", True),
+    ("MaxRSS_KB", "max_rss_kb", False),
+    ("MinFlt", "minflt", False),
+    ("MajFlt", "majflt", False),
+]
+
+# Test IDs stored in instance packs (--pack): test_id -> (pack_path, index)
+PACKED_TESTS = {}
+_pack_readers = {}
 
 # Core Logic
-def run_solver(exe_path, test_id):
+def get_output_path(exe_path, test_id):
     """
-    Returns execution time in seconds, or None on failure.
+    Each solver writes its own .out file, so parallel runs on the same test never collide.
     """
-    cmd = [exe_path, "-test", str(test_id)]
-    
-    start = time.time()
+    alg_name = os.path.splitext(os.path.basename(exe_path))[0]
+    return os.path.join(TESTCASE_DIR, f"{test_id}.{alg_name}{OUTPUT_EXT}")
+
+def register_pack(pack_path):
+    """
+    Makes every instance of a pack available as a test ID (its name in the
+    pack). Returns the names.
+    """
+    reader = _pack_readers.get(pack_path)
+    if reader is None:
+        reader = _pack_readers[pack_path] = PackReader(pack_path)
+    for k, name in enumerate(reader.names):
+        PACKED_TESTS[name] = (pack_path, k)
+    return reader.names
+
+def get_input_path(test_id):
+    """
+    File the test case is read from: its .in file, or the pack holding it.
+    """
+    if test_id in PACKED_TESTS:
+        return PACKED_TESTS[test_id][0]
+    return os.path.join(TESTCASE_DIR, f"{test_id}{INPUT_EXT}")
+
+def load_values(test_id):
+    """
+    The instance as a list of ints (memory-mapped from its pack if packed).
+    """
+    if test_id in PACKED_TESTS:
+        pack_path, k = PACKED_TESTS[test_id]
+        return _pack_readers[pack_path].values(k)
+    return read_instance(get_input_path(test_id))
+
+def bucket_args(num_buckets):
+    """
+    Solver options for a K-way partition (none for the default K=3).
+    """
+    return [] if num_buckets == NUM_BUCKETS else ["-k", str(num_buckets)]
+
+def solver_cmd(exe_path, test_id, num_buckets=NUM_BUCKETS):
+    """
+    Command line of one file-mode run: reads the test case (from its .in file,
+    or its slot in a pack), writes its own .out file.
+    """
+    if test_id in PACKED_TESTS:
+        pack_path, k = PACKED_TESTS[test_id]
+        return [exe_path, "-pack", pack_path, "-index", str(k),
+                "-out", get_output_path(exe_path, test_id)] + bucket_args(num_buckets)
+    return ([exe_path, "-test", str(test_id), "-out", get_output_path(exe_path, test_id)]
+            + bucket_args(num_buckets))
+
+def run_solver(exe_path, test_id, cache=None, stream=False, run_index=0, num_buckets=NUM_BUCKETS):
+    """
+    Returns the run's stats {"wall", "user", "sys", "max_rss_kb", "minflt",
+    "majflt"} (seconds / KB / page faults, see run_stats.py), or None on failure.
+    With a ResultCache, an unchanged (binary, input, args) run is not re-executed:
+    the stored stats are returned and the stored output is restored to the .out file.
+    With stream=True the instance is piped through a long-lived `-stream` solver
+    process, so the time excludes process startup and file I/O.
+    `run_index` > 0 marks a repeated run, which is cached under its own key.
+    `num_buckets` is passed to the solver as -k.
+    """
+    input_path = get_input_path(test_id)
+    output_path = get_output_path(exe_path, test_id)
+    args = (["-stream"] if stream else ["-test", str(test_id)]) + bucket_args(num_buckets)
+    if test_id in PACKED_TESTS:
+        # The key hashes the whole pack; the index selects the instance
+        args = args + [f"index={PACKED_TESTS[test_id][1]}"]
+    if run_index > 0:
+        args = args + [f"run={run_index}"]
+
+    key = cache.make_key(exe_path, input_path, args) if cache else None
+    hit = cache.get(key) if cache else None
+    if hit is not None:
+        with open(output_path, "w") as f:
+            f.write(hit["output"])
+        stats = {field: None for field in USAGE_FIELDS}
+        stats.update(hit["stats"] or {})
+        stats["wall"] = hit["wall_time"]
+        return stats
+
+    if stream:
+        try:
+            values = load_values(test_id)
+            solver = get_stream_solver(exe_path, num_buckets)
+        except FileNotFoundError:
+            print(f"[Error] Executable not found: {exe_path}")
+            return None
+        before = proc_usage(solver.proc.pid)
+        start = time.perf_counter_ns()
+        try:
+            output = solver.solve(values)
+        except RuntimeError:
+            return None
+        wall = (time.perf_counter_ns() - start) / 1e9
+        stats = usage_delta(before, proc_usage(solver.proc.pid))
+        with open(output_path, "w") as f:
+            f.write(output)
+        if cache:
+            cache.put(key, wall, output, stats)
+        stats["wall"] = wall
+        return stats
+
     try:
-        # capture_output suppresses stdout/stderr to keep console clean
-        subprocess.run(cmd, check=True, capture_output=True)
-    except subprocess.CalledProcessError:
-        return None
+        stats = run_measured(solver_cmd(exe_path, test_id, num_buckets))
     except FileNotFoundError:
         print(f"[Error] Executable not found: {exe_path}")
         return None
-        
-    end = time.time()
-    return end - start
+    if stats.pop("returncode") != 0:
+        return None
+    wall = stats.pop("wall")
+
+    if cache:
+        try:
+            with open(output_path, "r") as f:
+                cache.put(key, wall, f.read(), stats)
+        except OSError:
+            pass
+    stats["wall"] = wall
+    return stats
+
+def check_run(exe_path, test_id, num_buckets=NUM_BUCKETS):
+    """
+    Validates the solver's .out file for a test case (see validator.py) and
+    returns its status; problems are reported on the console.
+    """
+    try:
+        with open(get_output_path(exe_path, test_id), "r") as f:
+            status, detail = validate_output(load_values(test_id), f, num_buckets=num_buckets)
+    except OSError:
+        status, detail = BAD_OUTPUT, "output file missing"
+    if status not in (CORRECT, UNVERIFIED):
+        print(f"[Check] {os.path.basename(exe_path)} on {test_id}: {status} ({detail})")
+    return status
+
+def run_repeated(exe_path, test_id, cache=None, stream=False, repeat=1, check=False,
+                 num_buckets=NUM_BUCKETS):
+    """
+    Runs one (solver, test) pair `repeat` times and returns the summary of
+    run_stats.summarize (median/p95/stddev of the wall time), or None if any
+    run failed. With check=True the (last) output is validated and its status
+    is stored under "check".
+    """
+    samples = []
+    for i in range(repeat):
+        stats = run_solver(exe_path, test_id, cache, stream, run_index=i, num_buckets=num_buckets)
+        if stats is None:
+            return None
+        samples.append(stats)
+    summary = summarize(samples)
+    if check:
+        summary["check"] = check_run(exe_path, test_id, num_buckets)
+    return summary
+
+# Portfolio Race
+def read_verdict(output_path):
+    """
+    First line of a solver's output ("yes"/"no"), or None if it is missing.
+    """
+    try:
+        with open(output_path, "r") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+def is_definitive(exe_path, verdict):
+    """
+    "yes" from any solver is a partition; "no" is final only from the exact
+    solvers (a heuristic may just have run out of time).
+    """
+    alg_name = os.path.splitext(os.path.basename(exe_path))[0]
+    return verdict == "yes" or (verdict == "no" and alg_name not in HEURISTIC_SOLVERS)
+
+def race_solvers(exe_paths, test_id, deadline=None, running=None, num_buckets=NUM_BUCKETS):
+    """
+    Runs the solvers concurrently on one test case and returns
+    (exe_path, verdict) of the first definitive answer; the others are killed.
+    If no answer is definitive, the last finished solver's answer is returned,
+    or (None, None) if nothing finished before `deadline` (absolute time.perf_counter()).
+    `running` may hold already started {exe_path: Popen} that join the race.
+    """
+    procs = dict(running or {})
+    for exe_path in exe_paths:
+        if exe_path in procs:
+            continue
+        try:
+            procs[exe_path] = subprocess.Popen(solver_cmd(exe_path, test_id, num_buckets),
+                                               stdout=subprocess.DEVNULL,
+                                               stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            print(f"[Error] Executable not found: {exe_path}")
+
+    fallback = (None, None)
+    try:
+        while procs:
+            for exe_path, proc in list(procs.items()):
+                if proc.poll() is None:
+                    continue
+                del procs[exe_path]
+                if proc.returncode != 0:
+                    continue
+                verdict = read_verdict(get_output_path(exe_path, test_id))
+                if is_definitive(exe_path, verdict):
+                    return exe_path, verdict
+                fallback = (exe_path, verdict)
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            time.sleep(RACE_POLL_INTERVAL)
+    finally:
+        for proc in procs.values():
+            proc.kill()
+            proc.wait()
+    return fallback
+
+# Parallel Mode
+def init_worker(cpu_queue, pack_paths, cross_check_cells=CROSS_CHECK_MAX_CELLS):
+    """
+    Pool initializer: pins the worker, registers the --pack files and sets the
+    cross-check limit (spawned workers do not inherit the parent's state).
+    """
+    pin_worker(cpu_queue)
+    set_cross_check_cells(cross_check_cells)
+    for pack_path in pack_paths:
+        register_pack(pack_path)
+
+def pin_worker(cpu_queue):
+    """
+    Pool initializer: binds the worker (and every solver it spawns) to a
+    single CPU so that concurrent runs do not steal time from each other.
+    Silently skipped on platforms without sched_setaffinity (e.g. Windows).
+    """
+    if cpu_queue is None or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        cpu = cpu_queue.get_nowait()
+        os.sched_setaffinity(0, {cpu})
+    except Exception:
+        pass
+
+def run_job(exe_path, test_id, cache, stream, repeat, check, num_buckets=NUM_BUCKETS):
+    """
+    Worker entry point for one (solver, test_id) pair. In stream mode each
+    worker keeps its own long-lived solver process per executable.
+    """
+    return exe_path, test_id, run_repeated(exe_path, test_id, cache, stream, repeat, check,
+                                           num_buckets)
+
+def get_worker_cpus(jobs):
+    """
+    Returns the list of CPUs the workers will be pinned to (one per worker),
+    or None if pinning is not supported on this platform.
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if jobs > len(cpus):
+        print(f"[INFO] --jobs {jobs} exceeds the {len(cpus)} available CPUs; using {len(cpus)} workers.")
+    return cpus[:jobs]
 
 # Helpers
+def get_test_n(test_id):
+    """
+    N of a test case, for logging.
+    """
+    if test_id in PACKED_TESTS:
+        pack_path, k = PACKED_TESTS[test_id]
+        return len(_pack_readers[pack_path][k])
+    return get_n_from_file(get_input_path(test_id))
+
 def get_n_from_file(filepath):
     """
     Reads the first number from the input file (usually N) for logging.
@@ -44,6 +326,21 @@ def get_n_from_file(filepath):
         return None
     return None
 
+def get_test_ids_from_store(store_path, ids_arg_list, where=None):
+    """
+    Test IDs from an indexed instance store (see instance_store.py): the
+    patterns and the metadata query are resolved against the store's index,
+    and the instances are read from its pack. The testcases tree is not listed.
+    """
+    try:
+        store = InstanceStore(store_path)
+        rows = store.select(ids_arg_list, where)
+    except (FileNotFoundError, ValueError, sqlite3.DatabaseError) as e:
+        print(f"[ERROR] {e}")
+        return [], None
+    register_pack(store.pack_path)
+    return [row["name"] for row in rows], store.pack_path
+
 def get_test_ids_from_args(ids_arg_list, input_ext):
     """
     Parses user arguments to generate the final list of Test IDs.
@@ -53,10 +350,10 @@ def get_test_ids_from_args(ids_arg_list, input_ext):
         print(f"[ERROR] Directory '{TESTCASE_DIR}' not found.")
         return []
         
-    # Get all base IDs from the directory first
+    # Get all base IDs from the directory first (plus the instances of --pack files)
     all_file_ids = [
         f[:-len(input_ext)] for f in os.listdir(TESTCASE_DIR) if f.endswith(input_ext)
-    ]
+    ] + list(PACKED_TESTS)
     
     final_ids = set()
     
@@ -79,34 +376,122 @@ def get_test_ids_from_args(ids_arg_list, input_ext):
 
     return sorted(list(final_ids))
 
+def run_race_benchmark(args, test_ids):
+    """
+    Portfolio mode: every test case is raced by all solvers at once (one test
+    at a time, since a race already occupies one CPU per solver). The CSV
+    records the winner, its verdict and the time to the first definitive answer.
+    Races are never cached: the winner depends on timing.
+    """
+    if args.jobs > 1 or args.stream:
+        print("[INFO] --race runs one test at a time in file mode; ignoring --jobs/--stream.")
+
+    fcsv = open(args.outcsv, "w", newline="")
+    writer = csv.writer(fcsv)
+    writer.writerow(["TestID", "N", "Winner", "Verdict", "Race_Time", "Check"])
+
+    print(f"Starting Portfolio Race...")
+    print(f"Solvers: {args.algs}")
+    print(f"Testing {len(test_ids)} total cases.")
+    header_line = "{:<12} {:<8} {:<12} {:<8} {:<12}".format("TestID", "N", "Winner", "Verdict", "Race_Time")
+    print("-" * len(header_line))
+    print(header_line)
+    print("-" * len(header_line))
+
+    for test_id in test_ids:
+        current_n = get_test_n(test_id)
+        n_str = str(current_n) if current_n is not None else "N/A"
+
+        start = time.perf_counter_ns()
+        winner, verdict = race_solvers(args.algs, test_id, num_buckets=args.k)
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+
+        winner_name = os.path.basename(winner) if winner else "Error"
+        verdict = verdict or "Error"
+        status = check_run(winner, test_id, args.k) if winner and not args.no_check else ""
+        print("{:<12} {:<8} {:<12} {:<8} {:<12.6f}".format(test_id, n_str, winner_name, verdict, elapsed))
+        writer.writerow([test_id, n_str, winner_name, verdict, f"{elapsed:.6f}", status])
+        fcsv.flush()
+
+    fcsv.close()
+    print("-" * len(header_line))
+    print(f"[Done] Race finished. Results saved to {args.outcsv}")
+
 def main():
     parser = argparse.ArgumentParser(description="Automated Benchmark System")
     parser.add_argument("--algs", nargs="+", required=True, help="List of solver executables")
     # args.ns is a list of strings to support patterns
     parser.add_argument("--ns", nargs="+", required=True, help="List of Test IDs (supports patterns like 'dp1_*' or 'scan')")
     parser.add_argument("--outcsv", default="results.csv")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of parallel workers, each pinned to its own CPU (default: 1, sequential)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-run the solvers instead of reusing cached results")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="Result cache database")
+    parser.add_argument("--stream", action="store_true",
+                        help="Pipe instances through one long-lived '-stream' solver process per worker")
+    parser.add_argument("--no-check", action="store_true",
+                        help="Skip validating the solver outputs (the <alg>_Check columns stay empty)")
+    parser.add_argument("--cross-check-cells", type=int, default=CROSS_CHECK_MAX_CELLS,
+                        help="Cross-check a 'no' with the NumPy DP only if (S/3+1)^2 is at most this "
+                             f"(default: {CROSS_CHECK_MAX_CELLS}; 0 turns it off)")
+    parser.add_argument("--pack", nargs="+", default=[],
+                        help="Instance packs (see instance_pack.py) whose instances become test IDs")
+    parser.add_argument("--store", default=None,
+                        help="Indexed instance store (see instance_store.py) to select the test IDs from")
+    parser.add_argument("--where", default=None,
+                        help="Metadata query on the --store index, e.g. \"n>=500 and sum<1e6\"")
+    parser.add_argument("--race", action="store_true",
+                        help="Run all solvers concurrently per test; the first definitive answer wins")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Runs per (solver, test); the CSV reports the median, p95 and stddev (default: 1)")
+    parser.add_argument("--k", type=int, default=NUM_BUCKETS,
+                        help="Number of buckets, passed to the solvers as -k (default: 3; mitm supports only 3)")
     
     args = parser.parse_args()
 
+    for pack_path in args.pack:
+        register_pack(pack_path)
+    set_cross_check_cells(args.cross_check_cells)
+
     # Resolve test IDs
-    test_ids = get_test_ids_from_args(args.ns, INPUT_EXT)
+    if args.store:
+        test_ids, store_pack = get_test_ids_from_store(args.store, args.ns, args.where)
+        if store_pack:
+            args.pack.append(store_pack)
+    elif args.where:
+        print("[ERROR] --where needs an indexed instance store (--store).")
+        return
+    else:
+        test_ids = get_test_ids_from_args(args.ns, INPUT_EXT)
     
     if not test_ids:
         print("[ERROR] No valid test cases found based on input patterns.")
         return
 
+    if args.race:
+        run_race_benchmark(args, test_ids)
+        return
+
+    cache = None if args.no_cache else ResultCache(args.cache_path)
+
     # Setup CSV
     fcsv = open(args.outcsv, "w", newline="")
     writer = csv.writer(fcsv)
     
     header = ["TestID", "N"]
     for alg in args.algs:
-        header.append(f"{os.path.basename(alg)}_Time")
+        header += [f"{os.path.basename(alg)}_{suffix}" for suffix, _, _ in STAT_COLUMNS]
+        header.append(f"{os.path.basename(alg)}_Check")
     writer.writerow(header)
 
     print(f"Starting Benchmark...")
     print(f"Solvers: {args.algs}")
     print(f"Testing {len(test_ids)} total cases.")
+    if args.jobs > 1:
+        print(f"Parallel mode: {args.jobs} workers.")
+    if args.repeat > 1:
+        print(f"Each run is repeated {args.repeat} times; times are medians.")
 
     # Console table header
     header_line = "{:<12} {:<8}".format("TestID", "N")
@@ -116,41 +501,71 @@ def main():
     print(header_line)
     print("-" * len(header_line))
 
+    n_strs = {}
     for test_id in test_ids:
-        input_file = os.path.join(TESTCASE_DIR, f"{test_id}{INPUT_EXT}")
-        
         # Grab N for context
-        current_n = get_n_from_file(input_file)
-        n_str = str(current_n) if current_n is not None else "N/A"
-        
-        output_row = "{:<12} {:<8}".format(test_id, n_str)
+        current_n = get_test_n(test_id)
+        n_strs[test_id] = str(current_n) if current_n is not None else "N/A"
 
-        # Run solvers for console output
+    def emit_row(test_id, results):
+        """
+        Prints one finished test case (median times) and writes all of its
+        stats to the CSV. Fields the platform cannot measure are left empty.
+        """
+        output_row = "{:<12} {:<8}".format(test_id, n_strs[test_id])
+        csv_row = [test_id, n_strs[test_id]]
         for alg in args.algs:
-            t = run_solver(alg, test_id)
-            if t is None:
+            stats = results[alg]
+            if stats is None:
                 output_row += " {:<12}".format("Error")
-            else:
-                output_row += " {:<12.6f}".format(t)
-
+                csv_row += ["Error"] + [""] * len(STAT_COLUMNS)
+                continue
+            output_row += " {:<12.6f}".format(stats["wall"])
+            for _, field, is_time in STAT_COLUMNS:
+                value = stats.get(field)
+                if value is None:
+                    csv_row.append("")
+                elif is_time:
+                    csv_row.append(f"{value:.6f}")
+                else:
+                    csv_row.append(f"{value:g}")
+            csv_row.append(stats.get("check", ""))
         print(output_row)
-        
-        # Write to CSV
-        csv_row = [test_id, n_str]
-        
-        # Inefficient, but keeps the flow simple. Optimize later if needed.
-        for alg in args.algs:
-            t = run_solver(alg, test_id)
-            if t is None:
-                csv_row.append("Error")
-            else:
-                csv_row.append(f"{t:.6f}")
-        
         writer.writerow(csv_row)
+        fcsv.flush()
+
+    if args.jobs <= 1:
+        for test_id in test_ids:
+            # Each solver runs once (or --repeat times); the same stats feed console and CSV
+            results = {alg: run_repeated(alg, test_id, cache, args.stream, args.repeat,
+                                         not args.no_check, args.k)
+                       for alg in args.algs}
+            emit_row(test_id, results)
+    else:
+        cpus = get_worker_cpus(args.jobs)
+        workers = len(cpus) if cpus else args.jobs
+        cpu_queue = None
+        if cpus:
+            cpu_queue = multiprocessing.Queue()
+            for cpu in cpus:
+                cpu_queue.put(cpu)
+
+        # Rows are emitted in completion order, as soon as every solver is done
+        pending = {test_id: {} for test_id in test_ids}
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(cpu_queue, args.pack, args.cross_check_cells)) as pool:
+            futures = [pool.submit(run_job, alg, test_id, cache, args.stream, args.repeat,
+                                   not args.no_check, args.k)
+                       for test_id in test_ids for alg in args.algs]
+            for future in as_completed(futures):
+                alg, test_id, stats = future.result()
+                pending[test_id][alg] = stats
+                if len(pending[test_id]) == len(args.algs):
+                    emit_row(test_id, pending.pop(test_id))
 
     fcsv.close()
     print("-" * len(header_line))
-    print(f"[Done] Benchmark finished. Results saved to results.csv")
+    print(f"[Done] Benchmark finished. Results saved to {args.outcsv}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,377 @@
+import argparse
+import csv
+import math
+import os
+import subprocess
+import time
+
+from benchmark import (TESTCASE_DIR, INPUT_EXT, NUM_BUCKETS, get_output_path, get_test_ids_from_args,
+                       is_definitive, race_solvers, read_verdict, solver_cmd)
+from solver_stream import read_instance
+
+# Config
+OUTPUT_DIR = "../../output"     # Timing CSVs the cost model is fitted to
+SRC_DIR = "../src"
+ENGINES = ["dfs", "dp", "sa", "mitm"]
+SA_TIME_LIMIT = 0.9             # Wall-clock budget of one ./sa run (see sa.cpp)
+DP_MEM_BUDGET = 2048 << 20      # dp.cpp's default -mem: bytes for the bit rows / tuple sets
+MITM_MAX_N = 80                 # mitm.cpp's MAX_N: values per part
+MITM_SEC_PER_STATE = 2.5e-7     # mitm enumerates 3^(n/2) states per half (n = 28: 1.2 s)
+BUDGET_SLACK = 3.0              # First choice may take this many times its prediction ...
+MIN_BUDGET = 1.0                # ... but at least this many seconds
+MIN_GUESSED_PART = 16           # reduce.h: values per half of a split that is not exact
+
+# Helpers
+def get_exe_path(engine, src_dir=SRC_DIR):
+    """
+    Path of a compiled solver (adds .exe on Windows).
+    """
+    exe = os.path.join(src_dir, engine)
+    if os.name == 'nt':
+        exe += ".exe"
+    return exe
+
+def part_ok(values, num_buckets=NUM_BUCKETS):
+    """
+    reduce.h's part_ok: the basic checks in units of the values' GCD.
+    """
+    if len(values) < num_buckets:
+        return False
+    g = math.gcd(*values)
+    if g == 0:
+        return True
+    total = sum(values)
+    return (total // g) % num_buckets == 0 and max(values) <= total // num_buckets
+
+def reduced_parts(values, num_buckets=NUM_BUCKETS):
+    """
+    The parts the solvers' scale reduction (src/reduce.h) hands to the engine,
+    each divided by its GCD. At every level the first split reduce.h tries is
+    taken, i.e. a guessed split is assumed to work out.
+    """
+    g = math.gcd(*values)
+    if g > 1:
+        values = [v // g for v in values]
+    largest = max(values, default=0)
+    rest_of = list(values)
+    if largest:
+        rest_of.remove(largest)
+    factors = sorted({f for f in (math.gcd(largest, v) for v in rest_of) if f > 1}, reverse=True)
+    for f in factors:
+        multiples = [v for v in values if v % f == 0]
+        rest = [v for v in values if v % f != 0]
+        if not part_ok(multiples, num_buckets) or not part_ok(rest, num_buckets):
+            continue
+        exact = sum(rest) < f
+        if not exact and (len(multiples) < MIN_GUESSED_PART or len(rest) < MIN_GUESSED_PART):
+            continue
+        return reduced_parts(multiples, num_buckets) + reduced_parts(rest, num_buckets)
+    return [values]
+
+def dp_bytes(n, total, num_buckets=NUM_BUCKETS, mem_budget=DP_MEM_BUDGET):
+    """
+    Memory dp.cpp's default -mode auto needs for one part of n values summing
+    to `total`, as it counts against -mem: the two dense bit-row layers for
+    K = 3 if they fit into mem_budget (auto switches to them once the frontier is dense),
+    otherwise an upper bound on the sparse tuple sets of all layers (layer i
+    holds at most min(K^i, (T+1)^(K-1)) states at two or more slots each).
+    """
+    target = total // num_buckets
+    if num_buckets == 3:
+        dense = 2 * (target + 1) * (target // 64 + 1) * 8
+        if dense <= mem_budget:
+            return dense
+    width = num_buckets - 1
+    layer_cap = (target + 1) ** width
+    states = 0
+    layer = 1
+    for i in range(n + 1):
+        if layer >= layer_cap:
+            states += (n + 1 - i) * layer_cap
+            break
+        states += layer
+        layer *= num_buckets
+    return 2 * states * (width * 4 + 1)
+
+def instance_features(values, num_buckets=NUM_BUCKETS):
+    """
+    Features the cost model looks at: N, total sum, max value, the value
+    spread (max - min) / mean, and the (N, sum) of every part the scale
+    reduction leaves for a `num_buckets`-way partition (see reduced_parts).
+    """
+    n = len(values)
+    total = sum(values)
+    max_val = max(values) if values else 0
+    min_val = min(values) if values else 0
+    mean = total / n if n else 0
+    spread = (max_val - min_val) / mean if mean > 0 else 0.0
+    parts = [(n, total)]
+    if part_ok(values, num_buckets):
+        parts = [(len(p), sum(p)) for p in reduced_parts(values, num_buckets)]
+    return {"n": n, "sum": total, "max": max_val, "spread": spread, "parts": parts}
+
+def trivially_infeasible(features, num_buckets=NUM_BUCKETS):
+    """
+    The checks every solver starts with: no partition if the sum is not
+    divisible by K or one value exceeds the target.
+    """
+    n, total = features["n"], features["sum"]
+    return n < num_buckets or total % num_buckets != 0 or features["max"] > total // num_buckets
+
+def read_csv_rows(filename):
+    path = os.path.join(OUTPUT_DIR, filename)
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+def least_squares(xs, ys):
+    """
+    Solves min ||X b - y|| via the normal equations (X has a leading 1 column
+    added here). Returns None if there is not enough data.
+    """
+    rows = [[1.0] + list(x) for x in xs]
+    k = len(rows[0]) if rows else 0
+    if len(rows) < k or k == 0:
+        return None
+    a = [[sum(r[i] * r[j] for r in rows) for j in range(k)] for i in range(k)]
+    b = [sum(r[i] * y for r, y in zip(rows, ys)) for i in range(k)]
+    # Gaussian elimination with partial pivoting
+    for col in range(k):
+        piv = max(range(col, k), key=lambda r: abs(a[r][col]))
+        if abs(a[piv][col]) < 1e-12:
+            return None
+        a[col], a[piv] = a[piv], a[col]
+        b[col], b[piv] = b[piv], b[col]
+        for r in range(col + 1, k):
+            f = a[r][col] / a[col][col]
+            for c in range(col, k):
+                a[r][c] -= f * a[col][c]
+            b[r] -= f * b[col]
+    coef = [0.0] * k
+    for r in range(k - 1, -1, -1):
+        coef[r] = (b[r] - sum(a[r][c] * coef[c] for c in range(r + 1, k))) / a[r][r]
+    return coef
+
+class CostModel:
+    """
+    Predicted wall time of each engine, fitted to the timing CSVs in output/:
+
+    * dp:  log t = a + b log N + c log S   (dp_fixedn_results, dp_fixedsum_results,
+           DpBase100), summed over the parts left by the scale reduction;
+           infinite if a part may exceed DP_MEM_BUDGET (see dp_bytes).
+    * dfs: log t = a + b N                 (solved instances in dfs.csv).
+    * sa:  SA_TIME_LIMIT / p(spread), where p is the success rate of saGreedyFix
+           runs with a similar spread. SA is only a heuristic: its "no" is never
+           final, so it is preferred only when it is expected to be cheaper.
+    * mitm: MITM_SEC_PER_STATE * 3^(n/2), summed over the parts; infinite if
+           a part has more than MITM_MAX_N values or K != 3.
+    """
+
+    def __init__(self):
+        self.dp_coef = self.fit_dp()
+        self.dfs_coef = self.fit_dfs()
+        self.sa_bins = self.fit_sa()
+
+    @staticmethod
+    def fit_dp():
+        xs, ys = [], []
+        for name in ["dp_fixedn_results.csv", "dp_fixedsum_results.csv", "DpBase100.csv"]:
+            for row in read_csv_rows(name):
+                try:
+                    n = int(row["n"])
+                    s = int(row.get("total_sum") or row["sum"])
+                    t = float(row["dp_time"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if t > 0:
+                    xs.append((math.log(n), math.log(s)))
+                    ys.append(math.log(t))
+        return least_squares(xs, ys)
+
+    @staticmethod
+    def fit_dfs():
+        xs, ys = [], []
+        for row in read_csv_rows("dfs.csv"):
+            try:
+                n = int(row["n"])
+                t = float(row["./dfs_time"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            # Only instances DFS actually had to search ("no" cases stop at the basic checks)
+            if row.get("./dfs_check") == "Correct" and t > 0:
+                xs.append((n,))
+                ys.append(math.log(t))
+        return least_squares(xs, ys)
+
+    @staticmethod
+    def fit_sa():
+        """
+        (spread bin, (runs, successes)) pairs, spread rounded to 0.1.
+        """
+        counts = {}
+        for row in read_csv_rows("saGreedyFix.csv"):
+            try:
+                mean = float(row["average_value"])
+                spread = (float(row["max_value"]) - float(row["min_value"])) / mean
+            except (KeyError, TypeError, ValueError, ZeroDivisionError):
+                continue
+            key = round(spread, 1)
+            total, ok = counts.get(key, (0, 0))
+            counts[key] = (total + 1, ok + (row.get("success_flag") == "True"))
+        return sorted(counts.items())
+
+    def sa_success_rate(self, spread):
+        if not self.sa_bins:
+            return 0.5
+        total = ok = 0
+        # Closest bins first until there is enough data for a stable estimate
+        for key, (t, s) in sorted(self.sa_bins, key=lambda kv: abs(kv[0] - spread)):
+            total += t
+            ok += s
+            if total >= 20:
+                break
+        return max(ok / total, 0.01)
+
+    def predict(self, features, num_buckets=NUM_BUCKETS):
+        """
+        Returns {engine: predicted seconds} (math.inf if the engine cannot run).
+        """
+        n = features["n"]
+        parts = features["parts"]
+        costs = {}
+
+        if self.dp_coef and all(dp_bytes(pn, s, num_buckets) <= DP_MEM_BUDGET for pn, s in parts):
+            a, b, c = self.dp_coef
+            costs["dp"] = sum(math.exp(a + b * math.log(max(pn, 1)) + c * math.log(max(s, 1)))
+                              for pn, s in parts)
+        else:
+            costs["dp"] = math.inf
+
+        if self.dfs_coef:
+            a, b = self.dfs_coef
+            # Clamp the exponent so very large N reads as "never" instead of overflowing
+            costs["dfs"] = math.exp(min(a + b * n, 700.0))
+        else:
+            costs["dfs"] = math.inf
+
+        costs["sa"] = SA_TIME_LIMIT / self.sa_success_rate(features["spread"])
+
+        if num_buckets == 3 and all(pn <= MITM_MAX_N for pn, _ in parts):
+            costs["mitm"] = sum(MITM_SEC_PER_STATE * 3 ** (pn / 2) for pn, _ in parts)
+        else:
+            costs["mitm"] = math.inf
+        return costs
+
+def dispatch(test_id, model, src_dir=SRC_DIR, timeout=None, num_buckets=NUM_BUCKETS):
+    """
+    Solves one test case with the engine the cost model predicts to be the
+    fastest. If it has no definitive answer within BUDGET_SLACK times its
+    prediction, the remaining engines are started and race it.
+
+    Returns a dict with the chosen and winning engine, predictions and time;
+    the winning output is copied to <test_id>.dispatch.out.
+    """
+    input_path = os.path.join(TESTCASE_DIR, f"{test_id}{INPUT_EXT}")
+    features = instance_features(read_instance(input_path), num_buckets)
+    costs = model.predict(features, num_buckets)
+    choice = min(ENGINES, key=lambda e: costs[e])
+    result = {"features": features, "costs": costs, "choice": choice,
+              "winner": None, "verdict": None, "fallback": False}
+    dispatch_out = get_output_path("dispatch", test_id)
+
+    start = time.perf_counter_ns()
+    deadline = time.perf_counter() + timeout if timeout else None
+    if trivially_infeasible(features, num_buckets):
+        # Same basic checks as the solvers; no process needed
+        result.update(winner="check", verdict="no")
+        with open(dispatch_out, "w") as f:
+            f.write("no\n")
+        result["time"] = (time.perf_counter_ns() - start) / 1e9
+        return result
+
+    budget = max(MIN_BUDGET, BUDGET_SLACK * costs[choice])
+    if deadline is not None:
+        budget = min(budget, deadline - time.perf_counter())
+    exe = get_exe_path(choice, src_dir)
+    proc = subprocess.Popen(solver_cmd(exe, test_id, num_buckets),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        proc.wait(timeout=budget)
+        verdict = read_verdict(get_output_path(exe, test_id)) if proc.returncode == 0 else None
+        running = {}
+    except subprocess.TimeoutExpired:
+        verdict = None
+        running = {exe: proc}
+
+    if is_definitive(exe, verdict):
+        winner = choice
+    else:
+        # First choice blew its budget (or SA found nothing): race everything
+        result["fallback"] = True
+        exes = {get_exe_path(e, src_dir): e for e in ENGINES if costs[e] < math.inf}
+        winner_exe, race_verdict = race_solvers([e for e in exes if e != exe], test_id,
+                                                deadline, running, num_buckets)
+        winner = exes.get(winner_exe)
+        if winner is None and verdict is not None:
+            winner, race_verdict = choice, verdict
+        verdict = race_verdict
+    result["time"] = (time.perf_counter_ns() - start) / 1e9
+    result.update(winner=winner, verdict=verdict)
+
+    if winner is not None:
+        with open(get_output_path(get_exe_path(winner, src_dir), test_id), "r") as f:
+            output = f.read()
+        with open(dispatch_out, "w") as f:
+            f.write(output)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve test cases with the predicted-fastest solver")
+    parser.add_argument("--ns", nargs="+", required=True, help="List of Test IDs (supports patterns like 'dp1_*' or 'scan')")
+    parser.add_argument("--src", default=SRC_DIR, help="Directory with the compiled solvers")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Give up on a test case after this many seconds (default: no limit)")
+    parser.add_argument("--outcsv", default=None, help="Optional CSV with one row per test case")
+    parser.add_argument("--k", type=int, default=NUM_BUCKETS,
+                        help="Number of buckets, passed to the solvers as -k (default: 3)")
+    args = parser.parse_args()
+
+    test_ids = get_test_ids_from_args(args.ns, INPUT_EXT)
+    if not test_ids:
+        print("[ERROR] No valid test cases found based on input patterns.")
+        return
+
+    model = CostModel()
+    writer = None
+    if args.outcsv:
+        fcsv = open(args.outcsv, "w", newline="")
+        writer = csv.writer(fcsv)
+        writer.writerow(["TestID", "N", "Sum", "Max", "Spread"] + [f"Pred_{e}" for e in ENGINES]
+                        + ["Choice", "Winner", "Fallback", "Verdict", "Time"])
+
+    header_line = "{:<12} {:<8} {:<8} {:<8} {:<9} {:<8} {:<10}".format(
+        "TestID", "N", "Choice", "Winner", "Fallback", "Verdict", "Time")
+    print("-" * len(header_line))
+    print(header_line)
+    print("-" * len(header_line))
+
+    for test_id in test_ids:
+        r = dispatch(test_id, model, args.src, args.timeout, args.k)
+        f = r["features"]
+        print("{:<12} {:<8} {:<8} {:<8} {:<9} {:<8} {:<10.6f}".format(
+            test_id, f["n"], r["choice"], r["winner"] or "-", "yes" if r["fallback"] else "no",
+            r["verdict"] or "-", r["time"]))
+        if writer:
+            writer.writerow([test_id, f["n"], f["sum"], f["max"], f"{f['spread']:.4f}"]
+                            + [f"{r['costs'][e]:.6g}" for e in ENGINES]
+                            + [r["choice"], r["winner"] or "", r["fallback"], r["verdict"] or "",
+                               f"{r['time']:.6f}"])
+            fcsv.flush()
+
+    if writer:
+        fcsv.close()
+    print("-" * len(header_line))
+
+if __name__ == "__main__":
+    main()
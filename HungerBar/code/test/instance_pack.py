@@ -0,0 +1,189 @@
+"""
+Packed binary container for many instances (read by the solvers via
+code/src/pack_reader.h).
+
+Layout (all integers little-endian):
+    header : b"TPIB" | u32 version (1) | u64 count | u64 index_offset
+    values : the int64 values of every instance, back to back (8-byte aligned)
+    names  : UTF-8 instance names (e.g. "sa_17"), back to back
+    index  : count x (u64 values_offset, u64 n, u64 name_offset, u64 name_len)
+
+The index sits at the end, so a pack is written in one streaming pass.
+Readers memory-map the file; an instance is a zero-copy int64 view.
+
+Usage:
+    python instance_pack.py pack --ns 'sa_*' --out sa.pack     # .in files -> pack
+    python instance_pack.py unpack sa.pack --outdir ../../testcases
+    python instance_pack.py list sa.pack
+"""
+import argparse
+import fnmatch
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"TPIB"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQ")
+INDEX_ENTRY = struct.Struct("<QQQQ")
+PACK_EXT = ".pack"
+
+TESTCASE_DIR = "../../testcases"
+
+
+class PackWriter:
+    """
+    Streams instances into a pack file: values go out as they are added, the
+    names and the index are appended by close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self.entries = []   # (values_offset, n, name)
+
+    def add(self, name, values):
+        """
+        Appends one instance (any sequence of ints that fit into int64) and
+        returns its index in the pack.
+        """
+        offset = self.f.tell()
+        n = len(values)
+        if isinstance(values, memoryview):
+            # e.g. a PackReader view: already int64, copy the raw bytes
+            self.f.write(values)
+        elif hasattr(values, "dtype"):
+            self.f.write(values.astype("<i8", copy=False).tobytes())
+        else:
+            self.f.write(struct.pack(f"<{n}q", *values))
+        self.entries.append((offset, n, name))
+        return len(self.entries) - 1
+
+    def close(self):
+        names = bytearray()
+        name_refs = []
+        names_offset = self.f.tell()
+        for _, _, name in self.entries:
+            raw = name.encode("utf-8")
+            name_refs.append((names_offset + len(names), len(raw)))
+            names += raw
+        self.f.write(names)
+        # Keep the index 8-byte aligned for the C++ reader
+        self.f.write(b"\0" * (-self.f.tell() % 8))
+        index_offset = self.f.tell()
+        for (offset, n, _), (name_offset, name_len) in zip(self.entries, name_refs):
+            self.f.write(INDEX_ENTRY.pack(offset, n, name_offset, name_len))
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, len(self.entries), index_offset))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PackReader:
+    """
+    Memory-mapped read access to a pack:
+        pack = PackReader("sa.pack")
+        pack.names          # ["sa_1", "sa_2", ...]
+        pack[i]             # memoryview of int64 values (zero-copy)
+        pack.get("sa_17")   # same, by name
+        pack.values(i)      # list of ints
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {VERSION} instance pack")
+        self._index = [INDEX_ENTRY.unpack_from(self._map, index_offset + k * INDEX_ENTRY.size)
+                       for k in range(count)]
+        self.names = [bytes(self._map[o:o + n]).decode("utf-8") for _, _, o, n in self._index]
+        self._by_name = {name: k for k, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, k):
+        offset, n, _, _ = self._index[k]
+        return memoryview(self._map)[offset:offset + 8 * n].cast("q")
+
+    def index_of(self, name):
+        return self._by_name[name]
+
+    def get(self, name):
+        return self[self._by_name[name]]
+
+    def values(self, k):
+        return self[k].tolist()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def write_text_instance(path, values):
+    with open(path, "w") as f:
+        f.write(f"{len(values)}\n")
+        f.write(" ".join(map(str, values)) + "\n")
+
+
+def read_text_instance(path):
+    with open(path, "r") as f:
+        tokens = f.read().split()
+    n = int(tokens[0])
+    return [int(x) for x in tokens[1:n + 1]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert between .in files and instance packs")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("pack", help="Pack .in files into one file")
+    p.add_argument("--ns", nargs="+", required=True, help="Test IDs or wildcards (e.g. 'sa1_*')")
+    p.add_argument("--dir", default=TESTCASE_DIR)
+    p.add_argument("--out", required=True)
+
+    u = sub.add_parser("unpack", help="Write every instance of a pack as <name>.in")
+    u.add_argument("pack")
+    u.add_argument("--outdir", default=TESTCASE_DIR)
+
+    l = sub.add_parser("list", help="Print the names and sizes in a pack")
+    l.add_argument("pack")
+
+    args = parser.parse_args()
+
+    if args.cmd == "pack":
+        ids = sorted(f[:-3] for f in os.listdir(args.dir) if f.endswith(".in"))
+        selected = [i for i in ids if any(fnmatch.fnmatch(i, pat) for pat in args.ns)]
+        if not selected:
+            print("[ERROR] No matching .in files.")
+            sys.exit(1)
+        with PackWriter(args.out) as w:
+            for test_id in selected:
+                w.add(test_id, read_text_instance(os.path.join(args.dir, f"{test_id}.in")))
+        print(f"[OK] Packed {len(selected)} instances into {args.out}")
+    elif args.cmd == "unpack":
+        pack = PackReader(args.pack)
+        os.makedirs(args.outdir, exist_ok=True)
+        for k, name in enumerate(pack.names):
+            write_text_instance(os.path.join(args.outdir, f"{name}.in"), pack.values(k))
+        print(f"[OK] Unpacked {len(pack)} instances into {args.outdir}")
+        pack.close()
+    else:
+        pack = PackReader(args.pack)
+        for k, name in enumerate(pack.names):
+            print(f"{k:<8} {name:<16} n={len(pack[k])}")
+        pack.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Indexed instance store: every test case in one pack file plus a SQLite index
+with its metadata, so the harness can select instances without listing or
+opening the per-file testcases tree.
+
+    <store>.pack    all instances (see instance_pack.py), read via mmap / -pack
+    <store>.sqlite  one row per instance:
+                    name, pack_index, n, sum, min, max,
+                    family (name prefix, e.g. "dp1"), generator (script that
+                    produces the family), source (file or pack it came from),
+                    source_size, source_mtime
+
+Usage:
+    python instance_store.py build                         # index ../../testcases/*.in
+    python instance_store.py build --pack ../../testcases/sa1.pack
+    python instance_store.py query --ns 'sa*' --where "n>=500 and sum<1e6"
+    python benchmark.py --algs ../src/dp --store ../../testcases/store --where "n<=100"
+"""
+import argparse
+import fnmatch
+import os
+import re
+import sqlite3
+import sys
+
+from instance_pack import PackReader, PackWriter, read_text_instance
+
+TESTCASE_DIR = "../../testcases"
+DEFAULT_STORE = os.path.join(TESTCASE_DIR, "store")
+INPUT_EXT = ".in"
+
+# Generator script of each family (the test ID without its trailing index)
+GENERATORS = {
+    "dfs": "dfsGenerator.py",
+    "dp1": "dp_fixednGen.py",
+    "dp2": "dp_fixedSumGen.py",
+    "dp3": "dpTimeGen.py",
+    "sa": "GreedyGen.py",
+    "sa1": "BaseGen.py",
+    "hard": "HardGen.py",
+}
+
+# Columns a --where query may refer to
+QUERY_COLUMNS = ["name", "pack_index", "n", "sum", "min", "max", "family", "generator", "source"]
+
+_TOKEN = re.compile(r"""\s*(?:
+      (?P<num>-?\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_]\w*)
+    | (?P<str>'[^']*')
+    | (?P<op><=|>=|!=|==|=|<|>|\(|\))
+)""", re.VERBOSE)
+_KEYWORDS = {"and", "or", "not", "like", "glob", "is", "null"}
+
+
+def family_of(name):
+    """
+    Instance family: the name without its trailing number ("dp1_17" -> "dp1",
+    "dfs12" -> "dfs").
+    """
+    return re.sub(r"_?\d+$", "", name) or name
+
+
+def compile_where(query):
+    """
+    Translates a metadata query such as "n>=500 and sum<1e6" into an SQL
+    condition and its parameters. Only the QUERY_COLUMNS, numbers (signed),
+    quoted strings, comparisons, and/or/not/like/glob/is null and parentheses
+    are accepted; anything else raises ValueError. The tokens are not checked
+    for grammar here: a malformed query such as "n >=" fails in select.
+    """
+    sql, params = [], []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        m = _TOKEN.match(query, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"cannot parse query near {query[pos:]!r}")
+        pos = m.end()
+        if m.group("num"):
+            text = m.group("num")
+            params.append(float(text) if any(c in text for c in ".eE") else int(text))
+            sql.append("?")
+        elif m.group("str"):
+            params.append(m.group("str")[1:-1])
+            sql.append("?")
+        elif m.group("op"):
+            sql.append("=" if m.group("op") == "==" else m.group("op"))
+        else:
+            word = m.group("word")
+            if word.lower() in _KEYWORDS:
+                sql.append(word.upper())
+            elif word in QUERY_COLUMNS:
+                sql.append(f'"{word}"')
+            else:
+                raise ValueError(f"unknown column {word!r} (known: {', '.join(QUERY_COLUMNS)})")
+    return " ".join(sql), params
+
+
+class InstanceStore:
+    """
+    Read access to a built store:
+        store = InstanceStore("../../testcases/store")
+        store.select(["dp1_*"], "n >= 50")   # index rows, row["name"], row["n"], ...
+        store.pack_path                      # pass to the solvers' -pack
+    """
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.pack_path = path + ".pack"
+        self.index_path = path + ".sqlite"
+        if not (os.path.exists(self.pack_path) and os.path.exists(self.index_path)):
+            raise FileNotFoundError(f"no instance store at {path} (run instance_store.py build)")
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def select(self, patterns=None, where=None):
+        """
+        Index rows (sqlite3.Row: name, pack_index, n, sum, ...) of the
+        instances matching any of the patterns (exact IDs, wildcards, or
+        'scan'/'*' for all) and the metadata query, sorted by name.
+        Raises ValueError for a query that does not compile.
+        """
+        sql = "SELECT * FROM instances"
+        params = []
+        if where:
+            cond, params = compile_where(where)
+            sql += f" WHERE {cond}"
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql + " ORDER BY name", params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"invalid query {where!r} ({e})") from e
+        finally:
+            conn.close()
+        if not patterns or any(p.lower() == "scan" or p == "*" for p in patterns):
+            return rows
+        return [row for row in rows if any(fnmatch.fnmatchcase(row["name"], p) for p in patterns)]
+
+
+def scan_sources(testcase_dir, packs):
+    """
+    Every instance to index as (name, source, size, mtime, loader). Text files
+    win over pack entries of the same name.
+    """
+    sources = {}
+    for pack_path in packs:
+        st = os.stat(pack_path)
+        reader = PackReader(pack_path)
+        for k, name in enumerate(reader.names):
+            sources[name] = (pack_path, st.st_size, st.st_mtime_ns,
+                             lambda reader=reader, k=k: reader[k])
+    with os.scandir(testcase_dir) as it:
+        for entry in it:
+            if entry.name.endswith(INPUT_EXT) and entry.is_file():
+                st = entry.stat()
+                sources[entry.name[:-len(INPUT_EXT)]] = (
+                    entry.path, st.st_size, st.st_mtime_ns,
+                    lambda path=entry.path: read_text_instance(path))
+    return sources
+
+
+def build_store(path=DEFAULT_STORE, testcase_dir=TESTCASE_DIR, packs=()):
+    """
+    (Re)builds the store from the .in files of testcase_dir and the given
+    packs. Instances whose source file is unchanged (same size and mtime) are
+    copied from the previous store instead of being parsed again. Both files
+    are written next to each other and swapped in atomically.
+    Returns (indexed, reused).
+    """
+    pack_path, index_path = path + ".pack", path + ".sqlite"
+    old_pack, old_rows = None, {}
+    if os.path.exists(pack_path) and os.path.exists(index_path):
+        try:
+            old_pack = PackReader(pack_path)
+            with sqlite3.connect(index_path) as conn:
+                for name, k, source, size, mtime in conn.execute(
+                        "SELECT name, pack_index, source, source_size, source_mtime FROM instances"):
+                    old_rows[name] = (k, source, size, mtime)
+        except (ValueError, sqlite3.DatabaseError):
+            # Unreadable previous store: rebuild everything from the sources
+            old_pack, old_rows = None, {}
+
+    sources = scan_sources(testcase_dir, packs)
+    tmp_pack, tmp_index = pack_path + ".tmp", index_path + ".tmp"
+    if os.path.exists(tmp_index):
+        os.remove(tmp_index)
+    rows = []
+    reused = 0
+    with PackWriter(tmp_pack) as writer:
+        for k, name in enumerate(sorted(sources)):
+            source, size, mtime, load = sources[name]
+            old = old_rows.get(name)
+            if old_pack is not None and old is not None and old[1:] == (source, size, mtime):
+                values = old_pack[old[0]]
+                reused += 1
+            else:
+                values = load()
+            writer.add(name, values)
+            family = family_of(name)
+            rows.append((name, k, len(values), sum(values), min(values, default=0),
+                         max(values, default=0), family, GENERATORS.get(family, ""),
+                         source, size, mtime))
+    if old_pack is not None:
+        values = None   # release the last view into the old map before closing it
+        old_pack.close()
+
+    with sqlite3.connect(tmp_index) as conn:
+        conn.execute(
+            """CREATE TABLE instances (
+                   name TEXT PRIMARY KEY,
+                   pack_index INTEGER,
+                   n INTEGER,
+                   sum INTEGER,
+                   min INTEGER,
+                   max INTEGER,
+                   family TEXT,
+                   generator TEXT,
+                   source TEXT,
+                   source_size INTEGER,
+                   source_mtime INTEGER)"""
+        )
+        conn.executemany("INSERT INTO instances VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("CREATE INDEX instances_n ON instances(n)")
+        conn.execute("CREATE INDEX instances_sum ON instances(sum)")
+        conn.execute("CREATE INDEX instances_family ON instances(family)")
+    conn.close()
+    os.replace(tmp_pack, pack_path)
+    os.replace(tmp_index, index_path)
+    return len(rows), reused
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the indexed instance store")
+    parser.add_argument("--store", default=DEFAULT_STORE,
+                        help="Store path without extension (default: ../../testcases/store)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Index the .in files (and packs) into the store")
+    b.add_argument("--dir", default=TESTCASE_DIR)
+    b.add_argument("--pack", nargs="+", default=[], help="Instance packs to include")
+
+    q = sub.add_parser("query", help="List the instances matching patterns and a metadata query")
+    q.add_argument("--ns", nargs="+", default=["scan"], help="Test IDs or wildcards (default: all)")
+    q.add_argument("--where", default=None, help="Metadata query, e.g. \"n>=500 and sum<1e6\"")
+
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        indexed, reused = build_store(args.store, args.dir, args.pack)
+        print(f"[OK] Indexed {indexed} instances ({reused} unchanged) into {args.store}.pack/.sqlite")
+        return
+
+    try:
+        store = InstanceStore(args.store)
+        rows = store.select(args.ns, args.where)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    for row in rows:
+        print(f"{row['name']:<16} n={row['n']:<8} sum={row['sum']:<14} min={row['min']:<10} "
+              f"max={row['max']:<10} {row['generator'] or row['family']}")
+    print(f"[OK] {len(rows)} instances")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmark import check_run, run_solver
+from dispatch import OUTPUT_DIR, SRC_DIR, get_exe_path
+from result_cache import hash_file
+from run_stats import mann_whitney_greater
+from validator import CORRECT, UNVERIFIED
+
+# Config
+BASELINE_DIR = os.path.join(OUTPUT_DIR, "perf_baselines")
+WARMUP = 2                  # discarded runs per test before the measured ones
+REPEAT = 10                 # measured runs per test
+ALPHA = 0.01                # significance level of the Mann-Whitney test
+TIME_THRESHOLD = 0.10       # relative slowdown of the median wall time that counts
+MEM_THRESHOLD = 0.10        # relative growth of the peak RSS that counts
+
+# Fixed instance sets: suite -> (engine, test IDs)
+SUITES = {
+    "dfs": ("dfs", [f"dfs{i}" for i in range(36, 46)]),                      # dfsGenerator.py hard cases
+    "dp_fixedn": ("dp", [f"dp1_{i}" for i in (1, 10, 20, 30, 40, 50)]),      # dp_fixednGen.py
+    "dp_fixedsum": ("dp", [f"dp2_{i}" for i in (1, 10, 20, 30, 40, 50)]),    # dp_fixedSumGen.py
+    "dp_scaling": ("dp", ["dp3_30", "dp3_35", "dp3_40"]),                    # dpTimeGen.py
+    "sa": ("sa", [f"sa_{i}" for i in range(1, 11)]),                         # GreedyGen.py
+}
+
+# Helpers
+def baseline_path(suite, version):
+    return os.path.join(BASELINE_DIR, suite, f"{version}.json")
+
+def list_baselines(suite):
+    """
+    Versions stored for a suite, oldest first.
+    """
+    folder = os.path.join(BASELINE_DIR, suite)
+    if not os.path.isdir(folder):
+        return []
+    files = [f for f in os.listdir(folder) if f.endswith(".json")]
+    files.sort(key=lambda f: os.path.getmtime(os.path.join(folder, f)))
+    return [os.path.splitext(f)[0] for f in files]
+
+def load_baseline(suite, version=None):
+    """
+    A stored baseline (the latest one if `version` is None).
+    Raises FileNotFoundError if there is none.
+    """
+    if version is None:
+        versions = list_baselines(suite)
+        if not versions:
+            raise FileNotFoundError(f"No baseline recorded for suite '{suite}' (run 'record' first)")
+        version = versions[-1]
+    path = baseline_path(suite, version)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Baseline not found: {path}")
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_baseline(result, force=False):
+    path = baseline_path(result["suite"], result["version"])
+    if os.path.exists(path) and not force:
+        raise FileExistsError(f"Baseline {path} exists (use --force to overwrite)")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(result, f, indent=1)
+    return path
+
+def run_suite(suite, exe_path, warmup=WARMUP, repeat=REPEAT, version=None):
+    """
+    Runs every test of a suite `warmup` + `repeat` times (never cached) and
+    returns the baseline record: the wall time and peak RSS of each measured
+    run, and the validation status of the last output.
+    """
+    engine, test_ids = SUITES[suite]
+    result = {
+        "suite": suite,
+        "version": version or time.strftime("%Y%m%d-%H%M%S"),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "engine": engine,
+        "exe": exe_path,
+        "exe_sha256": hash_file(exe_path),
+        "platform": platform.platform(),
+        "warmup": warmup,
+        "repeat": repeat,
+        "tests": {},
+    }
+    for test_id in test_ids:
+        entry = {"wall": [], "max_rss_kb": [], "check": None}
+        failed = False
+        for i in range(warmup + repeat):
+            stats = run_solver(exe_path, test_id)
+            if stats is None:
+                failed = True
+                break
+            if i >= warmup:
+                entry["wall"].append(stats["wall"])
+                entry["max_rss_kb"].append(stats["max_rss_kb"])
+        entry["check"] = "Failed" if failed else check_run(exe_path, test_id)
+        if not failed:
+            print(f"  {test_id:<12} median {statistics.median(entry['wall']):.4f}s  "
+                  f"rss {max(v or 0 for v in entry['max_rss_kb'])} KB  {entry['check']}")
+        else:
+            print(f"  {test_id:<12} FAILED")
+        result["tests"][test_id] = entry
+    return result
+
+def compare_metric(new, old, threshold, alpha):
+    """
+    (relative change of the median, p-value, regressed) for one metric. A
+    regression needs both a significant Mann-Whitney test (new > old) and a
+    median change above `threshold`.
+    """
+    new = [v for v in new if v is not None]
+    old = [v for v in old if v is not None]
+    if not new or not old:
+        return None, None, False
+    old_med, new_med = statistics.median(old), statistics.median(new)
+    change = (new_med - old_med) / old_med if old_med > 0 else 0.0
+    p = mann_whitney_greater(new, old)
+    return change, p, p < alpha and change > threshold
+
+def compare_results(current, baseline, alpha=ALPHA, time_threshold=TIME_THRESHOLD,
+                    mem_threshold=MEM_THRESHOLD):
+    """
+    One row per test of the baseline. `status` is "ok", "time", "memory",
+    "time+memory", "failed" or "wrong" (the output did not validate).
+    """
+    rows = []
+    for test_id, old in baseline["tests"].items():
+        new = current["tests"].get(test_id)
+        row = {"test": test_id}
+        if new is None or new["check"] == "Failed":
+            row["status"] = "failed"
+            rows.append(row)
+            continue
+        t_change, t_p, t_reg = compare_metric(new["wall"], old["wall"], time_threshold, alpha)
+        m_change, m_p, m_reg = compare_metric(new["max_rss_kb"], old["max_rss_kb"], mem_threshold, alpha)
+        row.update({
+            "base_time": statistics.median(old["wall"]) if old["wall"] else None,
+            "time": statistics.median(new["wall"]),
+            "time_change": t_change, "time_p": t_p,
+            "base_rss_kb": max((v for v in old["max_rss_kb"] if v is not None), default=None),
+            "rss_kb": max((v for v in new["max_rss_kb"] if v is not None), default=None),
+            "rss_change": m_change, "rss_p": m_p,
+        })
+        if new["check"] not in (CORRECT, UNVERIFIED):
+            row["status"] = "wrong"
+        elif t_reg or m_reg:
+            row["status"] = "+".join(name for name, reg in (("time", t_reg), ("memory", m_reg)) if reg)
+        else:
+            row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+def fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+def print_rows(rows):
+    print(f"{'test':<12} {'base(s)':>9} {'now(s)':>9} {'dt':>8} {'p':>7} "
+          f"{'base KB':>9} {'now KB':>9} {'dmem':>8} {'p':>7}  status")
+    for r in rows:
+        print(f"{r['test']:<12} {fmt(r.get('base_time'), '.4f'):>9} {fmt(r.get('time'), '.4f'):>9} "
+              f"{fmt(r.get('time_change'), '+.1%'):>8} {fmt(r.get('time_p'), '.3f'):>7} "
+              f"{fmt(r.get('base_rss_kb'), 'd'):>9} {fmt(r.get('rss_kb'), 'd'):>9} "
+              f"{fmt(r.get('rss_change'), '+.1%'):>8} {fmt(r.get('rss_p'), '.3f'):>7}  {r['status']}")
+
+def write_rows_csv(rows, path):
+    fields = ["test", "status", "base_time", "time", "time_change", "time_p",
+              "base_rss_kb", "rss_kb", "rss_change", "rss_p"]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def resolve_suites(names):
+    if names == ["all"]:
+        return list(SUITES)
+    unknown = [s for s in names if s not in SUITES]
+    if unknown:
+        print(f"[ERROR] Unknown suite(s) {unknown}, expected some of {list(SUITES)}")
+        sys.exit(2)
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance regression suite with stored baselines")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="Show the suites and their recorded baselines")
+
+    for name, help_text in (("record", "Run suites and store the results as a baseline"),
+                            ("compare", "Run suites and compare against a stored baseline")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--suite", nargs="+", default=["all"], help=f"Suites to run (default: all): {list(SUITES)}")
+        p.add_argument("--src", default=SRC_DIR, help="Folder of the compiled solvers (default: ../src)")
+        p.add_argument("--exe", default=None, help="Solver executable (single-engine suites only)")
+        p.add_argument("--warmup", type=int, default=WARMUP)
+        p.add_argument("--repeat", type=int, default=REPEAT)
+        p.add_argument("--version", default=None, help="Baseline version name (default: timestamp)")
+        p.add_argument("--force", action="store_true", help="Overwrite an existing baseline version")
+    c = sub.choices["compare"]
+    c.add_argument("--baseline", default=None, help="Baseline version (default: latest)")
+    c.add_argument("--save", action="store_true", help="Also store this run as a new baseline")
+    c.add_argument("--alpha", type=float, default=ALPHA)
+    c.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    c.add_argument("--mem-threshold", type=float, default=MEM_THRESHOLD)
+    c.add_argument("--outcsv", default=None, help="Write the comparison table to this CSV")
+
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        for suite, (engine, test_ids) in SUITES.items():
+            versions = list_baselines(suite)
+            print(f"{suite:<12} {engine:<4} {len(test_ids):>3} tests  baselines: {', '.join(versions) or '-'}")
+        return
+
+    suites = resolve_suites(args.suite)
+    regressions = 0
+    all_rows = []
+    for suite in suites:
+        engine = SUITES[suite][0]
+        exe_path = args.exe or get_exe_path(engine, args.src)
+        if not os.path.exists(exe_path):
+            print(f"[ERROR] Executable not found: {exe_path}")
+            sys.exit(2)
+        baseline = None
+        if args.cmd == "compare":
+            try:
+                baseline = load_baseline(suite, args.baseline)
+            except FileNotFoundError as e:
+                print(f"[ERROR] {e}")
+                sys.exit(2)
+
+        print(f"[{suite}] {exe_path}: {args.warmup} warmup + {args.repeat} measured runs per test")
+        result = run_suite(suite, exe_path, args.warmup, args.repeat, args.version)
+
+        if baseline is not None:
+            if baseline["exe_sha256"] == result["exe_sha256"]:
+                print(f"[Info] Same binary as baseline {baseline['version']}")
+            rows = compare_results(result, baseline, args.alpha, args.time_threshold, args.mem_threshold)
+            print(f"[{suite}] vs baseline {baseline['version']} ({baseline['created']})")
+            print_rows(rows)
+            bad = [r for r in rows if r["status"] != "ok"]
+            regressions += len(bad)
+            all_rows.extend(dict(r, test=f"{suite}/{r['test']}") for r in rows)
+        if args.cmd == "record" or args.save:
+            try:
+                print(f"[OK] Baseline saved to {save_baseline(result, args.force)}")
+            except FileExistsError as e:
+                print(f"[ERROR] {e}")
+                sys.exit(2)
+
+    if args.cmd == "compare":
+        if args.outcsv:
+            write_rows_csv(all_rows, args.outcsv)
+        if regressions:
+            print(f"[FAIL] {regressions} regressed or failing test(s)")
+            sys.exit(1)
+        print("[OK] No regressions")
+
+
+if __name__ == "__main__":
+    main()
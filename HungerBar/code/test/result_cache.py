@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Config
+DEFAULT_CACHE_PATH = ".solver_cache/results.sqlite"
+CACHE_MAX_ENTRIES = 200000          # LRU eviction once this many runs are stored
+CACHE_MAX_BYTES = 512 * 1024 * 1024 # ... or once the stored outputs exceed this size
+
+# Binary hashes are reused while (path, size, mtime) is unchanged
+_file_hash_memo = {}
+
+
+def hash_file(path):
+    """
+    Returns the SHA-256 hex digest of a file's content, or None if it cannot be read.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if memo_key in _file_hash_memo:
+        return _file_hash_memo[memo_key]
+
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    digest = h.hexdigest()
+    _file_hash_memo[memo_key] = digest
+    return digest
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of solver runs.
+
+    A run is identified by the hash of the input file, the hash of the solver
+    binary and the CLI args, so a cached entry stays valid exactly as long as
+    neither the instance nor the executable changes. Each entry stores the
+    wall time, the resource usage of the run (CPU times, peak RSS, page faults),
+    the verdict (first output line) and the full partition output.
+    Entries are evicted least-recently-used once the count or total size limit
+    is exceeded.
+
+    The connection is opened per call, so the object can be handed to worker
+    processes and shared by concurrent benchmark runs.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=CACHE_MAX_ENTRIES,
+                 max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS runs (
+                       key TEXT PRIMARY KEY,
+                       wall_time REAL,
+                       verdict TEXT,
+                       output TEXT,
+                       size INTEGER,
+                       last_used REAL,
+                       stats TEXT)"""
+            )
+            # Caches created before resource stats were recorded lack the column
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(runs)")]
+            if "stats" not in columns:
+                conn.execute("ALTER TABLE runs ADD COLUMN stats TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_lru ON runs(last_used)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def make_key(self, exe_path, input_path, args):
+        """
+        Builds the cache key, or returns None if either file cannot be hashed.
+        """
+        exe_hash = hash_file(exe_path)
+        input_hash = hash_file(input_path)
+        if exe_hash is None or input_hash is None:
+            return None
+        h = hashlib.sha256()
+        for part in [exe_hash, input_hash] + [str(a) for a in args]:
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Returns {"wall_time", "verdict", "output", "stats"} for a cached run, or None.
+        "stats" is the dict passed to put() (None for entries stored without one).
+        """
+        if key is None:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT wall_time, verdict, output, stats FROM runs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE runs SET last_used = ? WHERE key = ?", (time.time(), key))
+        stats = json.loads(row[3]) if row[3] else None
+        return {"wall_time": row[0], "verdict": row[1], "output": row[2], "stats": stats}
+
+    def put(self, key, wall_time, output, stats=None):
+        """
+        Stores one run and evicts the least-recently-used entries if needed.
+        """
+        if key is None:
+            return
+        lines = output.splitlines()
+        verdict = lines[0].strip().lower() if lines else ""
+        size = len(output)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, wall_time, verdict, output, size, time.time(),
+                 json.dumps(stats) if stats is not None else None),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM runs").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from the oldest entry until both limits hold again
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM runs ORDER BY last_used"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM runs WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM runs")
@@ -0,0 +1,137 @@
+import math
+import os
+import statistics
+import subprocess
+import time
+
+# Resource fields recorded for every run (besides the wall time)
+USAGE_FIELDS = ["user", "sys", "max_rss_kb", "minflt", "majflt"]
+
+
+def run_measured(cmd):
+    """
+    Runs `cmd` to completion and returns its resource usage:
+    {"returncode", "wall", "user", "sys", "max_rss_kb", "minflt", "majflt"}.
+
+    The wall time is taken with perf_counter_ns around Popen/wait4, and the
+    CPU times, peak RSS and page faults come from the child's own rusage, so
+    they exclude the harness and any other process. Without os.wait4
+    (Windows) only the wall time is filled in; the other fields are None.
+    Raises FileNotFoundError if the executable does not exist.
+    """
+    start = time.perf_counter_ns()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if hasattr(os, "wait4"):
+        _, status, ru = os.wait4(proc.pid, 0)
+        wall = (time.perf_counter_ns() - start) / 1e9
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return {
+            "returncode": proc.returncode,
+            "wall": wall,
+            "user": ru.ru_utime,
+            "sys": ru.ru_stime,
+            "max_rss_kb": ru.ru_maxrss,   # KB on Linux (bytes on macOS)
+            "minflt": ru.ru_minflt,
+            "majflt": ru.ru_majflt,
+        }
+    proc.wait()
+    wall = (time.perf_counter_ns() - start) / 1e9
+    stats = {"returncode": proc.returncode, "wall": wall}
+    stats.update({field: None for field in USAGE_FIELDS})
+    return stats
+
+
+def proc_usage(pid):
+    """
+    Cumulative usage of a running process from /proc (Linux only):
+    {"user", "sys", "max_rss_kb", "minflt", "majflt"}, or None if unavailable.
+    Used for long-lived -stream solvers, where wait4 is not an option.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            # Fields after the ")" closing the command name start at field 3
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status", "r") as f:
+            hwm = next((int(line.split()[1]) for line in f if line.startswith("VmHWM:")), None)
+    except (OSError, IndexError, ValueError):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    return {
+        "user": int(fields[11]) / ticks,
+        "sys": int(fields[12]) / ticks,
+        "max_rss_kb": hwm,
+        "minflt": int(fields[7]),
+        "majflt": int(fields[9]),
+    }
+
+
+def usage_delta(before, after):
+    """
+    Usage of one stream instance from two proc_usage snapshots. The peak RSS
+    is the process high-water mark so far, not a difference.
+    """
+    if before is None or after is None:
+        return {field: None for field in USAGE_FIELDS}
+    delta = {field: after[field] - before[field] for field in ["user", "sys", "minflt", "majflt"]}
+    delta["max_rss_kb"] = after["max_rss_kb"]
+    return delta
+
+
+def summarize(samples):
+    """
+    Aggregates repeated runs of one (solver, test) pair: median, p95 and
+    standard deviation of the wall time, medians of the resource fields
+    (the peak RSS takes the max). Returns None if any run failed.
+    """
+    if not samples or any(s is None for s in samples):
+        return None
+    walls = sorted(s["wall"] for s in samples)
+    p95_index = max(0, math.ceil(0.95 * len(walls)) - 1)
+    summary = {
+        "runs": len(walls),
+        "wall": statistics.median(walls),
+        "wall_p95": walls[p95_index],
+        "wall_std": statistics.stdev(walls) if len(walls) > 1 else 0.0,
+    }
+    for field in USAGE_FIELDS:
+        values = [s.get(field) for s in samples]
+        if any(v is None for v in values):
+            summary[field] = None
+        elif field == "max_rss_kb":
+            summary[field] = max(values)
+        else:
+            summary[field] = statistics.median(values)
+    return summary
+
+
+def mann_whitney_greater(new, old):
+    """
+    One-sided Mann-Whitney U test that samples `new` tend to be larger than
+    samples `old`. Returns the p-value from the normal approximation with tie
+    and continuity correction (1.0 if either side is empty or all values tie).
+    """
+    n1, n2 = len(new), len(old)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    # Midranks of the pooled samples
+    pooled = sorted([(v, 0) for v in new] + [(v, 1) for v in old])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        tie_term += t * t * t - t
+        i = j + 1
+    rank_sum = sum(r for r, (_, side) in zip(ranks, pooled) if side == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    var = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(var)
+    return 0.5 * math.erfc(z / math.sqrt(2))
@@ -1,9 +1,18 @@
 import csv
 import os
-import subprocess
 import re
 import argparse
 import fnmatch  
+import math
+import statistics
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from benchmark import NUM_BUCKETS, bucket_args
+from result_cache import DEFAULT_CACHE_PATH, ResultCache
+from run_stats import run_measured
+from solver_stream import get_stream_solver, read_instance
 
 # Config
 TESTCASE_DIR = "../../testcases" 
@@ -13,27 +22,78 @@ OUTPUT_EXT = ".out"
 # Max external restarts. If the solver fails to find a solution, 
 K_MAX = 10          
 
+# Adaptive mode: sample restarts until the Wilson interval on the success
+# probability is narrow enough, or its one-sided lower bound reaches
+# P_TARGET (or MAX_RUNS is reached)
+CONFIDENCE_Z = 1.96        # 95% interval
+ONE_SIDED_Z = 1.645        # 95% one-sided lower bound
+CI_HALFWIDTH = 0.15
+P_TARGET = 0.5             # all-success instances stop after 3 runs
+MIN_RUNS = 3
+MAX_RUNS = 20
+TTS_TARGET = 0.99          # report the expected time to reach this success probability
+
+# Written by Generator/BaseGen.py: test_id -> selected base groups and powers
+MANIFEST_CSV = os.path.join(TESTCASE_DIR, "sa1_manifest.csv")
+
 # Helpers
 
-def run_sa(test_id):
+def run_sa(test_id, restart=1, cache=None, stream=False, num_buckets=NUM_BUCKETS):
     """
-    Executes: ./sa -test <id>
+    Executes: ./sa -test <id> (plus -k <num_buckets> for K other than 3)
+    Returns (elapsed, found) - the run's wall time and whether it answered
+    "yes" - or None if the run failed.
+    SA is randomized, so each restart index is cached as a separate run; a cache
+    hit restores the stored output into the .out file instead of re-executing.
+    With stream=True the instance is piped through one long-lived `./sa -stream`
+    process instead of spawning the solver for every restart.
     """
     exe = "../src/sa"
     if os.name == 'nt': exe = "../src/sa.exe"
     
     if not os.path.exists(exe):
         print(f"[Error] Solver {exe} not found!")
-        return False
+        return None
 
-    cmd = [exe, "-test", str(test_id)]
+    input_path = os.path.join(TESTCASE_DIR, f"{test_id}{INPUT_EXT}")
+    output_path = os.path.join(TESTCASE_DIR, f"{test_id}{OUTPUT_EXT}")
+    args = (["-stream"] if stream else ["-test", str(test_id)]) + bucket_args(num_buckets)
 
-    try:
-        # Run SA, suppressing stdout/stderr to keep console clean
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    key = cache.make_key(exe, input_path, args + [f"restart={restart}"]) if cache else None
+    hit = cache.get(key) if cache else None
+    if hit is not None:
+        with open(output_path, "w") as f:
+            f.write(hit["output"])
+        return hit["wall_time"], hit["verdict"] == "yes"
+
+    if stream:
+        start = time.perf_counter_ns()
+        try:
+            output = get_stream_solver(exe, num_buckets).solve(read_instance(input_path))
+        except RuntimeError:
+            return None
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        with open(output_path, "w") as f:
+            f.write(output)
+        if cache:
+            cache.put(key, elapsed, output)
+        return elapsed, output.startswith("yes")
+
+    cmd = [exe] + args
+
+    # Run SA with stdout/stderr suppressed, timed with perf_counter_ns (run_stats)
+    stats = run_measured(cmd)
+    if stats.pop("returncode") != 0:
+        return None
+    elapsed = stats.pop("wall")
+
+    if cache:
+        try:
+            with open(output_path, "r") as f:
+                cache.put(key, elapsed, f.read(), stats)
+        except OSError:
+            pass
+    return elapsed, check_result_is_yes(test_id)
 
 def check_result_is_yes(test_id):
     """
@@ -93,8 +153,49 @@ def get_file_ids(patterns):
     sorted_ids = sorted(list(final_ids), key=natural_sort_key)
     return sorted_ids
 
+def load_manifest(paths):
+    """
+    Reads generator manifests (CSV with test_id, selected_groups, power_list
+    columns, see Generator/BaseGen.py). Returns {test_id: (groups, powers)};
+    missing files are skipped.
+    """
+    manifest = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                manifest[row["test_id"]] = (row.get("selected_groups", "[]"),
+                                            row.get("power_list", "[]"))
+    return manifest
+
+def wilson_interval(successes, runs, z=CONFIDENCE_Z):
+    """
+    Wilson score interval (low, high) for a success probability; stays
+    meaningful at 0 or `runs` successes, unlike the normal approximation.
+    """
+    if runs == 0:
+        return 0.0, 1.0
+    p = successes / runs
+    denom = 1 + z * z / runs
+    center = (p + z * z / (2 * runs)) / denom
+    half = z * math.sqrt(p * (1 - p) / runs + z * z / (4 * runs * runs)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+def time_to_solution(p, run_time, target=TTS_TARGET):
+    """
+    Expected wall time until at least one of the independent restarts has
+    succeeded with probability `target`: run_time * ln(1 - target) / ln(1 - p),
+    and at least one run. Infinite if p == 0.
+    """
+    if p <= 0:
+        return math.inf
+    if p >= target:
+        return run_time
+    return run_time * math.log(1 - target) / math.log(1 - p)
+
 # CSV Setup
-def init_csv(output_csv):
+def init_csv(output_csv, columns=None):
     # Create parent dir if it doesn't exist
     output_dir = os.path.dirname(output_csv)
     if output_dir and not os.path.exists(output_dir):
@@ -108,7 +209,7 @@ def init_csv(output_csv):
         with open(output_csv, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(
-                [
+                columns or [
                     "instance_id",
                     "selected_groups",
                     "power_list",
@@ -123,7 +224,8 @@ def init_csv(output_csv):
         return False
 
 # SA Restart Loop
-def test_sa_on_files(file_ids, output_csv):
+def test_sa_on_files(file_ids, output_csv, cache=None, stream=False, manifest=None,
+                     num_buckets=NUM_BUCKETS):
     print(f"\nSA Restart Test Started (K_MAX={K_MAX})")
     print(f"Target Directory: {TESTCASE_DIR}")
     print(f"Selected Cases: {len(file_ids)}")
@@ -137,20 +239,17 @@ def test_sa_on_files(file_ids, output_csv):
 
         # Attempt to run SA multiple times until it succeeds
         for k in range(1, K_MAX + 1):
-            # Run binary
-            run_sa(test_id)
-            
-            # Check output file
-            if check_result_is_yes(test_id):
+            # Run binary; the verdict comes back with the run
+            result = run_sa(test_id, k, cache, stream, num_buckets)
+            if result is not None and result[1]:
                 first_success = k
                 success_flag = True
                 break
         
-        # Prepare data 
-        dummy_groups = "[]"
-        dummy_power = "[]"
+        # Generator metadata ("[]" for instances without a manifest entry)
+        groups, powers = (manifest or {}).get(test_id, ("[]", "[]"))
         
-        row_data = [test_id, dummy_groups, dummy_power, first_success, success_flag]
+        row_data = [test_id, groups, powers, first_success, success_flag]
         results.append(row_data)
         
         status = "SUCCESS" if success_flag else "FAILURE"
@@ -167,12 +266,195 @@ def test_sa_on_files(file_ids, output_csv):
 
     return results
 
+# Adaptive Restart Sampling
+ADAPTIVE_COLUMNS = [
+    "instance_id",
+    "selected_groups",
+    "power_list",
+    "first_success_restart",
+    "success_flag",
+    "runs",
+    "successes",
+    "errors",
+    "p_hat",
+    "ci_low",
+    "ci_high",
+    "mean_run_time",
+    "tts99",
+    "tts99_upper",
+]
+
+def run_restart(test_id, restart, cache, stream, num_buckets=NUM_BUCKETS):
+    """
+    Worker entry point for one SA restart.
+    """
+    return test_id, restart, run_sa(test_id, restart, cache, stream, num_buckets)
+
+def adaptive_done(state, min_runs, max_runs, halfwidth, p_target):
+    """
+    Stopping rule: the one-sided lower bound on p reaches p_target, or enough
+    runs for a (halfwidth)-tight Wilson interval, or the run cap (errored
+    restarts count towards the cap only).
+    """
+    runs, successes = state["runs"], state["successes"]
+    if runs + state["errors"] >= max_runs:
+        return True
+    if runs < min_runs:
+        return False
+    if wilson_interval(successes, runs, ONE_SIDED_Z)[0] >= p_target:
+        return True
+    low, high = wilson_interval(successes, runs)
+    return (high - low) / 2 <= halfwidth
+
+def adaptive_row(test_id, state, manifest):
+    runs, successes = state["runs"], state["successes"]
+    p_hat = successes / runs if runs else 0.0
+    low, high = wilson_interval(successes, runs)
+    run_time = statistics.mean(state["times"]) if state["times"] else 0.0
+    groups, powers = manifest.get(test_id, ("[]", "[]"))
+    tts = time_to_solution(p_hat, run_time)
+    # Pessimistic estimate: the lower end of the interval
+    tts_upper = time_to_solution(low, run_time)
+    return [test_id, groups, powers, state["first_success"], successes > 0, runs, successes,
+            state["errors"], f"{p_hat:.4f}", f"{low:.4f}", f"{high:.4f}", f"{run_time:.6f}",
+            f"{tts:.6f}", f"{tts_upper:.6f}"], tts
+
+def adaptive_sa(file_ids, output_csv, cache=None, stream=False, manifest=None, jobs=1,
+                min_runs=MIN_RUNS, max_runs=MAX_RUNS, halfwidth=CI_HALFWIDTH, num_buckets=NUM_BUCKETS,
+                p_target=P_TARGET):
+    """
+    Samples SA restarts per instance until its success probability is known
+    to be at least p_target (one-sided 95% Wilson bound) or to +-halfwidth
+    (95% Wilson interval), or max_runs is reached, instead of stopping at the
+    first success. Restarts that error out (no verdict) are counted apart
+    and do not enter the estimate. With jobs > 1, restarts of different
+    instances run concurrently in a process pool; each instance has at most
+    one restart in flight, since a run writes the instance's .out file.
+    Rows are written as instances finish. Returns the TTS99 of every instance.
+    """
+    manifest = manifest or {}
+    print(f"\nAdaptive SA Restart Test Started (runs {min_runs}..{max_runs}, "
+          f"CI half-width {halfwidth}, p target {p_target}, jobs {jobs})")
+    print(f"Target Directory: {TESTCASE_DIR}")
+    print(f"Selected Cases: {len(file_ids)}")
+    print("-" * 60)
+
+    fcsv = open(output_csv, "a", newline="")
+    writer = csv.writer(fcsv)
+    states = {}
+    tts_values = []
+    finished = 0
+
+    def record(test_id, result):
+        """
+        Adds one restart's result; returns True once the instance is finished.
+        """
+        nonlocal finished
+        state = states[test_id]
+        if result is None:
+            state["errors"] += 1
+        else:
+            elapsed, found = result
+            state["runs"] += 1
+            state["times"].append(elapsed)
+            if found:
+                state["successes"] += 1
+                if state["first_success"] < 0:
+                    state["first_success"] = state["runs"] + state["errors"]
+        if not adaptive_done(state, min_runs, max_runs, halfwidth, p_target):
+            return False
+        row, tts = adaptive_row(test_id, state, manifest)
+        writer.writerow(row)
+        fcsv.flush()
+        tts_values.append(tts)
+        finished += 1
+        errors = f" errors={state['errors']}" if state["errors"] else ""
+        print(f"[{finished}/{len(file_ids)}] ID: {test_id:<10} -> p={row[8]} "
+              f"[{row[9]}, {row[10]}] runs={state['runs']}{errors} TTS99={tts:.3f}s")
+        del states[test_id]
+        return True
+
+    def restart_number(state):
+        # Errored restarts keep their number, so every restart has its own cache key
+        return state["runs"] + state["errors"] + 1
+
+    def new_state():
+        return {"runs": 0, "successes": 0, "errors": 0, "times": [], "first_success": -1}
+
+    if jobs <= 1:
+        for test_id in file_ids:
+            states[test_id] = new_state()
+            while not record(test_id, run_sa(test_id, restart_number(states[test_id]), cache, stream,
+                                             num_buckets)):
+                pass
+    else:
+        pending = deque(file_ids)
+        ready = deque()   # started instances that need another restart (served first)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            in_flight = set()
+
+            def submit():
+                while len(in_flight) < jobs and (ready or pending):
+                    if ready:
+                        test_id = ready.popleft()
+                    else:
+                        test_id = pending.popleft()
+                        states[test_id] = new_state()
+                    restart = restart_number(states[test_id])
+                    in_flight.add(pool.submit(run_restart, test_id, restart, cache, stream, num_buckets))
+
+            submit()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    test_id, _, result = future.result()
+                    if not record(test_id, result):
+                        ready.append(test_id)
+                submit()
+
+    fcsv.close()
+    return tts_values
+
+def print_tts_summary(tts_values):
+    """
+    Distribution of the per-instance time to 99% success over the sweep.
+    """
+    finite = sorted(t for t in tts_values if math.isfinite(t))
+    print("-" * 60)
+    print(f"TTS99 over {len(tts_values)} instances ({len(tts_values) - len(finite)} never solved):")
+    if not finite:
+        return
+    def pct(q):
+        return finite[min(len(finite) - 1, int(q * len(finite)))]
+    print(f"  median {statistics.median(finite):.3f}s  p90 {pct(0.9):.3f}s  "
+          f"p99 {pct(0.99):.3f}s  max {finite[-1]:.3f}s")
+
 def main():
     parser = argparse.ArgumentParser(description="SA Restart Robustness Test")
     parser.add_argument("--ns", nargs="+", required=True, 
                         help="List of Test IDs, wildcards (e.g. dp1_*), or 'scan' for all.")
     parser.add_argument("--outcsv", default="sa_restart_distribution.csv", 
                         help="Output CSV path (e.g., results/my_sa.csv)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-run SA instead of reusing cached results")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="Result cache database")
+    parser.add_argument("--stream", action="store_true",
+                        help="Pipe all instances through one long-lived './sa -stream' process")
+    parser.add_argument("--manifest", nargs="+", default=[MANIFEST_CSV],
+                        help="Generator manifests with the selected_groups/power_list of each test ID")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Sample restarts until the success-probability interval is tight (see README)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Adaptive mode: instances sampled concurrently (default: 1)")
+    parser.add_argument("--min-runs", type=int, default=MIN_RUNS)
+    parser.add_argument("--max-runs", type=int, default=MAX_RUNS)
+    parser.add_argument("--ci-halfwidth", type=float, default=CI_HALFWIDTH,
+                        help="Stop once the 95%% interval on the success probability is this tight")
+    parser.add_argument("--p-target", type=float, default=P_TARGET,
+                        help="Stop once the success probability is known (one-sided 95%%) to be at least this")
+    parser.add_argument("--k", type=int, default=NUM_BUCKETS,
+                        help="Number of buckets, passed to ./sa as -k (default: 3)")
     
     args = parser.parse_args()
 
@@ -184,11 +466,18 @@ def main():
         return
 
     # Setup CSV (overwrite old file, write header)
-    if not init_csv(args.outcsv):
+    if not init_csv(args.outcsv, ADAPTIVE_COLUMNS if args.adaptive else None):
         return
 
     # Run tests (writes real-time)
-    test_sa_on_files(ids, args.outcsv)
+    cache = None if args.no_cache else ResultCache(args.cache_path)
+    manifest = load_manifest(args.manifest)
+    if args.adaptive:
+        tts_values = adaptive_sa(ids, args.outcsv, cache, args.stream, manifest, args.jobs,
+                                 args.min_runs, args.max_runs, args.ci_halfwidth, args.k, args.p_target)
+        print_tts_summary(tts_values)
+    else:
+        test_sa_on_files(ids, args.outcsv, cache, args.stream, manifest, args.k)
     
     print(f"\nDone. Results saved to {args.outcsv}")
 
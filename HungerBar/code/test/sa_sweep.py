@@ -0,0 +1,206 @@
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from benchmark import (INPUT_EXT, NUM_BUCKETS, PACKED_TESTS, TESTCASE_DIR, bucket_args, get_input_path,
+                       get_test_ids_from_args, get_test_ids_from_store, get_worker_cpus, init_worker,
+                       load_values, register_pack)
+from sa_benchmark import wilson_interval
+from validator import CORRECT, validate_output
+
+# Config
+SA_EXE = "../src/sa"
+# Schedule options of ./sa that can be swept: (CLI flag, CSV column)
+SCHEDULE_FLAGS = [
+    ("-time", "time"),
+    ("-moves", "moves"),
+    ("-T0", "T0"),
+    ("-Tend", "Tend"),
+    ("-alpha", "alpha"),
+    ("-run-moves", "run_moves"),
+    ("-accept0", "accept0"),
+    ("-reheats", "reheats"),
+    ("-reheat-frac", "reheat_frac"),
+]
+
+# Helpers
+def parse_stats(stderr):
+    """
+    The "stats moves=... restarts=... time=..." line ./sa -stats prints per
+    instance, as a dict of floats ({} if missing).
+    """
+    for line in stderr.splitlines():
+        if line.startswith("stats "):
+            fields = dict(part.split("=", 1) for part in line.split()[1:])
+            try:
+                return {k: float(v) for k, v in fields.items()}
+            except ValueError:
+                return {}
+    return {}
+
+def run_config(exe, config, test_id, threads, tag, extra_args=(), num_buckets=NUM_BUCKETS):
+    """
+    Worker entry point: one ./sa run of `test_id` under a schedule `config`
+    ({flag: value}) plus `extra_args`, partitioning into `num_buckets`.
+    Returns (found, stats); found means a validated "yes".
+    """
+    output_path = os.path.join(TESTCASE_DIR, f"{test_id}.sweep{tag}.out")
+    if test_id in PACKED_TESTS:
+        pack_path, k = PACKED_TESTS[test_id]
+        cmd = [exe, "-pack", pack_path, "-index", str(k)]
+    else:
+        cmd = [exe, "-in", get_input_path(test_id)]
+    cmd += ["-out", output_path, "-threads", str(threads), "-stats"]
+    for flag, value in config.items():
+        cmd += [flag, str(value)]
+    cmd += list(extra_args) + bucket_args(num_buckets)
+
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        return False, None
+    stats = parse_stats(proc.stderr)
+    try:
+        with open(output_path, "r") as f:
+            status, _ = validate_output(load_values(test_id), f, cross_check=False,
+                                        num_buckets=num_buckets)
+        os.remove(output_path)
+    except OSError:
+        return False, None
+    return status == CORRECT, stats
+
+def run_task(exe, config_idx, config, test_id, threads, tag, extra_args=(), num_buckets=NUM_BUCKETS):
+    return (config_idx, test_id) + run_config(exe, config, test_id, threads, tag, extra_args,
+                                              num_buckets)
+
+def build_grid(args):
+    """
+    Cartesian product of the swept values: a list of {flag: value} configs
+    ([{}], i.e. ./sa's defaults, if nothing is swept).
+    """
+    axes = [(flag, getattr(args, column)) for flag, column in SCHEDULE_FLAGS if getattr(args, column)]
+    return [dict(zip([flag for flag, _ in axes], combo))
+            for combo in itertools.product(*[values for _, values in axes])]
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep ./sa annealing schedules in parallel")
+    parser.add_argument("--ns", nargs="+", required=True, help="Test IDs or patterns (e.g. 'sa1_*')")
+    parser.add_argument("--exe", default=SA_EXE)
+    parser.add_argument("--pack", nargs="+", default=[], help="Instance packs (see instance_pack.py)")
+    parser.add_argument("--store", default=None, help="Indexed instance store (see instance_store.py)")
+    parser.add_argument("--where", default=None, help="Metadata query on the --store index")
+    # Swept schedule values (omitted options keep ./sa's defaults)
+    parser.add_argument("--time", nargs="+", help="Wall-clock budgets per instance (s)")
+    parser.add_argument("--moves", nargs="+", help="Move budgets per instance")
+    parser.add_argument("--T0", nargs="+", help="Initial temperatures ('auto' = calibrated)")
+    parser.add_argument("--Tend", nargs="+", help="End temperatures")
+    parser.add_argument("--alpha", nargs="+", help="Cooling factors")
+    parser.add_argument("--run-moves", dest="run_moves", nargs="+", help="Moves per run (derives alpha)")
+    parser.add_argument("--accept0", nargs="+", help="Uphill acceptance for the T0 calibration")
+    parser.add_argument("--reheats", nargs="+", help="Reheats per run")
+    parser.add_argument("--reheat-frac", dest="reheat_frac", nargs="+", help="Reheat temperature / T0")
+    parser.add_argument("--no-kk", action="store_true",
+                        help="Pass -no-kk: anneal without the Karmarkar-Karp pre-solver")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per (schedule, test) (default: 5)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="./sa -threads per run (default: 1, so parallel runs do not compete)")
+    parser.add_argument("--jobs", type=int, default=1, help="Parallel runs, each pinned to its own CPU")
+    parser.add_argument("--outcsv", default="sa_sweep.csv")
+    parser.add_argument("--k", type=int, default=NUM_BUCKETS,
+                        help="Number of buckets, passed to ./sa as -k (default: 3)")
+    args = parser.parse_args()
+
+    for pack_path in args.pack:
+        register_pack(pack_path)
+    if args.store:
+        test_ids, store_pack = get_test_ids_from_store(args.store, args.ns, args.where)
+        if store_pack:
+            args.pack.append(store_pack)
+    else:
+        test_ids = get_test_ids_from_args(args.ns, INPUT_EXT)
+    if not test_ids:
+        print("[ERROR] No valid test cases found based on input patterns.")
+        return
+
+    grid = build_grid(args)
+    extra_args = ["-no-kk"] if args.no_kk else []
+    swept = [(flag, column) for flag, column in SCHEDULE_FLAGS if getattr(args, column)]
+    print(f"Sweeping {len(grid)} schedules x {len(test_ids)} cases x {args.repeat} runs "
+          f"on {args.jobs} workers.")
+
+    fcsv = open(args.outcsv, "w", newline="")
+    writer = csv.writer(fcsv)
+    writer.writerow([column for _, column in swept] + ["TestID", "Runs", "Successes", "Success_Rate",
+                                                       "CI_Low", "CI_High", "Mean_Time",
+                                                       "Moves_Per_Sec", "Mean_Restarts"])
+
+    # (config_idx, test_id) -> [successes, runs, time, moves, restarts]
+    acc = {}
+    per_config = [[0, 0, 0.0, 0.0] for _ in grid]   # successes, runs, time, moves
+
+    def record(config_idx, test_id, found, stats):
+        a = acc.setdefault((config_idx, test_id), [0, 0, 0.0, 0.0, 0.0])
+        a[0] += found
+        a[1] += 1
+        if stats:
+            a[2] += stats.get("time", 0.0)
+            a[3] += stats.get("moves", 0.0)
+            a[4] += stats.get("restarts", 0.0)
+        if a[1] < args.repeat:
+            return
+        successes, runs, elapsed, moves, restarts = acc.pop((config_idx, test_id))
+        low, high = wilson_interval(successes, runs)
+        config = grid[config_idx]
+        writer.writerow([config.get(flag, "") for flag, _ in swept]
+                        + [test_id, runs, successes, f"{successes / runs:.4f}", f"{low:.4f}",
+                           f"{high:.4f}", f"{elapsed / runs:.6f}",
+                           f"{moves / elapsed:.0f}" if elapsed > 0 else "", f"{restarts / runs:.1f}"])
+        fcsv.flush()
+        c = per_config[config_idx]
+        c[0] += successes
+        c[1] += runs
+        c[2] += elapsed
+        c[3] += moves
+
+    tasks = [(i, config, test_id, rep) for i, config in enumerate(grid)
+             for test_id in test_ids for rep in range(args.repeat)]
+    if args.jobs <= 1:
+        for tag, (i, config, test_id, _) in enumerate(tasks):
+            record(i, test_id, *run_config(args.exe, config, test_id, args.threads, tag, extra_args,
+                                           args.k))
+    else:
+        cpus = get_worker_cpus(args.jobs)
+        workers = len(cpus) if cpus else args.jobs
+        cpu_queue = None
+        if cpus:
+            cpu_queue = multiprocessing.Queue()
+            for cpu in cpus:
+                cpu_queue.put(cpu)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(cpu_queue, args.pack)) as pool:
+            # The task index keeps concurrent runs of one test on separate .out files
+            futures = [pool.submit(run_task, args.exe, i, config, test_id, args.threads, tag, extra_args,
+                                   args.k)
+                       for tag, (i, config, test_id, _) in enumerate(tasks)]
+            for future in as_completed(futures):
+                record(*future.result())
+    fcsv.close()
+
+    # Console summary: success rate next to throughput, one line per schedule
+    header_line = "{:<48} {:<10} {:<14}".format("Schedule", "Success", "Moves/s")
+    print("-" * len(header_line))
+    print(header_line)
+    print("-" * len(header_line))
+    for config, (successes, runs, elapsed, moves) in zip(grid, per_config):
+        name = " ".join(f"{flag} {value}" for flag, value in config.items()) or "(defaults)"
+        rate = f"{successes / runs:.3f}" if runs else "-"
+        throughput = f"{moves / elapsed:.3g}" if elapsed > 0 else "-"
+        print("{:<48} {:<10} {:<14}".format(name, rate, throughput))
+    print("-" * len(header_line))
+    print(f"[Done] Sweep finished. Results saved to {args.outcsv}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,569 @@
+import argparse
+import csv
+import math
+import os
+import statistics
+import sys
+
+from benchmark import TESTCASE_DIR, INPUT_EXT
+from dispatch import OUTPUT_DIR, SA_TIME_LIMIT, dp_bytes, instance_features, trivially_infeasible
+from sa_benchmark import K_MAX, TTS_TARGET, wilson_interval
+from solver_stream import read_instance
+
+# Config
+DP_CSVS = ["dp_fixedn_results.csv", "dp_fixedsum_results.csv", "DpBase100.csv"]
+DFS_CSVS = ["dfs.csv"]
+SA_CSVS = ["saGreedyFix.csv", "saBasetoBig.csv"]
+CONFIDENCE = 0.95           # level of the confidence / prediction bands
+TIME_BUDGET = 60.0          # seconds per instance (--time-budget)
+MEM_BUDGET_MB = 2048        # dp memory budget (--mem-budget), as dispatch.DP_MEM_BUDGET
+PLAN_NS = [50, 100, 1000, 10000]        # N values the dp capacity is reported for (--n)
+PLAN_SUMS = [10 ** 4, 10 ** 5, 10 ** 6]  # sums the dp capacity is reported for (--sum)
+MAX_EXTRAPOLATE = 10 ** 12  # upper end of the N / sum search
+
+# Loading
+def resolve_csv(path):
+    """
+    A CSV path as given, or relative to output/ (where the timing CSVs live).
+    """
+    if os.path.exists(path):
+        return path
+    return os.path.join(OUTPUT_DIR, path)
+
+def _column(row, *names):
+    for name in names:
+        if row.get(name) not in (None, ""):
+            return row[name]
+    return None
+
+def _test_features(test_id):
+    path = os.path.join(TESTCASE_DIR, f"{test_id}{INPUT_EXT}")
+    if not test_id or not os.path.exists(path):
+        return None
+    return instance_features(read_instance(path))
+
+def load_samples(paths, engine):
+    """
+    Timing samples of one engine from harness CSVs: the legacy output/*.csv
+    files (`n`, `sum`/`total_sum`, `dp_time`/`./dfs_time`, ...) and
+    benchmark.py CSVs (`TestID`, `N`, `<engine>_Time`, `<engine>_Check`; the
+    sum is read from the test case).
+
+    Returns dicts {"source", "n", "sum", "time", "status", "searched"}. `time` is None for a timed-out or failed run. `searched` is
+    False for runs decided by the basic checks (the legacy "Correct(Output
+    no, ...)" rows, or test cases that are trivially infeasible).
+    """
+    samples = []
+    for path in paths:
+        path = resolve_csv(path)
+        if not os.path.exists(path):
+            print(f"[Warning] CSV not found: {path}")
+            continue
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                n = _column(row, "n", "N")
+                raw_time = _column(row, f"{engine}_time", f"./{engine}_time", f"{engine}_Time")
+                if n is None or raw_time is None:
+                    continue
+                try:
+                    time_val = float(raw_time)
+                except ValueError:
+                    time_val = None     # "Timeout" / "Error"
+                status = (_column(row, "correct", f"./{engine}_check", f"{engine}_Check") or "").strip()
+                total = _column(row, "sum", "total_sum")
+                searched = not status.startswith("Correct(Output no")
+                if total is None:
+                    features = _test_features(_column(row, "TestID"))
+                    if features is not None:
+                        total = features["sum"]
+                        searched = searched and not trivially_infeasible(features)
+                samples.append({
+                    "source": os.path.basename(path),
+                    "n": int(n),
+                    "sum": int(total) if total is not None else None,
+                    "time": time_val,
+                    "status": status,
+                    "searched": searched,
+                })
+    return samples
+
+# Aggregation
+def group_stats(samples, key):
+    """
+    mean/min/max/var (population variance) of the run times grouped by `key`
+    ("n" or "sum"), as in output/dp_statistics_by_n.csv. Timed-out runs are
+    counted in `timeouts` but left out of the statistics.
+    """
+    groups = {}
+    for s in samples:
+        if s[key] is not None:
+            groups.setdefault(s[key], []).append(s["time"])
+    rows = []
+    for value in sorted(groups):
+        times = [t for t in groups[value] if t is not None]
+        if not times:
+            continue
+        rows.append({
+            key: value,
+            "runs": len(times),
+            "timeouts": len(groups[value]) - len(times),
+            "mean": statistics.fmean(times),
+            "min": min(times),
+            "max": max(times),
+            "var": statistics.pvariance(times),
+        })
+    return rows
+
+def write_stats_csv(rows, key, path, extended=False):
+    """
+    Writes group_stats rows in the layout of dp_statistics_by_n.csv
+    (index,<key>,mean,min,max,var); `extended` adds the run and timeout counts.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["index", key, "mean", "min", "max", "var"] + (["runs", "timeouts"] if extended else []))
+        for i, r in enumerate(rows):
+            writer.writerow([i, r[key]] + [f"{r[c]:.6f}" for c in ("mean", "min", "max", "var")]
+                            + ([r["runs"], r["timeouts"]] if extended else []))
+
+# Regression
+def _invert(a):
+    """
+    Inverse of a small square matrix (Gauss-Jordan), or None if it is singular.
+    """
+    k = len(a)
+    m = [list(row) + [1.0 if i == j else 0.0 for j in range(k)] for i, row in enumerate(a)]
+    for col in range(k):
+        piv = max(range(col, k), key=lambda r: abs(m[r][col]))
+        if abs(m[piv][col]) < 1e-12:
+            return None
+        m[col], m[piv] = m[piv], m[col]
+        p = m[col][col]
+        m[col] = [v / p for v in m[col]]
+        for r in range(k):
+            if r != col:
+                f = m[r][col]
+                m[r] = [v - f * w for v, w in zip(m[r], m[col])]
+    return [row[k:] for row in m]
+
+def t_quantile(p, dof):
+    """
+    Quantile of Student's t distribution (Cornish-Fisher expansion around the
+    normal quantile; within about 1e-3 for dof >= 3).
+    """
+    if dof <= 0:
+        return math.inf
+    z = statistics.NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    return z + g1 / dof + g2 / dof ** 2 + g3 / dof ** 3
+
+class LinearFit:
+    """
+    Ordinary least squares y = b0 + b1 x1 + ... with the coefficient
+    covariance, for confidence and prediction bands. `coef` is None if there
+    are not more points than coefficients.
+    """
+
+    def __init__(self, xs, ys):
+        rows = [[1.0] + list(x) for x in xs]
+        self.n = len(rows)
+        self.k = len(rows[0]) if rows else 0
+        self.coef = None
+        if self.n <= self.k:
+            return
+        inv = _invert([[sum(r[i] * r[j] for r in rows) for j in range(self.k)] for i in range(self.k)])
+        if inv is None:
+            return
+        xty = [sum(r[i] * y for r, y in zip(rows, ys)) for i in range(self.k)]
+        self.coef = [sum(inv[i][j] * xty[j] for j in range(self.k)) for i in range(self.k)]
+        sse = sum((y - sum(c * v for c, v in zip(self.coef, r))) ** 2 for r, y in zip(rows, ys))
+        mean_y = statistics.fmean(ys)
+        ss_tot = sum((y - mean_y) ** 2 for y in ys)
+        self.dof = self.n - self.k
+        self.s2 = sse / self.dof
+        self.cov = [[v * self.s2 for v in row] for row in inv]
+        self.r2 = 1 - sse / ss_tot if ss_tot > 0 else 1.0
+
+    def stderr(self, i):
+        return math.sqrt(self.cov[i][i])
+
+    def predict(self, x, level=CONFIDENCE):
+        """
+        (estimate, (conf_low, conf_high), (pred_low, pred_high)) at x: the
+        band of the fitted mean and the band of a single new observation.
+        """
+        r = [1.0] + list(x)
+        y = sum(c * v for c, v in zip(self.coef, r))
+        var_mean = max(0.0, sum(r[i] * self.cov[i][j] * r[j] for i in range(self.k) for j in range(self.k)))
+        t = t_quantile(0.5 + level / 2, self.dof)
+        half_conf = t * math.sqrt(var_mean)
+        half_pred = t * math.sqrt(var_mean + self.s2)
+        return y, (y - half_conf, y + half_conf), (y - half_pred, y + half_pred)
+
+class ScalingModel:
+    """
+    A runtime model log t = offset(n, s) + b0 + b1 x1 + ..., where
+    regressors(n, s) gives the x and offset(n, s) the terms whose exponents
+    are pinned by theory. Times and bands are returned in seconds.
+    """
+
+    def __init__(self, name, formula, terms, regressors, offset, samples):
+        self.name = name
+        self.formula = formula
+        self.terms = ["log_k"] + terms
+        self.regressors = regressors
+        self.offset = offset
+        xs = [regressors(s["n"], s["sum"]) for s in samples]
+        offsets = [offset(s["n"], s["sum"]) for s in samples]
+        log_t = [math.log(s["time"]) for s in samples]
+        self.fit = LinearFit(xs, [y - off for y, off in zip(log_t, offsets)])
+        # R^2 of log t itself (the fit's own R^2 is of log t minus the pinned terms)
+        self.r2 = None
+        if self.ok and len(log_t) > 1:
+            mean_y = statistics.fmean(log_t)
+            ss_tot = sum((y - mean_y) ** 2 for y in log_t)
+            sse = self.fit.s2 * self.fit.dof
+            self.r2 = 1 - sse / ss_tot if ss_tot > 0 else 1.0
+
+    @property
+    def ok(self):
+        return self.fit.coef is not None
+
+    def predict(self, n, s=None, level=CONFIDENCE):
+        y, conf, pred = self.fit.predict(self.regressors(n, s), level)
+        off = self.offset(n, s)
+        return (math.exp(min(y + off, 700.0)),
+                tuple(math.exp(min(v + off, 700.0)) for v in conf),
+                tuple(math.exp(min(v + off, 700.0)) for v in pred))
+
+    def upper_bound(self, n, s=None):
+        """
+        Upper end of the prediction band: the time one new run stays below
+        with probability (1 + CONFIDENCE) / 2.
+        """
+        return self.predict(n, s)[2][1]
+
+def largest_within(fits, lo=1, hi=MAX_EXTRAPOLATE):
+    """
+    Largest integer x in [lo, hi] with fits(x) true, assuming fits is
+    monotone (bisection). None if even lo does not fit.
+    """
+    if not fits(lo):
+        return None
+    if fits(hi):
+        return hi
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+# Models
+def fit_dp_models(samples):
+    """
+    DP runtime on the instances it had to solve: the theoretical
+    t = k N S^2 (the (S/3)^2 table swept once per item; exponents pinned) and
+    the free power law t = k N^a S^b as a check on the exponents.
+    """
+    data = [s for s in samples if s["time"] and s["sum"] and s["searched"] and s["time"] > 0]
+    pinned = ScalingModel("dp", "t = k * N * S^2", [],
+                          lambda n, s: (),
+                          lambda n, s: math.log(n) + 2 * math.log(s), data)
+    free = ScalingModel("dp_free", "t = k * N^a * S^b", ["a", "b"],
+                        lambda n, s: (math.log(n), math.log(s)),
+                        lambda n, s: 0.0, data)
+    return pinned, free, data
+
+def fit_dfs_model(samples):
+    """
+    DFS runtime on the instances it had to search: t = k * e^(c N). Timeouts
+    are left out, so the fit is optimistic where they occur.
+    """
+    data = [s for s in samples if s["time"] and s["searched"] and s["time"] > 0
+            and s["status"].startswith("Correct")]
+    model = ScalingModel("dfs", "t = k * exp(c * N)", ["c"],
+                         lambda n, s: (n,),
+                         lambda n, s: 0.0, data)
+    return model, data
+
+def load_sa_restarts(path):
+    """
+    (restarts to the first success, or None if none of K_MAX succeeded) per
+    instance of an sa_restart_benchmark CSV.
+    """
+    path = resolve_csv(path)
+    if not os.path.exists(path):
+        print(f"[Warning] CSV not found: {path}")
+        return []
+    restarts = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                k = int(row["first_success_restart"])
+            except (KeyError, ValueError):
+                continue
+            restarts.append(k if k > 0 else None)
+    return restarts
+
+def fit_sa_curve(restarts, max_restarts=K_MAX):
+    """
+    Success rate vs time of restarted SA. Every restart is an independent
+    SA_TIME_LIMIT run that succeeds with probability q, and a fraction
+    `reach` of the instances is never solved by SA (bad spread, or no
+    partition at all), so P(solved within k restarts) = reach * (1 - (1-q)^k).
+    q and reach are maximum-likelihood estimates with runs that never
+    succeeded censored at max_restarts. Returns (reach, q) or None.
+    """
+    solved = [k for k in restarts if k is not None]
+    failed = len(restarts) - len(solved)
+    if not solved:
+        return None
+    excess = sum(k - 1 for k in solved)
+
+    def reach_for(q):
+        return min(1.0, len(solved) / (len(restarts) * (1 - (1 - q) ** max_restarts)))
+
+    def log_lik(q):
+        reach = reach_for(q)
+        ll = len(solved) * math.log(reach * q) + excess * math.log(1 - q)
+        if failed:
+            ll += failed * math.log(max(1e-300, 1 - reach * (1 - (1 - q) ** max_restarts)))
+        return ll
+
+    # Golden-section search; log_lik is unimodal in q
+    lo, hi = 1e-6, 1 - 1e-9
+    ratio = (math.sqrt(5) - 1) / 2
+    for _ in range(200):
+        a = hi - ratio * (hi - lo)
+        b = lo + ratio * (hi - lo)
+        if log_lik(a) < log_lik(b):
+            lo = a
+        else:
+            hi = b
+    q = (lo + hi) / 2
+    return reach_for(q), q
+
+def sa_curve_rows(restarts, fit, max_restarts=K_MAX):
+    """
+    One row per restart count k: the time budget k * SA_TIME_LIMIT, the
+    observed success rate with its Wilson interval, and the fitted rate.
+    """
+    rows = []
+    for k in range(1, max_restarts + 1):
+        ok = sum(1 for r in restarts if r is not None and r <= k)
+        low, high = wilson_interval(ok, len(restarts))
+        rows.append({
+            "restarts": k,
+            "time": k * SA_TIME_LIMIT,
+            "success_rate": ok / len(restarts),
+            "ci_low": low,
+            "ci_high": high,
+            "fitted": fit[0] * (1 - (1 - fit[1]) ** k) if fit else None,
+        })
+    return rows
+
+# Report
+def dp_capacity(model, time_budget, mem_bytes, plan_ns, plan_sums):
+    """
+    Largest sum per N (and largest N per sum) whose predicted time stays
+    within the budget at the upper prediction bound, and whose memory in
+    dp's -mode auto (dispatch.dp_bytes: the dense bit rows if they fit, else
+    the sparse tuple-set bound) stays within mem_bytes. The sum is the one
+    left after the scale reduction divides a part by its GCD.
+    """
+    def fits_mem(n, s):
+        return dp_bytes(n, s, 3, mem_bytes) <= mem_bytes
+
+    rows = []
+    for n in plan_ns:
+        time_sum = largest_within(lambda s: model.upper_bound(n, s) <= time_budget)
+        mem_sum = largest_within(lambda s: fits_mem(n, s)) or 0
+        rows.append({"model": model.name, "fixed": f"N={n}", "limit": "sum",
+                     "by_time": time_sum, "by_memory": mem_sum,
+                     "max": min(time_sum, mem_sum) if time_sum else None})
+    for s in plan_sums:
+        time_n = largest_within(lambda n: model.upper_bound(n, s) <= time_budget)
+        mem_n = largest_within(lambda n: fits_mem(n, s)) or 0
+        rows.append({"model": model.name, "fixed": f"sum={s}", "limit": "N",
+                     "by_time": time_n, "by_memory": mem_n,
+                     "max": min(time_n, mem_n) if time_n else None})
+    return rows
+
+def print_model(model, data):
+    fit = model.fit
+    if not model.ok:
+        print(f"{model.name:<8} {model.formula:<22} not enough data ({len(data)} runs)")
+        return
+    terms = "  ".join(f"{name}={c:.4g}±{fit.stderr(i):.2g}" for i, (name, c) in enumerate(zip(model.terms, fit.coef)))
+    print(f"{model.name:<8} {model.formula:<22} {terms}  R²={model.r2:.3f}  runs={fit.n}  "
+          f"σ(log t)={math.sqrt(fit.s2):.3f}")
+
+def fmt_limit(value):
+    if value is None:
+        return "-"
+    if value >= MAX_EXTRAPOLATE:
+        return f">={MAX_EXTRAPOLATE:.0e}"
+    return str(value)
+
+def write_rows(rows, path):
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def plot_dp(model, data, path):
+    """
+    Measured dp times per input CSV against the varying one of N / sum, with
+    the fit and its bands at the median of the other at each point. Needs
+    matplotlib.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("[Warning] matplotlib not installed, skipping the plot")
+        return False
+    sources = sorted({s["source"] for s in data})
+    fig, axes = plt.subplots(1, len(sources), figsize=(5 * len(sources), 4), squeeze=False)
+    for ax, source in zip(axes[0], sources):
+        rows = [s for s in data if s["source"] == source]
+        key = "n" if len({s["n"] for s in rows}) >= len({s["sum"] for s in rows}) else "sum"
+        other = "sum" if key == "n" else "n"
+        xs = sorted({s[key] for s in rows})
+        # The other variable at each x (constant in the fixed-N / fixed-sum CSVs)
+        held = {x: statistics.median(s[other] for s in rows if s[key] == x) for x in xs}
+        preds = [model.predict(x, held[x]) if key == "n" else model.predict(held[x], x) for x in xs]
+        ax.scatter([s[key] for s in rows], [s["time"] for s in rows], s=10, label="measured")
+        ax.plot(xs, [p[0] for p in preds], label=model.formula)
+        ax.fill_between(xs, [p[1][0] for p in preds], [p[1][1] for p in preds], alpha=0.3,
+                        label=f"{CONFIDENCE:.0%} confidence")
+        ax.fill_between(xs, [p[2][0] for p in preds], [p[2][1] for p in preds], alpha=0.15,
+                        label=f"{CONFIDENCE:.0%} prediction")
+        fixed = f"{other}≈{held[xs[0]]:g}" if len(set(held.values())) == 1 else f"{other} varies"
+        ax.set_title(f"{source} ({fixed})")
+        ax.set_xlabel(key)
+        ax.set_ylabel("time (s)")
+        ax.legend(fontsize=7)
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    return True
+
+def run_stats_cmd(args):
+    samples = load_samples(args.csv, args.engine)
+    if not samples:
+        print("[ERROR] No timing rows found")
+        sys.exit(1)
+    rows = group_stats(samples, args.by)
+    print(f"{args.by:>10} {'runs':>5} {'timeouts':>8} {'mean':>10} {'min':>10} {'max':>10} {'var':>10}")
+    for r in rows:
+        print(f"{r[args.by]:>10} {r['runs']:>5} {r['timeouts']:>8} {r['mean']:>10.4f} {r['min']:>10.4f} "
+              f"{r['max']:>10.4f} {r['var']:>10.4f}")
+    if args.out:
+        write_stats_csv(rows, args.by, args.out, args.extended)
+        print(f"[OK] Statistics saved to {args.out}")
+
+def run_fit_cmd(args):
+    mem_bytes = args.mem_budget * 2 ** 20
+    fit_rows, capacity_rows, curve_rows = [], [], []
+
+    print(f"=== Fits (bands at {CONFIDENCE:.0%}) ===")
+    dp_pinned, dp_free, dp_data = fit_dp_models(load_samples(args.dp, "dp"))
+    dfs_model, dfs_data = fit_dfs_model(load_samples(args.dfs, "dfs"))
+    for model, data in ((dp_pinned, dp_data), (dp_free, dp_data), (dfs_model, dfs_data)):
+        print_model(model, data)
+        if model.ok:
+            for i, name in enumerate(model.terms):
+                fit_rows.append({"model": model.name, "formula": model.formula, "term": name,
+                                 "coef": model.fit.coef[i], "stderr": model.fit.stderr(i),
+                                 "r2": model.r2, "runs": model.fit.n, "sigma_log_t": math.sqrt(model.fit.s2)})
+
+    print(f"\n=== Capacity: {args.time_budget:g} s per instance (upper {CONFIDENCE:.0%} prediction bound), "
+          f"dp memory {args.mem_budget} MB ===")
+    dp_model = dp_free if args.dp_model == "free" else dp_pinned
+    if dp_model.ok:
+        for r in dp_capacity(dp_model, args.time_budget, mem_bytes, args.n, args.sum):
+            capacity_rows.append(r)
+            print(f"dp  ({dp_model.formula}) {r['fixed']:<12} max {r['limit']:<4} {fmt_limit(r['max']):>14}  "
+                  f"(time {fmt_limit(r['by_time'])}, memory {fmt_limit(r['by_memory'])})")
+    if dfs_model.ok:
+        max_n = largest_within(lambda n: dfs_model.upper_bound(n) <= args.time_budget)
+        capacity_rows.append({"model": "dfs", "fixed": "", "limit": "N", "by_time": max_n,
+                              "by_memory": None, "max": max_n})
+        print(f"dfs ({dfs_model.formula}) max N {fmt_limit(max_n):>14}  "
+              f"(slowdown x{math.exp(dfs_model.fit.coef[1]):.3f} per item)")
+
+    print(f"\n=== SA success rate vs time ({SA_TIME_LIMIT:g} s per restart) ===")
+    for path in args.sa:
+        restarts = load_sa_restarts(path)
+        if not restarts:
+            continue
+        fit = fit_sa_curve(restarts)
+        name = os.path.basename(path)
+        for r in sa_curve_rows(restarts, fit):
+            curve_rows.append(dict(r, source=name))
+        if fit is None:
+            print(f"{name}: no successful run")
+            continue
+        reach, q = fit
+        k_budget = max(1, int(args.time_budget // SA_TIME_LIMIT))
+        within = reach * (1 - (1 - q) ** k_budget)
+        k_target = math.ceil(math.log(1 - TTS_TARGET) / math.log(1 - q)) if q < 1 else 1
+        ok, low, high = sum(r is not None for r in restarts), *wilson_interval(
+            sum(r is not None for r in restarts), len(restarts))
+        print(f"{name}: {len(restarts)} instances, solved {ok / len(restarts):.1%} "
+              f"[{low:.1%}, {high:.1%}] within {K_MAX} restarts")
+        print(f"  fit: per-restart success q={q:.3f}, solvable fraction {reach:.1%}")
+        print(f"  {args.time_budget:g} s ({k_budget} restarts): {within:.1%} expected; "
+              f"{TTS_TARGET:.0%} of the solvable ones need {k_target} restarts ({k_target * SA_TIME_LIMIT:.1f} s)")
+        capacity_rows.append({"model": f"sa:{name}", "fixed": f"{args.time_budget:g}s", "limit": "success_rate",
+                              "by_time": round(within, 4), "by_memory": None, "max": round(within, 4)})
+
+    if args.outdir:
+        os.makedirs(args.outdir, exist_ok=True)
+        write_rows(fit_rows, os.path.join(args.outdir, "scaling_fits.csv"))
+        write_rows(capacity_rows, os.path.join(args.outdir, "scaling_capacity.csv"))
+        write_rows(curve_rows, os.path.join(args.outdir, "sa_success_curve.csv"))
+        print(f"\n[OK] Report saved to {args.outdir}")
+        if args.plot and dp_model.ok and plot_dp(dp_model, dp_data, os.path.join(args.outdir, "dp_time_fit.png")):
+            print(f"[OK] Plot saved to {os.path.join(args.outdir, 'dp_time_fit.png')}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate timing CSVs, fit scaling models and plan capacity")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    s = sub.add_parser("stats", help="mean/min/max/var of the run times grouped by N or sum")
+    s.add_argument("--csv", nargs="+", required=True, help="Timing CSVs (paths or names in ../../output)")
+    s.add_argument("--engine", default="dp", help="Solver whose time column is read (default: dp)")
+    s.add_argument("--by", choices=["n", "sum"], default="n")
+    s.add_argument("--out", default=None, help="Write the table as CSV (dp_statistics_by_n.csv layout)")
+    s.add_argument("--extended", action="store_true", help="Add run/timeout counts to the CSV")
+
+    f = sub.add_parser("fit", help="Fit the runtime models and extrapolate the capacity")
+    f.add_argument("--dp", nargs="+", default=DP_CSVS, help="dp timing CSVs")
+    f.add_argument("--dfs", nargs="+", default=DFS_CSVS, help="dfs timing CSVs")
+    f.add_argument("--sa", nargs="+", default=SA_CSVS, help="SA restart CSVs (sa_restart_benchmark.py)")
+    f.add_argument("--dp-model", choices=["pinned", "free"], default="pinned",
+                   help="dp model used for the capacity (default: pinned t = k N S^2)")
+    f.add_argument("--time-budget", type=float, default=TIME_BUDGET, help="Seconds per instance")
+    f.add_argument("--mem-budget", type=int, default=MEM_BUDGET_MB, help="dp memory budget in MB")
+    f.add_argument("--n", type=int, nargs="+", default=PLAN_NS, help="N values for the dp capacity")
+    f.add_argument("--sum", type=int, nargs="+", default=PLAN_SUMS, help="Sums for the dp capacity")
+    f.add_argument("--outdir", default=None, help="Write scaling_fits.csv, scaling_capacity.csv, sa_success_curve.csv")
+    f.add_argument("--plot", action="store_true", help="Also write dp_time_fit.png (needs matplotlib)")
+
+    args = parser.parse_args()
+    if args.cmd == "stats":
+        run_stats_cmd(args)
+    else:
+        run_fit_cmd(args)
+
+
+if __name__ == "__main__":
+    main()
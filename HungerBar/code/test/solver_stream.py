@@ -0,0 +1,80 @@
+import subprocess
+
+# One long-lived solver per (executable, K) in each process (i.e., per pool worker)
+_stream_solvers = {}
+
+
+def read_instance(path):
+    """
+    Reads an instance file ("N" followed by N integers) into a list of ints.
+    """
+    with open(path, "r") as f:
+        tokens = f.read().split()
+    n = int(tokens[0])
+    return [int(x) for x in tokens[1:n + 1]]
+
+
+class StreamSolver:
+    """
+    Keeps one solver process running in `-stream` mode and pipes instances
+    through it, avoiding a process spawn, file open and srand per instance.
+
+    Protocol: write "N\\na1 ... aN\\n" to stdin; the solver answers with
+    "no\\n", or "yes\\n" followed by exactly `num_buckets` bucket lines
+    (the solver's -k, default 3).
+    """
+
+    def __init__(self, exe_path, num_buckets=3):
+        self.exe_path = exe_path
+        self.num_buckets = num_buckets
+        cmd = [exe_path, "-stream"]
+        if num_buckets != 3:
+            cmd += ["-k", str(num_buckets)]
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+
+    def solve(self, values):
+        """
+        Returns the solver's record for one instance, in the same text format
+        as a .out file. Raises RuntimeError if the solver process died.
+        """
+        try:
+            self.proc.stdin.write(f"{len(values)}\n{' '.join(map(str, values))}\n")
+            self.proc.stdin.flush()
+            verdict = self.proc.stdout.readline()
+            if not verdict:
+                raise RuntimeError(f"{self.exe_path} exited (code {self.proc.poll()})")
+            lines = [verdict]
+            if verdict.strip() == "yes":
+                for _ in range(self.num_buckets):
+                    lines.append(self.proc.stdout.readline())
+            return "".join(lines)
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"{self.exe_path} stream broken: {e}")
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+
+
+def get_stream_solver(exe_path, num_buckets=3):
+    """
+    Returns this process's long-lived solver for (`exe_path`, `num_buckets`),
+    restarting it if it died.
+    """
+    key = (exe_path, num_buckets)
+    solver = _stream_solvers.get(key)
+    if solver is None or solver.proc.poll() is not None:
+        solver = StreamSolver(exe_path, num_buckets)
+        _stream_solvers[key] = solver
+    return solver
@@ -0,0 +1,26 @@
+import pytest
+
+from threepartition import SolverSession
+
+
+def sorted_parts(parts):
+    return sorted(sorted(int(v) for v in part) for part in parts)
+
+
+@pytest.mark.parametrize("method", ["dp", "sa"])
+def test_remove_missing_value_changes_nothing(method):
+    # A failed remove() used to delete the values before the missing one
+    # without marking the session stale, so solve() returned the old parts
+    session = SolverSession([4, 4, 4, 3, 3, 3, 2, 2, 2], method=method)
+    before = sorted_parts(session.solve())
+    assert before == [[2, 3, 4]] * 3
+
+    with pytest.raises(ValueError):
+        session.remove([2, 2, 2, 99])
+    assert sorted(session.values.tolist()) == [2, 2, 2, 3, 3, 3, 4, 4, 4]
+    assert sorted_parts(session.solve()) == before
+
+    with pytest.raises(ValueError):
+        session.remove([4, 4, 4, 4])
+    session.remove([2, 2, 2])
+    assert sorted_parts(session.solve()) == [[3, 4]] * 3
@@ -0,0 +1,46 @@
+"""
+In-process 3-Partition solvers.
+
+Usage:
+    from threepartition import solve
+    parts = solve([1, 2, 3, 4, 5], method="dp")   # -> (array([...]), array([...]), array([...])) or None
+
+The engines mirror the executables in `code/src`:
+    dp  - exact, pseudo-polynomial (NumPy boolean-plane DP)
+    dfs - exact, backtracking with pruning
+    sa  - heuristic simulated annealing; None only means "not found in time"
+
+SolverSession (session.py) keeps the dp planes / the last SA partition between
+solves of an instance that changes by a few values at a time.
+"""
+import numpy as np
+
+from .dfs import dfs_solve
+from .dp import dp_solve
+from .sa import sa_solve
+from .session import SolverSession
+
+__all__ = ["solve", "dp_solve", "dfs_solve", "sa_solve", "SolverSession", "METHODS"]
+
+METHODS = {
+    "dp": dp_solve,
+    "dfs": dfs_solve,
+    "sa": sa_solve,
+}
+
+
+def solve(values, method="dp", **kwargs):
+    """
+    Solves one instance without spawning a process or touching the filesystem.
+
+    Returns a tuple of three int64 arrays (the buckets) if a partition was found,
+    otherwise None. Extra keyword arguments are forwarded to the engine
+    (e.g. `time_limit`/`seed` for SA).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {sorted(METHODS)}")
+    values = np.asarray(values, dtype=np.int64)
+    assignment = METHODS[method](values, **kwargs)
+    if assignment is None:
+        return None
+    return tuple(values[assignment == b] for b in range(3))
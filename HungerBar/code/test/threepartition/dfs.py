@@ -0,0 +1,60 @@
+"""
+Python port of dfs.cpp: values sorted descending, capacity pruning and
+empty-bucket symmetry breaking.
+"""
+import sys
+
+import numpy as np
+
+
+def dfs_solve(values):
+    """
+    Returns an array with the bucket (0..2) of every value (in input order),
+    or None if no partition exists.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    n = len(values)
+    total = int(values.sum())
+    if n < 3 or total % 3 != 0:
+        return None
+    target = total // 3
+
+    # Optimization: Sort descending to prioritize large items
+    order = np.argsort(-values, kind="stable")
+    numbers = [int(v) for v in values[order]]
+    if numbers[0] > target:
+        return None
+
+    bucket_sum = [0, 0, 0]
+    belong_to = [0] * n
+
+    def dfs(index):
+        if index == n:
+            return bucket_sum[0] == target and bucket_sum[1] == target
+        val = numbers[index]
+        for i in range(3):
+            # Pruning 1: Capacity Check
+            if bucket_sum[i] + val > target:
+                continue
+            bucket_sum[i] += val
+            belong_to[index] = i
+            if dfs(index + 1):
+                return True
+            bucket_sum[i] -= val
+            # Pruning 2: Symmetry Breaking for Empty Buckets
+            if bucket_sum[i] == 0:
+                break
+        return False
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, n + 100))
+    try:
+        found = dfs(0)
+    finally:
+        sys.setrecursionlimit(limit)
+    if not found:
+        return None
+
+    result = np.empty(n, dtype=np.int64)
+    result[order] = belong_to
+    return result
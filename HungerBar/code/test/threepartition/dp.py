@@ -0,0 +1,83 @@
+"""
+NumPy port of dp.cpp.
+
+reach[i, j] is True iff bucket 1 can hold sum i and bucket 2 can hold sum j at
+the same time (bucket 3 takes the rest). One item is applied to the whole
+(i, j) plane with two shifted ORs. The partition is reconstructed with the
+same Hirschberg-style split as dp.cpp, so only two planes are alive at a time.
+"""
+import numpy as np
+
+
+def apply_value(cur, out, val):
+    """
+    out = the sums of plane `cur` (same shape) after one more item `val`.
+    """
+    rows, cols = cur.shape
+    np.copyto(out, cur)                                  # Option 3: Put into Bucket 3
+    if val < rows:
+        out[val:, :] |= cur[:rows - val, :]              # Option 1: Put into Bucket 1
+    if val < cols:
+        out[:, val:] |= cur[:, :cols - val]              # Option 2: Put into Bucket 2
+
+
+def build_layer(values, ti, tj):
+    """
+    Reachable (bucket 1, bucket 2) sums of `values`, bounded by (ti, tj).
+    """
+    reach = np.zeros((ti + 1, tj + 1), dtype=bool)
+    reach[0, 0] = True
+    nxt = np.zeros_like(reach)
+    # Only the top-left (hi_i + 1) x (hi_j + 1) region can be reachable so far
+    hi_i = hi_j = 0
+    for val in values:
+        val = int(val)
+        hi_i = min(ti, hi_i + val)
+        hi_j = min(tj, hi_j + val)
+        apply_value(reach[:hi_i + 1, :hi_j + 1], nxt[:hi_i + 1, :hi_j + 1], val)
+        reach, nxt = nxt, reach
+    return reach
+
+
+def _solve_range(values, belong_to, lo, hi, ti, tj):
+    if hi - lo == 1:
+        val = values[lo]
+        if ti == val and tj == 0:
+            belong_to[lo] = 0
+        elif tj == val and ti == 0:
+            belong_to[lo] = 1
+        elif ti == 0 and tj == 0:
+            belong_to[lo] = 2
+        else:
+            return False
+        return True
+
+    mid = (lo + hi) // 2
+    front = build_layer(values[lo:mid], ti, tj)
+    back = build_layer(values[mid:hi], ti, tj)
+    # front[a, b] & back[ti - a, tj - b]: how the targets split between halves
+    hits = np.argwhere(front & back[::-1, ::-1])
+    del front, back
+    if len(hits) == 0:
+        return False
+    a, b = (int(x) for x in hits[0])
+    return (_solve_range(values, belong_to, lo, mid, a, b)
+            and _solve_range(values, belong_to, mid, hi, ti - a, tj - b))
+
+
+def dp_solve(values):
+    """
+    Returns an array with the bucket (0..2) of every value, or None if no
+    partition exists.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    n = len(values)
+    total = int(values.sum())
+    if n < 3 or total % 3 != 0 or int(values.max()) > total // 3:
+        return None
+
+    target = total // 3
+    belong_to = np.full(n, -1, dtype=np.int64)
+    if not _solve_range(values, belong_to, 0, n, target, target):
+        return None
+    return belong_to
@@ -0,0 +1,124 @@
+"""
+Python port of sa.cpp: greedy first run, random restarts, move/swap
+neighbourhood with incremental energy and the Metropolis criterion.
+"""
+import math
+import random
+import time
+
+import numpy as np
+
+K = 3
+WARM_T_FRACTION = 0.01  # a run from a given partition starts at T0 * this
+
+
+def sa_solve(values, time_limit=0.9, seed=None, T0=5000.0, alpha=0.99, end_T=1e-4, init=None):
+    """
+    Returns an array with the bucket (0..2) of every value (in input order),
+    or None if no partition was found within `time_limit` seconds.
+
+    `init` (a bucket per value, in input order) replaces the greedy partition
+    as the start of the first run, which then starts cooler so that a nearly
+    balanced partition is repaired rather than scrambled.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    n = len(values)
+    total = int(values.sum())
+    if n < K or total % K != 0:
+        return None
+    target = total // K
+
+    order = np.argsort(-values, kind="stable")
+    numbers = [int(v) for v in values[order]]
+    if numbers[0] > target:
+        return None
+
+    if init is not None:
+        first = [int(b) for b in np.asarray(init, dtype=np.int64)[order]]
+        first_T0 = T0 * WARM_T_FRACTION
+    else:
+        first = _greedy(numbers)
+        first_T0 = T0
+
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + time_limit
+    run_count = 0
+    while run_count == 0 or time.perf_counter() < deadline:
+        if run_count == 0:
+            belong_to = _anneal(numbers, target, rng, first, first_T0, alpha, end_T)
+        else:
+            belong_to = _anneal(numbers, target, rng, None, T0, alpha, end_T)
+        if belong_to is not None:
+            result = np.empty(n, dtype=np.int64)
+            result[order] = belong_to
+            return result
+        run_count += 1
+    return None
+
+
+def _greedy(numbers):
+    """
+    Each number (largest first) into the currently lightest bucket.
+    """
+    bucket_sum = [0] * K
+    belong_to = [0] * len(numbers)
+    for i, val in enumerate(numbers):
+        b = bucket_sum.index(min(bucket_sum))
+        belong_to[i] = b
+        bucket_sum[b] += val
+    return belong_to
+
+
+def _anneal(numbers, target, rng, start, T, alpha, end_T):
+    """
+    One run from the partition `start` (None: a random one).
+    """
+    n = len(numbers)
+    bucket_sum = [0] * K
+    if start is not None:
+        belong_to = list(start)
+    else:
+        belong_to = [rng.randrange(K) for _ in range(n)]
+    for i, val in enumerate(numbers):
+        bucket_sum[belong_to[i]] += val
+
+    cur_diff = sum(abs(s - target) for s in bucket_sum)
+    while T > end_T:
+        if cur_diff == 0:
+            return belong_to
+
+        if rng.random() < 0.5:
+            # Move one number to another bucket
+            idx = rng.randrange(n)
+            old_b = belong_to[idx]
+            new_b = rng.randrange(K)
+            if old_b == new_b:
+                continue
+            val = numbers[idx]
+            old_e = abs(bucket_sum[old_b] - target) + abs(bucket_sum[new_b] - target)
+            new_e = abs(bucket_sum[old_b] - val - target) + abs(bucket_sum[new_b] + val - target)
+            next_diff = cur_diff - old_e + new_e
+            if next_diff < cur_diff or math.exp((cur_diff - next_diff) / T) > rng.random():
+                bucket_sum[old_b] -= val
+                bucket_sum[new_b] += val
+                belong_to[idx] = new_b
+                cur_diff = next_diff
+        else:
+            # Swap the buckets of two numbers
+            i1 = rng.randrange(n)
+            i2 = rng.randrange(n)
+            b1, b2 = belong_to[i1], belong_to[i2]
+            if b1 == b2:
+                continue
+            delta = numbers[i2] - numbers[i1]
+            old_e = abs(bucket_sum[b1] - target) + abs(bucket_sum[b2] - target)
+            new_e = abs(bucket_sum[b1] + delta - target) + abs(bucket_sum[b2] - delta - target)
+            next_diff = cur_diff - old_e + new_e
+            if next_diff < cur_diff or math.exp((cur_diff - next_diff) / T) > rng.random():
+                bucket_sum[b1] += delta
+                bucket_sum[b2] -= delta
+                belong_to[i1], belong_to[i2] = b2, b1
+                cur_diff = next_diff
+        T *= alpha
+
+    return belong_to if cur_diff == 0 else None
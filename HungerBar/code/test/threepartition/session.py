@@ -0,0 +1,242 @@
+"""
+Stateful solving of an instance that changes by a few values at a time.
+
+    from threepartition import SolverSession
+    session = SolverSession([1, 2, 3, 4, 5], method="dp")
+    session.solve()          # -> (array([...]), array([...]), array([...])) or None
+    session.add([6, 9])
+    session.remove([2])
+    session.solve()
+
+- dp: the reachable (bucket 1, bucket 2) planes of the values' prefixes are kept
+  (bit-packed, every `checkpoint_every` values; by default every value while
+  they fit into `CHECKPOINT_BUDGET`, then about every sqrt(N)). An added value
+  extends the last plane by one item; a removed value truncates the planes at its position and
+  recomputes from the checkpoint before it, so removing a recent value is cheap.
+  The planes are bounded by `cap`, which is rebuilt to the target plus
+  `CAP_SLACK` whenever the target outgrows it. The partition is read back from the planes.
+- sa: the last partition found is kept. Added values go into the lightest
+  bucket, removed values leave theirs, and the first annealing run starts from
+  the result (see sa_solve's `init`).
+"""
+import numpy as np
+
+from .dp import apply_value
+from .sa import sa_solve
+
+__all__ = ["SolverSession", "SESSION_METHODS"]
+
+SESSION_METHODS = ("dp", "sa")
+MIN_CAP = 64      # smallest plane bound of the dp session
+CAP_SLACK = 0.25  # headroom of the plane bound over the target, for added values
+CHECKPOINT_BUDGET = 256 << 20  # bytes of stored planes before the default spacing grows
+
+
+def _reachable(packed, i, j):
+    """
+    Bit (i, j) of a plane packed with np.packbits(plane, axis=1).
+    """
+    return (packed[i, j >> 3] >> (7 - (j & 7))) & 1 == 1
+
+
+class SolverSession:
+    """
+    One instance under edits (`add`/`remove`) with the state of the last
+    `solve` kept for the next one. Methods: "dp" (exact) and "sa".
+    """
+
+    def __init__(self, values=(), method="dp", checkpoint_every=None, **kwargs):
+        """
+        `checkpoint_every` (dp) trades memory for recomputation: a plane is
+        stored after every that many values. With c = checkpoint_every, N/c
+        planes are stored, and a solve or removal recomputes up to c planes
+        (a solve holds them at once). 1 stores every plane (N planes of
+        (1.25 S/3)^2 bits, e.g. 0.5 GB for 100 values at S/3 = 5000) and
+        solves without recomputing. None (default) starts at 1 and, once the
+        planes exceed CHECKPOINT_BUDGET, doubles c up to about sqrt(N), which
+        minimizes the planes held; every solve then recomputes about N planes.
+        Extra keyword arguments are forwarded to the engine (e.g.
+        `time_limit`/`seed` for SA).
+        """
+        if method not in SESSION_METHODS:
+            raise ValueError(f"Unknown session method '{method}', expected one of {list(SESSION_METHODS)}")
+        if checkpoint_every is not None and checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be >= 1")
+        self.method = method
+        self._auto_every = checkpoint_every is None
+        self.checkpoint_every = checkpoint_every or 1
+        self.kwargs = kwargs
+        self._items = []       # values in DP order (= the order of `values`)
+        self._stale = True     # values changed since `_parts` was computed
+        self._parts = None
+        # dp: packed planes after 0, c, 2c, ... items and the plane after all items
+        self._cap = 0
+        self._checkpoints = []
+        self._plane = None
+        # sa: bucket of every item (None until a partition was found)
+        self._assignment = None
+        self.add(values)
+
+    @property
+    def values(self):
+        return np.asarray(self._items, dtype=np.int64)
+
+    def add(self, values):
+        """
+        Appends `values` to the instance.
+        """
+        values = [int(v) for v in np.asarray(values, dtype=np.int64).ravel()]
+        if not values:
+            return
+        self._stale = True
+        if self.method == "dp":
+            for val in values:
+                self._items.append(val)
+                if self._plane is not None:
+                    self._extend(len(self._items) - 1)
+        else:
+            if self._assignment is not None:
+                sums = self._bucket_sums()
+                for val in values:
+                    b = sums.index(min(sums))
+                    self._assignment.append(b)
+                    sums[b] += val
+            self._items.extend(values)
+
+    def remove(self, values):
+        """
+        Removes one occurrence of each of `values` (the most recently added
+        one). Raises ValueError, and removes nothing, if a value is not in
+        the instance (as often as it is given).
+        """
+        values = [int(v) for v in np.asarray(values, dtype=np.int64).ravel()]
+        if not values:
+            return
+        # Every position is looked up before anything is deleted, so a missing
+        # value leaves the session unchanged
+        positions = set()
+        for val in values:
+            pos = next((p for p in range(len(self._items) - 1, -1, -1)
+                        if self._items[p] == val and p not in positions), None)
+            if pos is None:
+                raise ValueError(f"{val} is not in the instance")
+            positions.add(pos)
+        for pos in sorted(positions, reverse=True):
+            del self._items[pos]
+            if self._assignment is not None:
+                del self._assignment[pos]
+        first = min(positions)
+        self._stale = True
+        if self.method == "dp" and self._plane is not None:
+            self._rewind(first)
+
+    def solve(self):
+        """
+        Solves the current `values` like threepartition.solve (three arrays or
+        None), reusing the state kept from the previous calls.
+        """
+        if self._stale:
+            if self.method == "dp":
+                assignment = self._solve_dp()
+            else:
+                assignment = self._solve_sa()
+            values = self.values
+            self._parts = None
+            if assignment is not None:
+                self._parts = tuple(values[assignment == b] for b in range(3))
+            self._stale = False
+        return self._parts
+
+    # SA
+
+    def _bucket_sums(self):
+        sums = [0, 0, 0]
+        for val, b in zip(self._items, self._assignment):
+            sums[b] += val
+        return sums
+
+    def _solve_sa(self):
+        assignment = sa_solve(self.values, init=self._assignment, **self.kwargs)
+        if assignment is not None:
+            self._assignment = [int(b) for b in assignment]
+        return assignment
+
+    # DP
+
+    def _extend(self, i):
+        """
+        Applies item i to the plane after items [0, i).
+        """
+        nxt = np.empty_like(self._plane)
+        apply_value(self._plane, nxt, self._items[i])
+        self._plane = nxt
+        if (i + 1) % self.checkpoint_every == 0:
+            self._checkpoints.append(np.packbits(nxt, axis=1))
+            # Auto spacing: the planes after 0, 2c, 4c, ... are kept when c doubles
+            num = len(self._checkpoints)
+            if (self._auto_every and num > 2 * self.checkpoint_every
+                    and num * self._checkpoints[0].nbytes > CHECKPOINT_BUDGET):
+                self._checkpoints = self._checkpoints[::2]
+                self.checkpoint_every *= 2
+
+    def _checkpoint(self, k):
+        return np.unpackbits(self._checkpoints[k], axis=1, count=self._cap + 1).astype(bool)
+
+    def _rewind(self, pos):
+        """
+        Recomputes the planes after the items from `pos` on changed, starting
+        from the last checkpoint at or before pos.
+        """
+        k = pos // self.checkpoint_every
+        del self._checkpoints[k + 1:]
+        self._plane = self._checkpoint(k)
+        for i in range(k * self.checkpoint_every, len(self._items)):
+            self._extend(i)
+
+    def _rebuild(self, cap):
+        self._cap = cap
+        if self._auto_every:
+            self.checkpoint_every = 1
+        self._plane = np.zeros((cap + 1, cap + 1), dtype=bool)
+        self._plane[0, 0] = True
+        self._checkpoints = [np.packbits(self._plane, axis=1)]
+        for i in range(len(self._items)):
+            self._extend(i)
+
+    def _solve_dp(self):
+        n = len(self._items)
+        total = sum(self._items)
+        if n < 3 or total % 3 != 0 or max(self._items) > total // 3:
+            return None
+        target = total // 3
+        if self._plane is None or target > self._cap:
+            self._rebuild(max(MIN_CAP, int(target * (1 + CAP_SLACK))))
+        if not self._plane[target, target]:
+            return None
+
+        # Walk back from (target, target), one checkpoint segment at a time. The
+        # planes are tested packed, so with checkpoint_every=1 nothing is unpacked.
+        belong_to = np.empty(n, dtype=np.int64)
+        a = b = target
+        c = self.checkpoint_every
+        for k in range((n - 1) // c, -1, -1):
+            lo, hi = k * c, min(n, (k + 1) * c)
+            planes = [self._checkpoints[k]]
+            if hi - lo > 1:
+                cur = self._checkpoint(k)
+                for i in range(lo, hi - 1):
+                    nxt = np.empty_like(cur)
+                    apply_value(cur, nxt, self._items[i])
+                    planes.append(np.packbits(nxt, axis=1))
+                    cur = nxt
+            for i in range(hi - 1, lo - 1, -1):
+                val, prev = self._items[i], planes[i - lo]
+                if a >= val and _reachable(prev, a - val, b):
+                    belong_to[i] = 0
+                    a -= val
+                elif b >= val and _reachable(prev, a, b - val):
+                    belong_to[i] = 1
+                    b -= val
+                else:
+                    belong_to[i] = 2
+        return belong_to
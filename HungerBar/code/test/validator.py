@@ -0,0 +1,145 @@
+import hashlib
+from collections import Counter
+
+# Cross-checking a "no" with an exact engine is only attempted when it is cheap
+CROSS_CHECK_MAX_CELLS = 1 << 22     # DP: (S/3 + 1)^2 bytes per NumPy plane (two are alive), ~0.5 s at N=100
+CROSS_CHECK_DFS_MAX_N = 20          # DFS: exponential in N, value size does not matter
+
+# Check statuses written to the benchmark CSV
+CORRECT = "Correct"            # valid partition, or a "no" confirmed by an exact engine
+WRONG = "Wrong"                # invalid partition, or "no" although a partition exists
+UNVERIFIED = "Unverified"      # "no" that no exact engine could afford to confirm
+BAD_OUTPUT = "BadOutput"       # missing/empty file, unknown verdict or unparsable line
+
+# Cross-check results per instance (keyed by a digest of the sorted values), so
+# every solver's "no" on one test costs one exact solve
+_feasible_memo = {}
+_max_cells = CROSS_CHECK_MAX_CELLS
+
+
+def set_cross_check_cells(cells):
+    """
+    Sets the DP cross-check limit on (S/3 + 1)^2 for this process (0 turns
+    the DP cross-check off) and forgets the memoized results.
+    """
+    global _max_cells
+    _max_cells = cells
+    _feasible_memo.clear()
+
+
+def instance_digest(values):
+    """
+    Digest of the multiset of values, independent of their order.
+    """
+    return hashlib.blake2b(" ".join(map(str, sorted(values))).encode(), digest_size=16).digest()
+
+
+def check_partition(values, lines, num_buckets=3):
+    """
+    Validates the `num_buckets` bucket lines of a "yes" output against the
+    input values. Returns (status, detail).
+
+    The buckets are consumed line by line against a Counter of the input, so
+    the check is linear in N and fails at the first value that is not (or no
+    longer) available.
+    """
+    remaining = Counter(values)
+    sums = []
+    for k in range(num_buckets):
+        line = lines[k] if k < len(lines) else None
+        if line is None:
+            return BAD_OUTPUT, f"expected {num_buckets} bucket lines, got {k}"
+        bucket_sum = 0
+        for token in line.split():
+            try:
+                v = int(token)
+            except ValueError:
+                return BAD_OUTPUT, f"bucket {k + 1}: not an integer: {token!r}"
+            if remaining[v] == 0:
+                return WRONG, f"bucket {k + 1}: {v} is not in the input (or used too often)"
+            remaining[v] -= 1
+            bucket_sum += v
+        sums.append(bucket_sum)
+
+    missing = sum(remaining.values())
+    if missing:
+        return WRONG, f"{missing} input values are missing from the buckets"
+    if len(set(sums)) > 1:
+        return WRONG, f"bucket sums differ: {' '.join(map(str, sums))}"
+    return CORRECT, ""
+
+
+def exact_feasible(values, num_buckets=3):
+    """
+    Decides the instance with an exact engine if that is affordable.
+    Returns True/False, or None if no exact check is feasible (too large, the
+    `threepartition` package/NumPy is unavailable, or a K other than 3).
+    """
+    n = len(values)
+    total = sum(values)
+    if n < num_buckets or total % num_buckets != 0 or max(values) > total // num_buckets:
+        return False
+    if num_buckets != 3:
+        return None
+    key = instance_digest(values)
+    if key in _feasible_memo:
+        return _feasible_memo[key]
+
+    target = total // 3
+    result = None
+    try:
+        if (target + 1) ** 2 <= _max_cells:
+            from threepartition.dp import build_layer
+            result = bool(build_layer(values, target, target)[target, target])
+        elif n <= CROSS_CHECK_DFS_MAX_N:
+            from threepartition import dfs_solve
+            result = dfs_solve(values) is not None
+    except ImportError:
+        result = None
+    _feasible_memo[key] = result
+    return result
+
+
+def validate_output(values, output_lines, cross_check=True, num_buckets=3):
+    """
+    Checks one solver output (its lines, e.g. an open .out file) for an
+    instance. Returns (status, detail), status being one of CORRECT, WRONG,
+    UNVERIFIED or BAD_OUTPUT. `num_buckets` is the K the solver was run with.
+
+    "yes" outputs are validated directly. "no" outputs are confirmed with an
+    exact engine when one is feasible (see exact_feasible); otherwise they are
+    UNVERIFIED.
+    """
+    lines = iter(output_lines)
+    verdict = next(lines, "").strip().lower()
+    if verdict == "yes":
+        return check_partition(values, [line for _, line in zip(range(num_buckets), lines)],
+                               num_buckets)
+    if verdict == "error":
+        return BAD_OUTPUT, "the solver could not solve the instance"
+    if verdict != "no":
+        return BAD_OUTPUT, f"unknown verdict {verdict!r}"
+    if not cross_check:
+        return UNVERIFIED, ""
+
+    feasible = exact_feasible(values, num_buckets)
+    if feasible is None:
+        return UNVERIFIED, "no exact cross-check feasible"
+    if feasible:
+        return WRONG, "answered no, but a partition exists"
+    return CORRECT, ""
+
+
+def validate_files(input_path, output_path, cross_check=True, num_buckets=3):
+    """
+    validate_output for an .in/.out file pair. A missing output file is BAD_OUTPUT.
+    """
+    with open(input_path, "r") as f:
+        tokens = f.read().split()
+    n = int(tokens[0])
+    values = [int(x) for x in tokens[1:n + 1]]
+    try:
+        with open(output_path, "r") as f:
+            return validate_output(values, f, cross_check, num_buckets)
+    except OSError:
+        return BAD_OUTPUT, "output file missing"